@@ -8,7 +8,7 @@ from app.core.config import settings
 from app.db.base import Base
 
 # Import all models for Alembic autogenerate
-from app.models import user, category, transaction
+from app.models import user, category, transaction, monthly_rollup, budget, report_job
 
 # Load Alembic config
 config = context.config
@@ -0,0 +1,86 @@
+"""add monthly_rollups
+
+Revision ID: 0001_monthly_rollups
+Revises:
+Create Date: 2026-10-18
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "0001_monthly_rollups"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "monthly_rollups",
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.Column("year_month", sa.Integer(), nullable=False),
+        sa.Column("category_id", sa.Integer(), nullable=False),
+        sa.Column("type", sa.String(), nullable=False),
+        sa.Column("total_amount", sa.Float(), nullable=False),
+        sa.Column("tx_count", sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("user_id", "year_month", "category_id", "type"),
+    )
+
+    # Backfill from existing transactions; `python -m app.db.rebuild_rollups`
+    # does the same on demand.
+    transactions = sa.table(
+        "transactions",
+        sa.column("id", sa.Integer),
+        sa.column("user_id", sa.Integer),
+        sa.column("category_id", sa.Integer),
+        sa.column("type", sa.String),
+        sa.column("amount", sa.Float),
+        sa.column("date", sa.DateTime),
+    )
+    rollups = sa.table(
+        "monthly_rollups",
+        sa.column("user_id", sa.Integer),
+        sa.column("year_month", sa.Integer),
+        sa.column("category_id", sa.Integer),
+        sa.column("type", sa.String),
+        sa.column("total_amount", sa.Float),
+        sa.column("tx_count", sa.Integer),
+    )
+    ym = sa.cast(
+        sa.extract("year", transactions.c.date) * 100
+        + sa.extract("month", transactions.c.date),
+        sa.Integer,
+    )
+    category = sa.func.coalesce(transactions.c.category_id, 0)
+    source = (
+        sa.select(
+            transactions.c.user_id,
+            ym,
+            category,
+            transactions.c.type,
+            sa.func.sum(transactions.c.amount),
+            sa.func.count(transactions.c.id),
+        )
+        .where(transactions.c.date.isnot(None))
+        .group_by(transactions.c.user_id, ym, category, transactions.c.type)
+    )
+    op.execute(
+        rollups.insert().from_select(
+            [
+                "user_id",
+                "year_month",
+                "category_id",
+                "type",
+                "total_amount",
+                "tx_count",
+            ],
+            source,
+        )
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("monthly_rollups")
@@ -0,0 +1,29 @@
+"""add users.data_version
+
+Revision ID: 0002_user_data_version
+Revises: 0001_monthly_rollups
+Create Date: 2026-10-18
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "0002_user_data_version"
+down_revision = "0001_monthly_rollups"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "users",
+        sa.Column(
+            "data_version", sa.Integer(), nullable=False, server_default="0"
+        ),
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("users", "data_version")
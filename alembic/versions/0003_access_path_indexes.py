@@ -0,0 +1,42 @@
+"""add composite indexes for per-user access paths
+
+Revision ID: 0003_access_path_indexes
+Revises: 0002_user_data_version
+Create Date: 2026-10-18
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "0003_access_path_indexes"
+down_revision = "0002_user_data_version"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "ix_transactions_user_date_id",
+        "transactions",
+        ["user_id", sa.text("date DESC"), sa.text("id DESC")],
+    )
+    op.create_index(
+        "ix_transactions_user_category_date",
+        "transactions",
+        ["user_id", "category_id", "date"],
+    )
+    op.create_index(
+        "ix_transactions_user_type_date",
+        "transactions",
+        ["user_id", "type", "date"],
+    )
+    op.create_index("ix_categories_user_id", "categories", ["user_id"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_categories_user_id", table_name="categories")
+    op.drop_index("ix_transactions_user_type_date", table_name="transactions")
+    op.drop_index("ix_transactions_user_category_date", table_name="transactions")
+    op.drop_index("ix_transactions_user_date_id", table_name="transactions")
@@ -0,0 +1,68 @@
+"""add full-text search indexes on transaction descriptions
+
+Revision ID: 0004_transaction_search
+Revises: 0003_access_path_indexes
+Create Date: 2026-10-18
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = "0004_transaction_search"
+down_revision = "0003_access_path_indexes"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    dialect = op.get_bind().dialect.name
+    if dialect == "postgresql":
+        op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+        op.execute("CREATE EXTENSION IF NOT EXISTS btree_gin")
+        op.execute(
+            "CREATE INDEX ix_transactions_search_tsv ON transactions "
+            "USING gin (user_id, to_tsvector('simple', coalesce(description, '')))"
+        )
+        op.execute(
+            "CREATE INDEX ix_transactions_search_trgm ON transactions "
+            "USING gin (user_id, description gin_trgm_ops)"
+        )
+    elif dialect == "sqlite":
+        op.execute(
+            "CREATE VIRTUAL TABLE transactions_fts USING fts5("
+            "description, content='transactions', content_rowid='id', "
+            "tokenize='trigram')"
+        )
+        op.execute(
+            "CREATE TRIGGER transactions_fts_ai AFTER INSERT ON transactions "
+            "BEGIN INSERT INTO transactions_fts(rowid, description) "
+            "VALUES (new.id, new.description); END"
+        )
+        op.execute(
+            "CREATE TRIGGER transactions_fts_ad AFTER DELETE ON transactions "
+            "BEGIN INSERT INTO transactions_fts(transactions_fts, rowid, description) "
+            "VALUES ('delete', old.id, old.description); END"
+        )
+        op.execute(
+            "CREATE TRIGGER transactions_fts_au "
+            "AFTER UPDATE OF description ON transactions "
+            "BEGIN INSERT INTO transactions_fts(transactions_fts, rowid, description) "
+            "VALUES ('delete', old.id, old.description); "
+            "INSERT INTO transactions_fts(rowid, description) "
+            "VALUES (new.id, new.description); END"
+        )
+        # Index the rows that already exist.
+        op.execute("INSERT INTO transactions_fts(transactions_fts) VALUES ('rebuild')")
+
+
+def downgrade() -> None:
+    dialect = op.get_bind().dialect.name
+    if dialect == "postgresql":
+        op.execute("DROP INDEX IF EXISTS ix_transactions_search_trgm")
+        op.execute("DROP INDEX IF EXISTS ix_transactions_search_tsv")
+    elif dialect == "sqlite":
+        op.execute("DROP TRIGGER IF EXISTS transactions_fts_au")
+        op.execute("DROP TRIGGER IF EXISTS transactions_fts_ad")
+        op.execute("DROP TRIGGER IF EXISTS transactions_fts_ai")
+        op.execute("DROP TABLE IF EXISTS transactions_fts")
@@ -0,0 +1,84 @@
+"""add budgets, budget_periods and budget_alerts
+
+Revision ID: 0005_budgets
+Revises: 0004_transaction_search
+Create Date: 2026-10-18
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "0005_budgets"
+down_revision = "0004_transaction_search"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "budgets",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.Column("category_id", sa.Integer(), nullable=True),
+        sa.Column("limit_amount", sa.Float(), nullable=False),
+        sa.Column("start_month", sa.Integer(), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"], ondelete="CASCADE"),
+        sa.ForeignKeyConstraint(
+            ["category_id"], ["categories.id"], ondelete="CASCADE"
+        ),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_budgets_id", "budgets", ["id"])
+    op.create_index("ix_budgets_user_id", "budgets", ["user_id"])
+
+    op.create_table(
+        "budget_periods",
+        sa.Column("budget_id", sa.Integer(), nullable=False),
+        sa.Column("year_month", sa.Integer(), nullable=False),
+        sa.Column("spent", sa.Float(), nullable=False),
+        sa.Column("level", sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(["budget_id"], ["budgets.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("budget_id", "year_month"),
+    )
+
+    op.create_table(
+        "budget_alerts",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.Column("budget_id", sa.Integer(), nullable=False),
+        sa.Column("year_month", sa.Integer(), nullable=False),
+        sa.Column("level", sa.String(), nullable=False),
+        sa.Column("spent", sa.Float(), nullable=False),
+        sa.Column("limit_amount", sa.Float(), nullable=False),
+        sa.Column("message", sa.String(), nullable=False),
+        sa.Column("active", sa.Boolean(), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"], ondelete="CASCADE"),
+        sa.ForeignKeyConstraint(["budget_id"], ["budgets.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_budget_alerts_id", "budget_alerts", ["id"])
+    op.create_index(
+        "ix_budget_alerts_user_active_period",
+        "budget_alerts",
+        ["user_id", "active", "year_month"],
+    )
+    op.create_index(
+        "ix_budget_alerts_budget_period",
+        "budget_alerts",
+        ["budget_id", "year_month"],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_budget_alerts_budget_period", table_name="budget_alerts")
+    op.drop_index("ix_budget_alerts_user_active_period", table_name="budget_alerts")
+    op.drop_index("ix_budget_alerts_id", table_name="budget_alerts")
+    op.drop_table("budget_alerts")
+    op.drop_table("budget_periods")
+    op.drop_index("ix_budgets_user_id", table_name="budgets")
+    op.drop_index("ix_budgets_id", table_name="budgets")
+    op.drop_table("budgets")
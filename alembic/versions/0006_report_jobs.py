@@ -0,0 +1,47 @@
+"""add report_jobs
+
+Revision ID: 0006_report_jobs
+Revises: 0005_budgets
+Create Date: 2026-10-18
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "0006_report_jobs"
+down_revision = "0005_budgets"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "report_jobs",
+        sa.Column("id", sa.String(length=32), nullable=False),
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.Column("report_type", sa.String(), nullable=False),
+        sa.Column("params", sa.Text(), nullable=False),
+        sa.Column("status", sa.String(), nullable=False),
+        sa.Column("result", sa.Text(), nullable=True),
+        sa.Column("error", sa.String(), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.Column("started_at", sa.DateTime(), nullable=True),
+        sa.Column("finished_at", sa.DateTime(), nullable=True),
+        sa.Column("expires_at", sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(
+        "ix_report_jobs_status_created", "report_jobs", ["status", "created_at"]
+    )
+    op.create_index(
+        "ix_report_jobs_user_status", "report_jobs", ["user_id", "status"]
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_report_jobs_user_status", table_name="report_jobs")
+    op.drop_index("ix_report_jobs_status_created", table_name="report_jobs")
+    op.drop_table("report_jobs")
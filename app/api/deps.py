@@ -1,16 +1,42 @@
-from typing import Generator
+import secrets
+from contextlib import asynccontextmanager
+from typing import (
+    AsyncGenerator,
+    AsyncIterator,
+    Callable,
+    Generator,
+    TypeVar,
+    Union,
+)
 
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, Header, HTTPException, Request, status
+from fastapi.concurrency import run_in_threadpool
 from fastapi.security import OAuth2PasswordBearer
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from app.db.session import SessionLocal
+from app.core.config import settings
+from app.db.session import (
+    AsyncReplicaSessionLocals,
+    AsyncSessionLocal,
+    ReplicaSessionLocals,
+    SessionLocal,
+    replica_router,
+)
 from app.models.user import User
-from app.core.security import decode_access_token
+from app.core.security import decode_access_token_claims
+from app.services.data_version import get_data_version
+from app.services.principal_cache import Principal, principal_cache
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/v1/auth/login")
 
 
+T = TypeVar("T")
+
+# Either kind of session, depending on settings.DB_ASYNC.
+DBSession = Union[Session, AsyncSession]
+
+
 def get_db() -> Generator:
     db = SessionLocal()
     try:
@@ -19,19 +45,140 @@ def get_db() -> Generator:
         db.close()
 
 
-def get_current_user(
-    token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)
-) -> User:
-    email = decode_access_token(token)
+@asynccontextmanager
+async def _open_session(factory) -> AsyncIterator[DBSession]:
+    db = factory()
+    if isinstance(db, AsyncSession):
+        async with db:
+            yield db
+        return
+
+    try:
+        yield db
+    finally:
+        await run_in_threadpool(db.close)
+
+
+async def get_session() -> AsyncGenerator[DBSession, None]:
+    """
+    Request-scoped session for async endpoints: an AsyncSession in async
+    mode, otherwise a regular Session. Pass it to run_db.
+    """
+    factory = AsyncSessionLocal if settings.DB_ASYNC else SessionLocal
+    async with _open_session(factory) as db:
+        yield db
+
+
+async def run_db(db: DBSession, fn: Callable[..., T], *args, **kwargs) -> T:
+    """
+    Run sync DB code fn(session, *args, **kwargs) without blocking the
+    event loop: through AsyncSession.run_sync on the async engine, or on
+    the threadpool with a sync Session.
+    """
+    if isinstance(db, AsyncSession):
+        return await db.run_sync(fn, *args, **kwargs)
+    return await run_in_threadpool(fn, db, *args, **kwargs)
+
+
+def load_principal_row(db: Session, claims: dict, email: str):
+    q = db.query(User.id, User.email, User.is_active)
+    if claims.get("uid") is not None:
+        q = q.filter(User.id == claims["uid"])
+    else:
+        q = q.filter(User.email == email)
+    return q.first()
+
+
+async def get_current_user(
+    token: str = Depends(oauth2_scheme), db: DBSession = Depends(get_session)
+) -> Principal:
+    """
+    Resolve the caller from the token. Principals are cached by subject,
+    so the users table is only read on a cache miss; tokens carrying a
+    "uid" claim are then resolved by primary key.
+    """
+    claims = decode_access_token_claims(token)
+    email = claims.get("sub") if claims else None
     if email is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Could not validate credentials",
         )
-    user = db.query(User).filter(User.email == email).first()
-    if not user:
+
+    principal = principal_cache.get(email)
+    if principal is None:
+        row = await run_db(db, load_principal_row, claims, email)
+        if not row or row.email != email:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="User not found",
+            )
+        principal = Principal(
+            id=row.id, email=row.email, is_active=row.is_active is not False
+        )
+        principal_cache.set(email, principal)
+
+    if not principal.is_active:
         raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="User not found",
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Inactive user",
+        )
+    return principal
+
+
+async def primary_data_version(
+    request: Request, primary: DBSession, user_id: int
+) -> int:
+    """
+    The user's data_version on the primary, looked up once per request.
+    """
+    version = getattr(request.state, "data_version", None)
+    if version is None:
+        version = await run_db(primary, get_data_version, user_id)
+        request.state.data_version = version
+    return version
+
+
+async def get_read_session(
+    request: Request,
+    current_user: Principal = Depends(get_current_user),
+    primary: DBSession = Depends(get_session),
+) -> AsyncGenerator[DBSession, None]:
+    """
+    Session for read-only endpoints: bound to a read replica when one is
+    configured and healthy, otherwise the request's primary session.
+    A replica whose copy of the user's data_version is behind the
+    primary's has not replayed the user's last write yet, so the user
+    reads from the primary; this holds across processes. Never write
+    through this session.
+    """
+    index = replica_router.choose()
+    if index is None:
+        yield primary
+        return
+
+    version = await primary_data_version(request, primary, current_user.id)
+    if settings.DB_ASYNC:
+        factory = AsyncReplicaSessionLocals[index]
+    else:
+        factory = ReplicaSessionLocals[index]
+    async with _open_session(factory) as db:
+        if await run_db(db, get_data_version, current_user.id) >= version:
+            yield db
+            return
+    yield primary
+
+
+def require_operator(authorization: str = Header("")) -> None:
+    """
+    Gate for operator-only routes: the caller must send the METRICS_TOKEN
+    bearer token, as for GET /metrics. A user login is not enough, since
+    anyone can register. Without a configured token the routes are off.
+    """
+    if not settings.METRICS_TOKEN:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Operator endpoints are disabled (METRICS_TOKEN is not set)",
         )
-    return user
+    if not secrets.compare_digest(authorization, f"Bearer {settings.METRICS_TOKEN}"):
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED)
@@ -0,0 +1,70 @@
+from dataclasses import dataclass
+from typing import Optional
+
+from fastapi import Depends, HTTPException, Request, status
+
+from app.api.deps import (
+    DBSession,
+    get_current_user,
+    get_session,
+    primary_data_version,
+)
+from app.services.principal_cache import Principal
+
+# Clients may keep the response but must revalidate it on every use.
+CACHE_CONTROL = "private, no-cache"
+
+
+@dataclass
+class DataETag:
+    """
+    Validator for responses that only change when the user's data does.
+    """
+
+    value: str
+    data_version: int
+
+    def headers(self) -> dict:
+        return {"ETag": self.value, "Cache-Control": CACHE_CONTROL}
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """
+    Weak comparison of an If-None-Match header against etag (RFC 9110).
+    """
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    target = etag[2:] if etag.startswith("W/") else etag
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == target:
+            return True
+    return False
+
+
+async def data_etag(
+    request: Request,
+    primary: DBSession = Depends(get_session),
+    current_user: Principal = Depends(get_current_user),
+) -> DataETag:
+    """
+    ETag derived from the user's data_version, a primary-key lookup on
+    the primary: a replica may lag behind the user's own writes. A
+    matching If-None-Match ends the request with 304 before the endpoint
+    runs its query.
+
+    The version is per user, not per URL: clients compare it against the
+    ETag they stored for that URL, so query parameters need not be part
+    of it.
+    """
+    version = await primary_data_version(request, primary, current_user.id)
+    etag = DataETag(f'W/"{current_user.id}-{version}"', version)
+    if etag_matches(request.headers.get("if-none-match"), etag.value):
+        raise HTTPException(
+            status_code=status.HTTP_304_NOT_MODIFIED, headers=etag.headers()
+        )
+    return etag
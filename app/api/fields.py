@@ -0,0 +1,23 @@
+from typing import List, Optional, Sequence
+
+from fastapi import HTTPException, status
+
+
+def parse_fields(value: Optional[str], allowed: Sequence[str]) -> Optional[List[str]]:
+    """
+    Parse a comma-separated `fields=` value into column names, in schema
+    order. None (or an empty value) means every column.
+    """
+    if not value:
+        return None
+    requested = {name.strip() for name in value.split(",") if name.strip()}
+    unknown = requested.difference(allowed)
+    if unknown:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=(
+                f"Unknown fields: {', '.join(sorted(unknown))}. "
+                f"Allowed: {', '.join(allowed)}"
+            ),
+        )
+    return [name for name in allowed if name in requested] or None
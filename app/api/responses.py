@@ -0,0 +1,43 @@
+from typing import Any, List, Optional, Sequence
+
+import orjson
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+from sqlalchemy.engine import Row
+
+
+def _default(obj: Any) -> Any:
+    if isinstance(obj, BaseModel):
+        return obj.dict()
+    raise TypeError(f"Type is not JSON serializable: {type(obj).__name__}")
+
+
+class FastJSONResponse(JSONResponse):
+    """
+    JSON response encoded with orjson.
+
+    Returning it from an endpoint skips FastAPI's response_model
+    validation and jsonable_encoder pass, so the content must already
+    match the documented schema: plain dicts/lists built from selected
+    columns, or pydantic models that were validated when they were built.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, default=_default)
+
+
+def rows_to_dicts(
+    rows: Sequence[Row], fields: Optional[Sequence[str]] = None
+) -> List[dict]:
+    """
+    Turn column-tuple rows into dicts keyed by the selected column names,
+    keeping only `fields` when given (e.g. to drop keyset columns that
+    were selected for the cursor but not requested).
+    """
+    if not rows:
+        return []
+    keys = rows[0]._fields
+    if fields is None or list(fields) == list(keys):
+        return [dict(zip(keys, row)) for row in rows]
+    positions = [keys.index(name) for name in fields]
+    return [{name: row[i] for name, i in zip(fields, positions)} for row in rows]
@@ -4,12 +4,12 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordRequestForm
 from sqlalchemy.orm import Session
 
-from app.api.deps import get_db
+from app.api.deps import DBSession, get_session, run_db
 from app.core.config import settings
 from app.core.security import (
     create_access_token,
-    get_password_hash,
-    verify_password,
+    get_password_hash_async,
+    verify_and_update_password_async,
 )
 from app.models.user import User
 from app.schemas.auth import Token
@@ -18,9 +18,29 @@ from app.schemas.user import UserCreate, UserRead
 router = APIRouter()
 
 
+# Auth handlers are async so that, while Argon2 runs on the hashing pool,
+# no request thread is held; DB work goes through run_db.
+def _get_user_by_email(db: Session, email: str):
+    return db.query(User).filter(User.email == email).first()
+
+
+def _add_user(db: Session, user: User) -> User:
+    db.add(user)
+    db.commit()
+    db.refresh(user)
+    return user
+
+
+def _store_rehash(db: Session, user: User, hashed_password: str) -> None:
+    user.hashed_password = hashed_password
+    db.commit()
+
+
 @router.post("/register", response_model=UserRead)
-def register_user(user_in: UserCreate, db: Session = Depends(get_db)):
-    existing = db.query(User).filter(User.email == user_in.email).first()
+async def register_user(
+    user_in: UserCreate, db: DBSession = Depends(get_session)
+):
+    existing = await run_db(db, _get_user_by_email, user_in.email)
     if existing:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -28,32 +48,39 @@ def register_user(user_in: UserCreate, db: Session = Depends(get_db)):
         )
     user = User(
         email=user_in.email,
-        hashed_password=get_password_hash(user_in.password),
+        hashed_password=await get_password_hash_async(user_in.password),
         is_active=True,
     )
-    db.add(user)
-    db.commit()
-    db.refresh(user)
-    return user
+    return await run_db(db, _add_user, user)
 
 
 @router.post("/login", response_model=Token)
-def login_for_access_token(
+async def login_for_access_token(
     form_data: OAuth2PasswordRequestForm = Depends(),
-    db: Session = Depends(get_db),
+    db: DBSession = Depends(get_session),
 ):
-    user = db.query(User).filter(User.email == form_data.username).first()
-    if not user or not verify_password(form_data.password, user.hashed_password):
+    user = await run_db(db, _get_user_by_email, form_data.username)
+    valid, new_hash = False, None
+    if user:
+        valid, new_hash = await verify_and_update_password_async(
+            form_data.password, user.hashed_password
+        )
+    if not valid:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password",
         )
+    if new_hash:
+        # Stored hash used outdated Argon2 parameters
+        await run_db(db, _store_rehash, user, new_hash)
 
     access_token_expires = timedelta(
         minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES
     )
     access_token = create_access_token(
-        subject=user.email, expires_delta=access_token_expires
+        subject=user.email,
+        expires_delta=access_token_expires,
+        user_id=user.id,
     )
 
     return Token(access_token=access_token, token_type="bearer")
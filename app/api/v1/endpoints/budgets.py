@@ -0,0 +1,101 @@
+from typing import List
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+
+from app.api.deps import DBSession, get_current_user, get_session, run_db
+from app.schemas.budget import (
+    BudgetAlertRead,
+    BudgetCreate,
+    BudgetRead,
+    BudgetStatus,
+    BudgetUpdate,
+)
+from app.services import alert_service, budget_service
+from app.services.principal_cache import Principal
+
+router = APIRouter()
+
+
+@router.post("/", response_model=BudgetRead)
+async def create_budget(
+    budget_in: BudgetCreate,
+    db: DBSession = Depends(get_session),
+    current_user: Principal = Depends(get_current_user),
+):
+    """
+    Monthly limit for one expense category, or for all expenses when
+    category_id is omitted.
+    """
+    try:
+        return await run_db(
+            db, budget_service.create_budget, current_user.id, budget_in
+        )
+    except ValueError as exc:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc)
+        )
+
+
+@router.get("/", response_model=List[BudgetStatus])
+async def list_budgets(
+    db: DBSession = Depends(get_session),
+    current_user: Principal = Depends(get_current_user),
+):
+    """
+    Budgets with their spending and alert level in the current month.
+    """
+    return await run_db(db, budget_service.list_budgets, current_user.id)
+
+
+@router.get("/alerts", response_model=List[BudgetAlertRead])
+async def list_budget_alerts(
+    db: DBSession = Depends(get_session),
+    current_user: Principal = Depends(get_current_user),
+    all_periods: bool = Query(
+        False, description="Include active alerts of past months"
+    ),
+):
+    """
+    Active threshold alerts (info/warning/danger), newest first. Alerts
+    are recorded when a transaction write crosses a threshold and are
+    deactivated when spending drops back below it.
+    """
+    return await run_db(
+        db,
+        alert_service.list_active_alerts,
+        current_user.id,
+        None if all_periods else budget_service.current_year_month(),
+    )
+
+
+@router.put("/{budget_id}", response_model=BudgetRead)
+async def update_budget(
+    budget_id: int,
+    budget_in: BudgetUpdate,
+    db: DBSession = Depends(get_session),
+    current_user: Principal = Depends(get_current_user),
+):
+    budget = await run_db(
+        db, budget_service.update_budget, current_user.id, budget_id, budget_in
+    )
+    if not budget:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Budget not found"
+        )
+    return budget
+
+
+@router.delete("/{budget_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def delete_budget(
+    budget_id: int,
+    db: DBSession = Depends(get_session),
+    current_user: Principal = Depends(get_current_user),
+):
+    deleted = await run_db(
+        db, budget_service.delete_budget, current_user.id, budget_id
+    )
+    if not deleted:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Budget not found"
+        )
+    return None
@@ -1,97 +1,87 @@
-from typing import List
+from typing import List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 
-from app.api.deps import get_db, get_current_user
-from app.models.category import Category
-from app.models.user import User
+from app.api.deps import (
+    DBSession,
+    get_current_user,
+    get_read_session,
+    get_session,
+    run_db,
+)
+from app.api.etag import DataETag, data_etag
+from app.api.fields import parse_fields
+from app.api.responses import FastJSONResponse, rows_to_dicts
 from app.schemas.category import (
     CategoryCreate,
     CategoryRead,
     CategoryUpdate,
 )
+from app.services import category_service
+from app.services.principal_cache import Principal
 
 router = APIRouter()
 
 
 @router.post("/", response_model=CategoryRead)
-def create_category(
+async def create_category(
     category_in: CategoryCreate,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    db: DBSession = Depends(get_session),
+    current_user: Principal = Depends(get_current_user),
 ):
-    category = Category(
-        name=category_in.name,
-        type=category_in.type,
-        user_id=current_user.id,
+    return await run_db(
+        db, category_service.create_category, current_user.id, category_in
     )
-    db.add(category)
-    db.commit()
-    db.refresh(category)
-    return category
 
 
 @router.get("/", response_model=List[CategoryRead])
-def list_categories(
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+async def list_categories(
+    db: DBSession = Depends(get_read_session),
+    current_user: Principal = Depends(get_current_user),
+    fields: Optional[str] = Query(
+        None, description="Comma-separated columns to return, e.g. id,name"
+    ),
+    etag: DataETag = Depends(data_etag),
 ):
-    categories = (
-        db.query(Category).filter(Category.user_id == current_user.id).all()
+    fields = parse_fields(fields, list(CategoryRead.__fields__))
+    rows = await run_db(
+        db, category_service.list_categories, current_user.id, fields
     )
-    return categories
+    return FastJSONResponse(rows_to_dicts(rows), headers=etag.headers())
 
 
 @router.put("/{category_id}", response_model=CategoryRead)
-def update_category(
+async def update_category(
     category_id: int,
     category_in: CategoryUpdate,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    db: DBSession = Depends(get_session),
+    current_user: Principal = Depends(get_current_user),
 ):
-    category = (
-        db.query(Category)
-        .filter(
-            Category.id == category_id,
-            Category.user_id == current_user.id,
-        )
-        .first()
+    category = await run_db(
+        db,
+        category_service.update_category,
+        current_user.id,
+        category_id,
+        category_in,
     )
     if not category:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Category not found"
         )
-
-    if category_in.name is not None:
-        category.name = category_in.name
-    if category_in.type is not None:
-        category.type = category_in.type
-
-    db.commit()
-    db.refresh(category)
     return category
 
 
 @router.delete("/{category_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_category(
+async def delete_category(
     category_id: int,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    db: DBSession = Depends(get_session),
+    current_user: Principal = Depends(get_current_user),
 ):
-    category = (
-        db.query(Category)
-        .filter(
-            Category.id == category_id,
-            Category.user_id == current_user.id,
-        )
-        .first()
+    deleted = await run_db(
+        db, category_service.delete_category, current_user.id, category_id
     )
-    if not category:
+    if not deleted:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Category not found"
         )
-
-    db.delete(category)
-    db.commit()
     return None
@@ -0,0 +1,26 @@
+from fastapi import APIRouter, Depends
+
+from app.api.deps import require_operator
+from app.db.pool_metrics import pool_stats
+from app.db.session import replica_router
+
+router = APIRouter()
+
+
+@router.get("/pool", dependencies=[Depends(require_operator)])
+async def get_pool_stats():
+    """
+    Live state of each connection pool (size, checked out, overflow) and
+    counters since startup: checkouts, wait and connect times in ms,
+    timeouts and invalidated connections.
+    """
+    return pool_stats()
+
+
+@router.get("/replicas", dependencies=[Depends(require_operator)])
+async def get_replica_stats():
+    """
+    Configured read replicas, the ones currently in rotation, and how many
+    users are pinned to the primary after a recent write.
+    """
+    return replica_router.stats()
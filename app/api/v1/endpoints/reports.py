@@ -1,31 +1,136 @@
 from datetime import datetime
 from typing import Optional
 
-from fastapi import APIRouter, Depends, Query
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from fastapi.concurrency import run_in_threadpool
 
-from app.api.deps import get_db, get_current_user
-from app.models.user import User
-from app.schemas.report import ReportSummary
-from app.services.report_service import generate_report
+from app.api.deps import DBSession, get_current_user, get_read_session, run_db
+from app.api.etag import DataETag, data_etag
+from app.api.responses import FastJSONResponse
+from app.core.config import settings
+from app.schemas.report import (
+    ReportJobCreate,
+    ReportJobRead,
+    ReportSummary,
+    TimeSeriesReport,
+)
+from app.services.principal_cache import Principal
+from app.services.report_cache import report_cache
+from app.services.report_jobs import job_read, report_jobs
+from app.services.report_service import generate_report, generate_timeseries
 
 router = APIRouter()
 
 
 @router.get("/summary", response_model=ReportSummary)
-def get_summary_report(
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+async def get_summary_report(
+    db: DBSession = Depends(get_read_session),
+    current_user: Principal = Depends(get_current_user),
     date_from: Optional[datetime] = Query(None),
     date_to: Optional[datetime] = Query(None),
+    etag: DataETag = Depends(data_etag),
 ):
     """
     General summary endpoint, can be used for monthly/yearly reports or chart data.
     Pass date_from/date_to from frontend as needed.
+    Supports If-None-Match with the returned ETag.
     """
-    return generate_report(
-        db=db,
-        user_id=current_user.id,
-        date_from=date_from,
-        date_to=date_to,
+    report = await report_cache.get_or_compute_async(
+        (current_user.id, date_from, date_to),
+        etag.data_version,
+        lambda: run_db(
+            db,
+            generate_report,
+            user_id=current_user.id,
+            date_from=date_from,
+            date_to=date_to,
+        ),
     )
+    # Built and validated by the report service; skip re-validation.
+    return FastJSONResponse(report, headers=etag.headers())
+
+
+@router.get("/timeseries", response_model=TimeSeriesReport)
+async def get_timeseries_report(
+    db: DBSession = Depends(get_read_session),
+    current_user: Principal = Depends(get_current_user),
+    granularity: str = Query("month", regex="^(day|week|month)$"),
+    date_from: Optional[datetime] = Query(None),
+    date_to: Optional[datetime] = Query(None),
+    by_category: bool = Query(False),
+    etag: DataETag = Depends(data_etag),
+):
+    """
+    Income/expense/net per day, week (Monday start) or month bucket,
+    for trend charts. Set by_category to split each bucket by category.
+    Supports If-None-Match with the returned ETag.
+    """
+    report = await report_cache.get_or_compute_async(
+        (
+            current_user.id,
+            "timeseries",
+            granularity,
+            date_from,
+            date_to,
+            by_category,
+        ),
+        etag.data_version,
+        lambda: run_db(
+            db,
+            generate_timeseries,
+            user_id=current_user.id,
+            granularity=granularity,
+            date_from=date_from,
+            date_to=date_to,
+            by_category=by_category,
+        ),
+    )
+    return FastJSONResponse(report, headers=etag.headers())
+
+
+@router.post(
+    "/jobs", response_model=ReportJobRead, status_code=status.HTTP_202_ACCEPTED
+)
+async def submit_report_job(
+    job_in: ReportJobCreate,
+    request: Request,
+    response: Response,
+    current_user: Principal = Depends(get_current_user),
+):
+    """
+    Run a report in the background, for ranges too large to wait for.
+    Poll the URL in the Location header (optionally with ?wait=) for the
+    result, which is kept for REPORT_JOB_RESULT_TTL_SECONDS.
+    """
+    job = await run_in_threadpool(report_jobs.submit, current_user.id, job_in)
+    if job is None:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Too many report jobs in progress",
+        )
+    response.headers["Location"] = str(request.url_for("get_report_job", job_id=job.id))
+    return job_read(job)
+
+
+@router.get("/jobs/{job_id}", response_model=ReportJobRead)
+async def get_report_job(
+    job_id: str,
+    current_user: Principal = Depends(get_current_user),
+    wait: float = Query(
+        0,
+        ge=0,
+        description="Seconds to wait for the job to finish "
+        "(capped at REPORT_JOB_MAX_WAIT_SECONDS)",
+    ),
+):
+    """
+    Status of a report job, with the report once it is done.
+    """
+    job = await report_jobs.wait(
+        current_user.id, job_id, min(wait, settings.REPORT_JOB_MAX_WAIT_SECONDS)
+    )
+    if job is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Report job not found"
+        )
+    return job_read(job)
@@ -1,77 +1,232 @@
 from datetime import datetime
-from typing import List, Optional
+from typing import Optional
 
-from fastapi import APIRouter, Depends, HTTPException, Query, status
-from sqlalchemy.orm import Session
+from fastapi import (
+    APIRouter,
+    Depends,
+    File,
+    HTTPException,
+    Query,
+    UploadFile,
+    status,
+)
+from fastapi.responses import StreamingResponse
 
-from app.api.deps import get_db, get_current_user
-from app.models.transaction import Transaction
-from app.models.user import User
+from app.api.deps import (
+    DBSession,
+    get_current_user,
+    get_read_session,
+    get_session,
+    run_db,
+)
+from app.api.etag import DataETag, data_etag
+from app.api.fields import parse_fields
+from app.api.pagination import decode_cursor, encode_cursor
+from app.api.responses import FastJSONResponse, rows_to_dicts
+from app.core.config import settings
 from app.schemas.transaction import (
+    TransactionBatchRequest,
+    TransactionBatchResult,
     TransactionCreate,
+    TransactionImportResult,
+    TransactionPage,
     TransactionRead,
+    TransactionSearchPage,
     TransactionUpdate,
 )
+from app.services import search_service, transaction_service
+from app.services.batch_service import apply_batch
+from app.services.export_service import (
+    astream_csv,
+    astream_ndjson,
+    export_stmt,
+    stream_csv,
+    stream_ndjson,
+)
+from app.services.import_service import import_transactions
+from app.services.principal_cache import Principal
 
 router = APIRouter()
 
+EXPORT_MEDIA_TYPES = {
+    "csv": "text/csv",
+    "ndjson": "application/x-ndjson",
+}
+
 
 @router.post("/", response_model=TransactionRead)
-def create_transaction(
+async def create_transaction(
     tx_in: TransactionCreate,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    db: DBSession = Depends(get_session),
+    current_user: Principal = Depends(get_current_user),
 ):
-    tx = Transaction(
-        amount=tx_in.amount,
-        type=tx_in.type,
-        description=tx_in.description,
-        date=tx_in.date or datetime.utcnow(),
-        category_id=tx_in.category_id,
-        user_id=current_user.id,
+    return await run_db(
+        db, transaction_service.create_transaction, current_user.id, tx_in
     )
-    db.add(tx)
-    db.commit()
-    db.refresh(tx)
-    return tx
 
 
-@router.get("/", response_model=List[TransactionRead])
-def list_transactions(
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+@router.get("/", response_model=TransactionPage)
+async def list_transactions(
+    db: DBSession = Depends(get_read_session),
+    current_user: Principal = Depends(get_current_user),
     type: Optional[str] = Query(None, description="income or expense"),
     category_id: Optional[int] = None,
     date_from: Optional[datetime] = None,
     date_to: Optional[datetime] = None,
+    limit: int = Query(50, ge=1, le=500),
+    cursor: Optional[str] = Query(
+        None, description="next_cursor from the previous page"
+    ),
+    fields: Optional[str] = Query(
+        None,
+        description="Comma-separated columns to return, e.g. id,date,amount",
+    ),
+    etag: DataETag = Depends(data_etag),
+):
+    """
+    Keyset-paginated listing ordered by (date, id) descending.
+    Follow next_cursor until it is null to walk the full history.
+
+    Rows are selected as column tuples and encoded with orjson directly;
+    response_model only documents the shape. With fields= only those
+    columns are selected and returned. Send the ETag back as
+    If-None-Match to get a 304 while nothing has changed.
+    """
+    fields = parse_fields(fields, list(TransactionRead.__fields__))
+    rows, has_more = await run_db(
+        db,
+        transaction_service.list_transactions,
+        current_user.id,
+        type=type,
+        category_id=category_id,
+        date_from=date_from,
+        date_to=date_to,
+        limit=limit,
+        after=decode_cursor(cursor) if cursor else None,
+        fields=fields,
+    )
+
+    next_cursor = None
+    if has_more:
+        next_cursor = encode_cursor(rows[-1].date, rows[-1].id)
+
+    return FastJSONResponse(
+        {"items": rows_to_dicts(rows, fields), "next_cursor": next_cursor},
+        headers=etag.headers(),
+    )
+
+
+@router.get("/export")
+async def export_transactions(
+    current_user: Principal = Depends(get_current_user),
+    format: str = Query("csv", regex="^(csv|ndjson)$"),
+    type: Optional[str] = Query(None, description="income or expense"),
+    category_id: Optional[int] = None,
+    date_from: Optional[datetime] = None,
+    date_to: Optional[datetime] = None,
+):
+    """
+    Stream every matching transaction as CSV or NDJSON.
+    Rows are read from a server-side cursor and encoded chunk by chunk,
+    so memory stays flat regardless of history size.
+    """
+    stmt = transaction_service.apply_filters(
+        export_stmt(current_user.id), type, category_id, date_from, date_to
+    )
+    if settings.DB_ASYNC:
+        body = astream_csv(stmt) if format == "csv" else astream_ndjson(stmt)
+    else:
+        body = stream_csv(stmt) if format == "csv" else stream_ndjson(stmt)
+    return StreamingResponse(
+        body,
+        media_type=EXPORT_MEDIA_TYPES[format],
+        headers={
+            "Content-Disposition": f"attachment; filename=transactions.{format}"
+        },
+    )
+
+
+@router.get("/search", response_model=TransactionSearchPage)
+async def search_transactions(
+    # At least one non-blank character; blank queries would match everything.
+    q: str = Query(..., min_length=1, max_length=200, regex=r"^\s*\S"),
+    limit: int = Query(20, ge=1, le=100),
+    offset: int = Query(0, ge=0),
+    db: DBSession = Depends(get_read_session),
+    current_user: Principal = Depends(get_current_user),
+    etag: DataETag = Depends(data_etag),
 ):
-    q = db.query(Transaction).filter(Transaction.user_id == current_user.id)
+    """
+    Full-text search over descriptions, best match first. Matches whole
+    words as well as substrings (and, on PostgreSQL, close misspellings).
+    Page with offset=next_offset until it is null.
+    """
+    rows, has_more = await run_db(
+        db,
+        search_service.search_transactions,
+        current_user.id,
+        q,
+        limit=limit,
+        offset=offset,
+    )
+    return FastJSONResponse(
+        {
+            "items": rows_to_dicts(rows),
+            "next_offset": offset + limit if has_more else None,
+        },
+        headers=etag.headers(),
+    )
 
-    if type:
-        q = q.filter(Transaction.type == type)
-    if category_id:
-        q = q.filter(Transaction.category_id == category_id)
-    if date_from:
-        q = q.filter(Transaction.date >= date_from)
-    if date_to:
-        q = q.filter(Transaction.date <= date_to)
 
-    return q.order_by(Transaction.date.desc()).all()
+@router.post("/import", response_model=TransactionImportResult)
+async def import_transactions_file(
+    file: UploadFile = File(...),
+    format: Optional[str] = Query(
+        None,
+        regex="^(csv|ndjson)$",
+        description="Defaults from the file extension (.ndjson/.jsonl or csv)",
+    ),
+    db: DBSession = Depends(get_session),
+    current_user: Principal = Depends(get_current_user),
+):
+    """
+    Bulk import transactions from a CSV or NDJSON upload.
+    Valid rows are loaded in one transaction; invalid rows are reported.
+    """
+    if format is None:
+        name = (file.filename or "").lower()
+        format = "ndjson" if name.endswith((".ndjson", ".jsonl")) else "csv"
+    try:
+        return await run_db(
+            db, import_transactions, current_user.id, file.file, format
+        )
+    except ValueError as exc:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc)
+        )
+
+
+@router.post("/batch", response_model=TransactionBatchResult)
+async def batch_transactions(
+    batch_in: TransactionBatchRequest,
+    db: DBSession = Depends(get_session),
+    current_user: Principal = Depends(get_current_user),
+):
+    """
+    Apply many create/update/delete operations in one request and one
+    database transaction. Returns a result for every operation, in order.
+    """
+    return await run_db(db, apply_batch, current_user.id, batch_in)
 
 
 @router.get("/{transaction_id}", response_model=TransactionRead)
-def get_transaction(
+async def get_transaction(
     transaction_id: int,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    db: DBSession = Depends(get_session),
+    current_user: Principal = Depends(get_current_user),
 ):
-    tx = (
-        db.query(Transaction)
-        .filter(
-            Transaction.id == transaction_id,
-            Transaction.user_id == current_user.id,
-        )
-        .first()
+    tx = await run_db(
+        db, transaction_service.get_transaction, current_user.id, transaction_id
     )
     if not tx:
         raise HTTPException(
@@ -82,54 +237,42 @@ def get_transaction(
 
 
 @router.put("/{transaction_id}", response_model=TransactionRead)
-def update_transaction(
+async def update_transaction(
     transaction_id: int,
     tx_in: TransactionUpdate,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    db: DBSession = Depends(get_session),
+    current_user: Principal = Depends(get_current_user),
 ):
-    tx = (
-        db.query(Transaction)
-        .filter(
-            Transaction.id == transaction_id,
-            Transaction.user_id == current_user.id,
-        )
-        .first()
+    tx = await run_db(
+        db,
+        transaction_service.update_transaction,
+        current_user.id,
+        transaction_id,
+        tx_in,
     )
     if not tx:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Transaction not found",
         )
-
-    for field, value in tx_in.dict(exclude_unset=True).items():
-        setattr(tx, field, value)
-
-    db.commit()
-    db.refresh(tx)
     return tx
 
 
 @router.delete("/{transaction_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_transaction(
+async def delete_transaction(
     transaction_id: int,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    db: DBSession = Depends(get_session),
+    current_user: Principal = Depends(get_current_user),
 ):
-    tx = (
-        db.query(Transaction)
-        .filter(
-            Transaction.id == transaction_id,
-            Transaction.user_id == current_user.id,
-        )
-        .first()
+    deleted = await run_db(
+        db,
+        transaction_service.delete_transaction,
+        current_user.id,
+        transaction_id,
     )
-    if not tx:
+    if not deleted:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Transaction not found",
         )
-
-    db.delete(tx)
-    db.commit()
     return None
@@ -1,15 +1,21 @@
 from fastapi import APIRouter, Depends
 from sqlalchemy.orm import Session
 
-from app.api.deps import get_db, get_current_user
+from app.api.deps import DBSession, get_current_user, get_session, run_db
 from app.models.user import User
 from app.schemas.user import UserRead
+from app.services.principal_cache import Principal
 
 router = APIRouter()
 
 
+def _get_user(db: Session, user_id: int) -> User:
+    return db.get(User, user_id)
+
+
 @router.get("/me", response_model=UserRead)
-def read_users_me(
-    current_user: User = Depends(get_current_user), db: Session = Depends(get_db)
+async def read_users_me(
+    current_user: Principal = Depends(get_current_user),
+    db: DBSession = Depends(get_session),
 ):
-    return current_user
+    return await run_db(db, _get_user, current_user.id)
@@ -1,6 +1,14 @@
 from fastapi import APIRouter
 
-from app.api.v1.endpoints import auth, users, categories, transactions, reports
+from app.api.v1.endpoints import (
+    auth,
+    users,
+    categories,
+    transactions,
+    reports,
+    budgets,
+    internal,
+)
 
 api_router = APIRouter()
 api_router.include_router(auth.router, prefix="/auth", tags=["Auth"])
@@ -12,3 +20,5 @@ api_router.include_router(
     transactions.router, prefix="/transactions", tags=["Transactions"]
 )
 api_router.include_router(reports.router, prefix="/reports", tags=["Reports"])
+api_router.include_router(budgets.router, prefix="/budgets", tags=["Budgets"])
+api_router.include_router(internal.router, prefix="/internal", tags=["Internal"])
@@ -18,6 +18,10 @@ if "access_token" not in st.session_state:
 if "current_user" not in st.session_state:
     st.session_state.current_user = None
 
+# (url, params) -> last 200 response, revalidated with its ETag.
+if "etag_cache" not in st.session_state:
+    st.session_state.etag_cache = {}
+
 
 def get_auth_headers():
     if st.session_state.access_token:
@@ -25,6 +29,24 @@ def get_auth_headers():
     return {}
 
 
+def cached_get(url: str, params: dict | None = None):
+    """
+    GET that sends If-None-Match for a previously seen response and
+    reuses it when the API answers 304 Not Modified.
+    """
+    key = (url, tuple(sorted((params or {}).items())))
+    headers = get_auth_headers()
+    cached = st.session_state.etag_cache.get(key)
+    if cached is not None and cached.headers.get("ETag"):
+        headers["If-None-Match"] = cached.headers["ETag"]
+    resp = requests.get(url, headers=headers, params=params)
+    if resp.status_code == 304 and cached is not None:
+        return cached
+    if resp.status_code == 200 and resp.headers.get("ETag"):
+        st.session_state.etag_cache[key] = resp
+    return resp
+
+
 # ===========================
 # AUTH API CALLS
 # ===========================
@@ -54,8 +76,7 @@ def api_get_me():
 # ===========================
 def api_list_categories():
     url = f"{API_BASE_URL}/categories/"
-    resp = requests.get(url, headers=get_auth_headers())
-    return resp
+    return cached_get(url)
 
 
 def api_create_category(name: str, type_: str):
@@ -85,11 +106,35 @@ def api_delete_category(category_id: int):
 # ===========================
 # TRANSACTION API CALLS
 # ===========================
+# Columns shown in the transactions table.
+TRANSACTION_TABLE_FIELDS = "id,date,type,amount,category_id,description"
+
+
+# Page size used to walk the full list; the API's maximum.
+TRANSACTION_PAGE_LIMIT = 500
+
+
 def api_list_transactions(filters: dict | None = None):
+    """
+    All transactions matching filters, following next_cursor page by page.
+    Returns (items, response); items is None if a page request failed.
+    """
     url = f"{API_BASE_URL}/transactions/"
-    params = filters or {}
-    resp = requests.get(url, headers=get_auth_headers(), params=params)
-    return resp
+    params = {
+        "fields": TRANSACTION_TABLE_FIELDS,
+        "limit": TRANSACTION_PAGE_LIMIT,
+        **(filters or {}),
+    }
+    items = []
+    while True:
+        resp = cached_get(url, params)
+        if resp.status_code != 200:
+            return None, resp
+        page = resp.json()
+        items.extend(page["items"])
+        if not page["next_cursor"]:
+            return items, resp
+        params = {**params, "cursor": page["next_cursor"]}
 
 
 def api_create_transaction(amount: float, type_: str, description: str | None,
@@ -118,6 +163,14 @@ def api_delete_transaction(transaction_id: int):
     return resp
 
 
+def api_batch_transactions(operations: list, atomic: bool = False):
+    # operations: [{"op": "create"|"update"|"delete", "id": ..., "data": {...}}]
+    url = f"{API_BASE_URL}/transactions/batch"
+    payload = {"operations": operations, "atomic": atomic}
+    resp = requests.post(url, json=payload, headers=get_auth_headers())
+    return resp
+
+
 # ===========================
 # REPORT API CALL
 # ===========================
@@ -129,8 +182,19 @@ def api_get_summary(date_from: datetime | None = None,
         params["date_from"] = date_from.isoformat()
     if date_to:
         params["date_to"] = date_to.isoformat()
-    resp = requests.get(url, headers=get_auth_headers(), params=params)
-    return resp
+    return cached_get(url, params)
+
+
+def api_get_timeseries(granularity: str = "month",
+                       date_from: datetime | None = None,
+                       date_to: datetime | None = None):
+    url = f"{API_BASE_URL}/reports/timeseries"
+    params = {"granularity": granularity}
+    if date_from:
+        params["date_from"] = date_from.isoformat()
+    if date_to:
+        params["date_to"] = date_to.isoformat()
+    return cached_get(url, params)
 
 
 # ===========================
@@ -366,14 +430,31 @@ def page_transactions():
         if f_to:
             filters["date_to"] = datetime.combine(f_to, datetime.max.time()).isoformat()
 
-    list_resp = api_list_transactions(filters)
-    if list_resp.status_code == 200:
-        txs = list_resp.json()
+    txs, list_resp = api_list_transactions(filters)
+    if txs is not None:
         if not txs:
             st.info("No transactions found for selected filters.")
         else:
             df = pd.DataFrame(txs)
             st.dataframe(df)
+
+            with st.expander("Delete Transactions"):
+                selected_ids = st.multiselect(
+                    "Select Transaction IDs", [t["id"] for t in txs]
+                )
+                if st.button("Delete Selected") and selected_ids:
+                    # One request for all rows; none is deleted if any fails.
+                    resp_d = api_batch_transactions(
+                        [{"op": "delete", "id": tx_id} for tx_id in selected_ids],
+                        atomic=True,
+                    )
+                    if resp_d.status_code == 200 and resp_d.json()["committed"]:
+                        st.success(f"Deleted {len(selected_ids)} transactions. Refresh page.")
+                    elif resp_d.status_code == 200:
+                        errors = [r["error"] for r in resp_d.json()["results"] if not r["ok"]]
+                        st.error(f"Delete failed: {'; '.join(errors)}")
+                    else:
+                        st.error(f"Delete failed: {resp_d.status_code} - {resp_d.text}")
     else:
         st.error(f"Failed to fetch transactions: {list_resp.status_code} - {list_resp.text}")
 
@@ -419,6 +500,14 @@ def page_reports():
         else:
             st.error(f"Failed to load summary: {resp.status_code} - {resp.text}")
 
+        ts_resp = api_get_timeseries("month", date_from=date_from, date_to=date_to)
+        if ts_resp.status_code == 200 and ts_resp.json()["points"]:
+            ts_df = pd.DataFrame(ts_resp.json()["points"])
+            st.markdown("**Monthly Trend**")
+            st.line_chart(
+                ts_df.set_index("period_start")[["total_income", "total_expense", "net"]]
+            )
+
 
 # ===========================
 # MAIN APP LAYOUT
@@ -432,6 +521,7 @@ def main():
         if st.sidebar.button("Logout"):
             st.session_state.access_token = None
             st.session_state.current_user = None
+            st.session_state.etag_cache = {}
             st.experimental_rerun()
     else:
         st.sidebar.info("Not logged in")
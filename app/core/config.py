@@ -1,14 +1,27 @@
 import os
 from functools import lru_cache
+from typing import List, Optional
 from dotenv import load_dotenv
 from pydantic import BaseSettings
 
 # Load .env if present
 load_dotenv()
 
+
+def _optional_int(name: str) -> Optional[int]:
+    value = os.getenv(name)
+    return int(value) if value else None
+
+
+def _asyncpg_uri(url: str) -> str:
+    return url.replace("postgresql://", "postgresql+asyncpg://", 1)
+
+
 class Settings(BaseSettings):
     PROJECT_NAME: str = "Expense Tracker API"
     ENVIRONMENT: str = "local"
+    # Per-request query logging and the X-DB-Queries response header.
+    DEBUG: bool = os.getenv("DEBUG", "false").lower() == "true"
 
     POSTGRES_USER: str = os.getenv("POSTGRES_USER", "expense_user")
     POSTGRES_PASSWORD: str = os.getenv("POSTGRES_PASSWORD", "expense_password")
@@ -20,6 +33,67 @@ class Settings(BaseSettings):
     JWT_ALGORITHM: str = os.getenv("JWT_ALGORITHM", "HS256")
     ACCESS_TOKEN_EXPIRE_MINUTES: int = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", 60))
 
+    # Argon2 cost parameters; unset means the passlib defaults. Hashes made
+    # with other parameters are upgraded on the user's next login.
+    ARGON2_TIME_COST: Optional[int] = _optional_int("ARGON2_TIME_COST")
+    ARGON2_MEMORY_COST: Optional[int] = _optional_int("ARGON2_MEMORY_COST")  # KiB
+    ARGON2_PARALLELISM: Optional[int] = _optional_int("ARGON2_PARALLELISM")
+
+    # Process pool for Argon2 work; 0 workers hashes inline in the caller.
+    PASSWORD_HASH_WORKERS: int = int(os.getenv("PASSWORD_HASH_WORKERS", os.cpu_count() or 1))
+    # Hashing jobs allowed to queue or run before callers get a 503.
+    PASSWORD_HASH_MAX_PENDING: int = int(os.getenv("PASSWORD_HASH_MAX_PENDING", 4 * (os.cpu_count() or 1)))
+    PASSWORD_HASH_RETRY_AFTER_SECONDS: int = int(os.getenv("PASSWORD_HASH_RETRY_AFTER_SECONDS", 1))
+
+    TOKEN_CACHE_MAX_ENTRIES: int = int(os.getenv("TOKEN_CACHE_MAX_ENTRIES", 10000))
+    PRINCIPAL_CACHE_TTL_SECONDS: int = int(os.getenv("PRINCIPAL_CACHE_TTL_SECONDS", 60))
+    PRINCIPAL_CACHE_MAX_ENTRIES: int = int(os.getenv("PRINCIPAL_CACHE_MAX_ENTRIES", 10000))
+
+    # "sql" aggregates in the database, "pandas" loads rows into a DataFrame
+    REPORT_ENGINE: str = os.getenv("REPORT_ENGINE", "sql")
+
+    REPORT_CACHE_ENABLED: bool = os.getenv("REPORT_CACHE_ENABLED", "true").lower() == "true"
+    REPORT_CACHE_MAX_ENTRIES: int = int(os.getenv("REPORT_CACHE_MAX_ENTRIES", 1024))
+    REPORT_CACHE_TTL_SECONDS: int = int(os.getenv("REPORT_CACHE_TTL_SECONDS", 300))
+
+    # Background report jobs (POST /reports/jobs). "memory" keeps the queue
+    # in this process; "database" keeps it in the report_jobs table, which
+    # is needed when several API processes serve the same users.
+    REPORT_JOB_BACKEND: str = os.getenv("REPORT_JOB_BACKEND", "memory")
+    # Worker threads per process; 0 only queues jobs for other processes.
+    REPORT_JOB_WORKERS: int = int(os.getenv("REPORT_JOB_WORKERS", 2))
+    REPORT_JOB_MAX_RUNNING_PER_USER: int = int(os.getenv("REPORT_JOB_MAX_RUNNING_PER_USER", 1))
+    # Queued plus running jobs a user may have before submits get a 429.
+    REPORT_JOB_MAX_PENDING_PER_USER: int = int(os.getenv("REPORT_JOB_MAX_PENDING_PER_USER", 5))
+    REPORT_JOB_RESULT_TTL_SECONDS: int = int(os.getenv("REPORT_JOB_RESULT_TTL_SECONDS", 3600))
+    # A job running longer than this is failed (hung, or its process died).
+    REPORT_JOB_TIMEOUT_SECONDS: int = int(os.getenv("REPORT_JOB_TIMEOUT_SECONDS", 600))
+    # Upper bound of the ?wait= long-poll on GET /reports/jobs/{id}.
+    REPORT_JOB_MAX_WAIT_SECONDS: int = int(os.getenv("REPORT_JOB_MAX_WAIT_SECONDS", 30))
+
+    # Serve requests through the asyncpg engine and AsyncSession instead of
+    # the psycopg2 engine on the threadpool.
+    DB_ASYNC: bool = os.getenv("DB_ASYNC", "false").lower() == "true"
+
+    # Connection pool, applied to the sync and async engines alike.
+    # Size it so workers x (DB_POOL_SIZE + DB_MAX_OVERFLOW) stays under
+    # the server's max_connections.
+    DB_POOL_SIZE: int = int(os.getenv("DB_POOL_SIZE", 5))
+    DB_MAX_OVERFLOW: int = int(os.getenv("DB_MAX_OVERFLOW", 10))
+    DB_POOL_TIMEOUT: float = float(os.getenv("DB_POOL_TIMEOUT", 30))  # seconds
+    DB_POOL_RECYCLE: int = int(os.getenv("DB_POOL_RECYCLE", 1800))  # seconds, -1 = never
+    DB_POOL_PRE_PING: bool = os.getenv("DB_POOL_PRE_PING", "true").lower() == "true"
+
+    # Comma-separated postgresql:// URLs of read replicas. Empty means all
+    # reads go to the primary.
+    DB_REPLICA_URLS: str = os.getenv("DB_REPLICA_URLS", "")
+    # A replica that failed a connection is skipped for this long.
+    DB_REPLICA_RETRY_SECONDS: int = int(os.getenv("DB_REPLICA_RETRY_SECONDS", 30))
+
+    # Bearer token for GET /metrics and the /api/v1/internal/ routes
+    # ("Authorization: Bearer <token>"). They are off while it is unset.
+    METRICS_TOKEN: str = os.getenv("METRICS_TOKEN", "")
+
     @property
     def SQLALCHEMY_DATABASE_URI(self) -> str:
         return (
@@ -27,6 +101,18 @@ class Settings(BaseSettings):
             f"@{self.POSTGRES_SERVER}:{self.POSTGRES_PORT}/{self.POSTGRES_DB}"
         )
 
+    @property
+    def SQLALCHEMY_ASYNC_DATABASE_URI(self) -> str:
+        return _asyncpg_uri(self.SQLALCHEMY_DATABASE_URI)
+
+    @property
+    def REPLICA_DATABASE_URIS(self) -> List[str]:
+        return [url.strip() for url in self.DB_REPLICA_URLS.split(",") if url.strip()]
+
+    @property
+    def REPLICA_ASYNC_DATABASE_URIS(self) -> List[str]:
+        return [_asyncpg_uri(url) for url in self.REPLICA_DATABASE_URIS]
+
 @lru_cache()
 def get_settings() -> Settings:
     return Settings()
@@ -0,0 +1,346 @@
+"""
+In-process metrics in the Prometheus text format.
+
+MetricsMiddleware records latency, status and in-flight counts per route.
+instrument_statements() hooks an engine's cursor events so DB statements
+and DB time are attributed to the request that ran them, and observe()
+times other expensive steps (Argon2, report generation).
+"""
+import bisect
+import collections
+import contextvars
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.core.config import settings
+from app.core.logging_config import logger
+
+LabelValues = Tuple[str, ...]
+
+DEFAULT_BUCKETS = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: Sequence[str], values: LabelValues, extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _number(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _header(self) -> List[str]:
+        return [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.kind}",
+        ]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, *labels: str, amount: float = 1) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def render(self) -> List[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return self._header() + [
+            f"{self.name}{_labels(self.labelnames, labels)} {_number(value)}"
+            for labels, value in items
+        ]
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def dec(self, *labels: str, amount: float = 1) -> None:
+        self.inc(*labels, amount=-amount)
+
+    def set(self, *labels: str, value: float) -> None:
+        with self._lock:
+            self._values[labels] = value
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, *args, buckets: Sequence[float] = DEFAULT_BUCKETS, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.buckets = tuple(sorted(buckets))
+        # labels -> (per-bucket counts, +Inf bucket last; sum)
+        self._values: Dict[LabelValues, Tuple[List[int], List[float]]] = {}
+
+    def observe(self, value: float, *labels: str) -> None:
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            entry = self._values.get(labels)
+            if entry is None:
+                entry = self._values[labels] = ([0] * (len(self.buckets) + 1), [0.0])
+            entry[0][index] += 1
+            entry[1][0] += value
+
+    def render(self) -> List[str]:
+        with self._lock:
+            items = sorted(
+                (labels, list(counts), total[0])
+                for labels, (counts, total) in self._values.items()
+            )
+        lines = self._header()
+        for labels, counts, total in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                le = _labels(self.labelnames, labels, f'le="{_number(bound)}"')
+                lines.append(f"{self.name}_bucket{le} {cumulative}")
+            plain = _labels(self.labelnames, labels)
+            lines.append(f"{self.name}_sum{plain} {_number(total)}")
+            lines.append(f"{self.name}_count{plain} {cumulative}")
+        return lines
+
+
+class MetricsRegistry:
+    def __init__(self) -> None:
+        self._metrics: List[_Metric] = []
+
+    def register(self, metric: _Metric) -> _Metric:
+        self._metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+
+http_requests_total = registry.register(
+    Counter(
+        "http_requests_total",
+        "HTTP requests by route and status code.",
+        ("method", "route", "status"),
+    )
+)
+http_request_duration_seconds = registry.register(
+    Histogram(
+        "http_request_duration_seconds",
+        "HTTP request latency by route, until the response is fully sent.",
+        ("method", "route"),
+    )
+)
+http_requests_in_progress = registry.register(
+    Gauge("http_requests_in_progress", "HTTP requests being served.", ("method",))
+)
+db_statements_per_request = registry.register(
+    Histogram(
+        "db_statements_per_request",
+        "SQL statements executed while serving a request.",
+        ("method", "route"),
+        buckets=(0, 1, 2, 3, 5, 10, 20, 50, 100),
+    )
+)
+db_time_per_request_seconds = registry.register(
+    Histogram(
+        "db_time_per_request_seconds",
+        "Time spent executing SQL statements while serving a request.",
+        ("method", "route"),
+    )
+)
+operation_duration_seconds = registry.register(
+    Histogram(
+        "operation_duration_seconds",
+        "Time spent in expensive in-process steps such as password hashing "
+        "and report generation.",
+        ("operation",),
+    )
+)
+report_cache_lookups_total = registry.register(
+    Counter(
+        "report_cache_lookups_total",
+        "Report cache lookups by result (hit or miss).",
+        ("result",),
+    )
+)
+report_cache_entries = registry.register(
+    Gauge("report_cache_entries", "Entries held by the in-process report cache.")
+)
+
+
+class RequestDBStats:
+    __slots__ = ("statements", "seconds", "statement_counts")
+
+    def __init__(self, track_statements: bool = False) -> None:
+        self.statements = 0
+        self.seconds = 0.0
+        # SQL text -> executions, only kept when tracking (debug mode).
+        self.statement_counts: Optional[collections.Counter] = (
+            collections.Counter() if track_statements else None
+        )
+
+    def duplicates(self) -> Dict[str, int]:
+        """
+        Statements executed more than once, usually an N+1 pattern.
+        """
+        if not self.statement_counts:
+            return {}
+        return {sql: n for sql, n in self.statement_counts.items() if n > 1}
+
+
+# Set by the middleware for the duration of a request; copied into the
+# threadpool and run_sync, so the cursor hooks can find it there too.
+_request_db_stats: contextvars.ContextVar[Optional[RequestDBStats]] = (
+    contextvars.ContextVar("request_db_stats", default=None)
+)
+
+
+def current_db_stats() -> Optional[RequestDBStats]:
+    return _request_db_stats.get()
+
+
+@contextmanager
+def count_statements(track_statements: bool = True) -> Iterator[RequestDBStats]:
+    """
+    Count the statements run on instrumented engines inside the block,
+    e.g. around a service call in a test. Inside a request they are
+    counted here instead of in the request's stats.
+    """
+    stats = RequestDBStats(track_statements=track_statements)
+    token = _request_db_stats.set(stats)
+    try:
+        yield stats
+    finally:
+        _request_db_stats.reset(token)
+
+
+def instrument_statements(engine: Engine) -> None:
+    """
+    Attribute every statement run on `engine` (the sync engine of an
+    AsyncEngine) to the current request.
+    """
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("metrics_start", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        start = conn.info["metrics_start"].pop()
+        stats = _request_db_stats.get()
+        if stats is not None:
+            stats.statements += 1
+            stats.seconds += time.perf_counter() - start
+            if stats.statement_counts is not None:
+                stats.statement_counts[statement] += 1
+
+    @event.listens_for(engine, "handle_error")
+    def _on_error(context):
+        # after_cursor_execute does not run for failed statements.
+        if context.connection is not None:
+            starts = context.connection.info.get("metrics_start")
+            if starts:
+                starts.pop()
+
+
+@contextmanager
+def observe(operation: str) -> Iterator[None]:
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        operation_duration_seconds.observe(time.perf_counter() - start, operation)
+
+
+def _log_request_queries(method: str, path: str, stats: RequestDBStats) -> None:
+    duplicates = stats.duplicates()
+    message = "%s %s: %d queries, %.1f ms in DB"
+    args = [method, path, stats.statements, stats.seconds * 1000]
+    if not duplicates:
+        logger.info(message, *args)
+        return
+    message += ", duplicates:" + "".join("\n    %dx %s" for _ in duplicates)
+    for sql, n in sorted(duplicates.items(), key=lambda item: -item[1]):
+        args.extend((n, " ".join(sql.split())))
+    logger.warning(message, *args)
+
+
+class MetricsMiddleware:
+    """
+    ASGI middleware. Routes are labelled by their path template, so
+    /transactions/{tx_id} is one series; unmatched paths share one label.
+
+    With settings.DEBUG each request also logs its statement count and
+    repeated statements, and responses carry X-DB-Queries (statements
+    executed before the response started).
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        status_code = 500
+        debug = settings.DEBUG
+        stats = RequestDBStats(track_statements=debug)
+        token = _request_db_stats.set(stats)
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                if debug:
+                    message["headers"] = list(message.get("headers", [])) + [
+                        (b"x-db-queries", str(stats.statements).encode()),
+                    ]
+            await send(message)
+
+        http_requests_in_progress.inc(method)
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - start
+            _request_db_stats.reset(token)
+            http_requests_in_progress.dec(method)
+            route = scope.get("route")
+            path = getattr(route, "path", None) or "unmatched"
+            http_requests_total.inc(method, path, str(status_code))
+            http_request_duration_seconds.observe(elapsed, method, path)
+            db_statements_per_request.observe(stats.statements, method, path)
+            db_time_per_request_seconds.observe(stats.seconds, method, path)
+            if debug:
+                _log_request_queries(method, path, stats)
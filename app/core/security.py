@@ -1,44 +1,164 @@
+import asyncio
+import hashlib
+import multiprocessing
+import threading
+import time
+from concurrent.futures import Future, ProcessPoolExecutor
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Optional, Tuple
 
 from jose import jwt, JWTError
 from passlib.context import CryptContext
 
+from app.core.cache import LRUCache
 from app.core.config import settings
+from app.core.metrics import operation_duration_seconds
 
 # -----------------------------------------------------
 # PASSWORD HASHING — Using Argon2 (No length limits)
 # -----------------------------------------------------
+_argon2_settings = {
+    f"argon2__{name}": value
+    for name, value in (
+        ("time_cost", settings.ARGON2_TIME_COST),
+        ("memory_cost", settings.ARGON2_MEMORY_COST),
+        ("parallelism", settings.ARGON2_PARALLELISM),
+    )
+    if value is not None
+}
+
 pwd_context = CryptContext(
     schemes=["argon2"],
-    deprecated="auto"
+    deprecated="auto",
+    **_argon2_settings,
 )
 
+
+# Argon2 is deliberately slow, so the work runs on a process pool sized
+# to the CPU count instead of the request threads. The number of jobs
+# queued or running is bounded; past that callers get PasswordHashingBusy
+# (a 503 with Retry-After) instead of waiting behind a login burst.
+class PasswordHashingBusy(Exception):
+    def __init__(self, retry_after: int):
+        super().__init__("Password hashing queue is full")
+        self.retry_after = retry_after
+
+
+_hash_executor: Optional[ProcessPoolExecutor] = None
+_hash_slots = threading.BoundedSemaphore(settings.PASSWORD_HASH_MAX_PENDING)
+_hash_executor_lock = threading.Lock()
+
+
+def _get_hash_executor() -> ProcessPoolExecutor:
+    global _hash_executor
+    with _hash_executor_lock:
+        if _hash_executor is None:
+            _hash_executor = ProcessPoolExecutor(
+                max_workers=settings.PASSWORD_HASH_WORKERS,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return _hash_executor
+
+
+def shutdown_hash_executor() -> None:
+    global _hash_executor
+    with _hash_executor_lock:
+        if _hash_executor is not None:
+            _hash_executor.shutdown(wait=False, cancel_futures=True)
+            _hash_executor = None
+
+
+def _submit(fn, *args) -> Future:
+    operation = _OPERATION_NAMES[fn]
+    start = time.perf_counter()
+    if settings.PASSWORD_HASH_WORKERS <= 0:
+        future: Future = Future()
+        future.set_result(fn(*args))
+        operation_duration_seconds.observe(time.perf_counter() - start, operation)
+        return future
+
+    if not _hash_slots.acquire(blocking=False):
+        raise PasswordHashingBusy(settings.PASSWORD_HASH_RETRY_AFTER_SECONDS)
+    try:
+        future = _get_hash_executor().submit(fn, *args)
+    except Exception:
+        _hash_slots.release()
+        raise
+    future.add_done_callback(lambda _: _hash_slots.release())
+    # Includes the time spent queued behind other hashing jobs.
+    future.add_done_callback(
+        lambda _: operation_duration_seconds.observe(
+            time.perf_counter() - start, operation
+        )
+    )
+    return future
+
+
+# Executed inside the worker processes.
+def _hash(password: str) -> str:
+    return pwd_context.hash(password)
+
+
+def _verify_and_update(
+    plain_password: str, hashed_password: str
+) -> Tuple[bool, Optional[str]]:
+    return pwd_context.verify_and_update(plain_password, hashed_password)
+
+
+_OPERATION_NAMES = {_hash: "argon2_hash", _verify_and_update: "argon2_verify"}
+
+
 def get_password_hash(password: str) -> str:
     """
     Generate secure password hash using Argon2.
     """
-    return pwd_context.hash(password)
+    return _submit(_hash, password).result()
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """
     Verify password using Argon2.
     """
-    return pwd_context.verify(plain_password, hashed_password)
+    return _submit(_verify_and_update, plain_password, hashed_password).result()[0]
+
+
+async def get_password_hash_async(password: str) -> str:
+    """
+    Like get_password_hash, but awaits the pool without holding a thread.
+    """
+    return await asyncio.wrap_future(_submit(_hash, password))
+
+
+async def verify_and_update_password_async(
+    plain_password: str, hashed_password: str
+) -> Tuple[bool, Optional[str]]:
+    """
+    Verify a password; if the stored hash uses outdated parameters,
+    also return a fresh hash to store (otherwise None).
+    """
+    return await asyncio.wrap_future(
+        _submit(_verify_and_update, plain_password, hashed_password)
+    )
 
 
 # -----------------------------------------------------
 # JWT TOKEN CREATION
 # -----------------------------------------------------
-def create_access_token(subject: str, expires_delta: Optional[timedelta] = None) -> str:
+def create_access_token(
+    subject: str,
+    expires_delta: Optional[timedelta] = None,
+    user_id: Optional[int] = None,
+) -> str:
     """
     Generate JWT access token.
+    user_id, when given, is embedded as the "uid" claim.
     """
     if expires_delta is None:
         expires_delta = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
 
     expire = datetime.utcnow() + expires_delta
     payload = {"sub": subject, "exp": expire}
+    if user_id is not None:
+        payload["uid"] = user_id
 
     return jwt.encode(
         payload,
@@ -50,16 +170,54 @@ def create_access_token(subject: str, expires_delta: Optional[timedelta] = None)
 # -----------------------------------------------------
 # JWT TOKEN DECODING
 # -----------------------------------------------------
-def decode_access_token(token: str) -> Optional[str]:
+# Claims of tokens whose signature has already been verified, so each
+# token is verified once rather than on every request. Entries expire at
+# the token's own "exp".
+verified_token_cache = LRUCache(
+    max_entries=settings.TOKEN_CACHE_MAX_ENTRIES,
+    ttl_seconds=settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60,
+)
+
+
+def _token_cache_key(token: str) -> str:
+    # The key covers the secret and algorithm too, so rotating
+    # JWT_SECRET_KEY makes every previously verified token miss.
+    material = "\0".join(
+        (settings.JWT_SECRET_KEY, settings.JWT_ALGORITHM, token)
+    )
+    return hashlib.sha256(material.encode()).hexdigest()
+
+
+def decode_access_token_claims(token: str) -> Optional[dict]:
     """
-    Decode JWT and return subject (user ID/email).
+    Decode and verify JWT, returning all claims.
     """
+    key = _token_cache_key(token)
+    claims = verified_token_cache.get(key)
+    if claims is not None:
+        return dict(claims)
+
     try:
-        payload = jwt.decode(
+        claims = jwt.decode(
             token,
             settings.JWT_SECRET_KEY,
             algorithms=[settings.JWT_ALGORITHM]
         )
-        return payload.get("sub")
     except JWTError:
         return None
+
+    exp = claims.get("exp")
+    ttl = None if exp is None else exp - time.time()
+    if ttl is None or ttl > 0:
+        verified_token_cache.set(key, claims, ttl=ttl)
+    return dict(claims)
+
+
+def decode_access_token(token: str) -> Optional[str]:
+    """
+    Decode JWT and return subject (user ID/email).
+    """
+    payload = decode_access_token_claims(token)
+    if payload is None:
+        return None
+    return payload.get("sub")
@@ -0,0 +1,37 @@
+"""
+Bulk-loading helpers shared by the file importer and the seeding CLI.
+"""
+import csv
+import io
+from typing import Iterable, Sequence
+
+from sqlalchemy.orm import Session
+
+
+def can_copy(db: Session) -> bool:
+    """
+    True when the session's database accepts COPY through copy_rows.
+    """
+    dialect = db.get_bind().dialect
+    return dialect.name == "postgresql" and dialect.driver == "psycopg2"
+
+
+def copy_rows(
+    db: Session, table: str, columns: Sequence[str], rows: Iterable[Sequence]
+) -> None:
+    """
+    Load rows (value sequences in `columns` order, None for NULL) through
+    PostgreSQL COPY on the session's own connection, so they share the
+    surrounding transaction.
+    """
+    buf = io.StringIO()
+    writer = csv.writer(buf)
+    writer.writerows(rows)
+    buf.seek(0)
+
+    raw = db.connection().connection
+    with raw.cursor() as cur:
+        cur.copy_expert(
+            f"COPY {table} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)",
+            buf,
+        )
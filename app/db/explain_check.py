@@ -0,0 +1,411 @@
+"""
+EXPLAIN-based regression check for endpoint queries.
+
+Seeds a dataset, runs every read path of the transactions, categories,
+reports, budgets and report-job endpoints while capturing the SQL they
+emit, and EXPLAINs each captured SELECT with the planner's default
+settings. Each read path names the index its plans must use; the run
+fails when one of them is missing from the plans, or when a plan scans
+transactions or monthly_rollups sequentially.
+
+Seeded rows are always rolled back, but point --url at a scratch
+database: the check needs enough rows for the planner to prefer indexes,
+and seeding takes locks.
+
+Usage:
+    python -m app.db.explain_check                    # in-memory SQLite
+    python -m app.db.explain_check --url postgresql://user:pw@host/scratch
+"""
+import argparse
+import json
+import random
+import re
+import sys
+from datetime import datetime, timedelta
+from typing import Callable, List, Set, Tuple, Union
+
+from sqlalchemy import create_engine, event, insert
+from sqlalchemy.orm import Session
+
+from app.api.deps import load_principal_row
+from app.core.config import settings
+from app.core.security import create_access_token, decode_access_token_claims
+from app.db.base import Base
+from app.models.budget import Budget, BudgetAlert, BudgetPeriod
+from app.models.category import Category
+from app.models.monthly_rollup import MonthlyRollup
+from app.models.report_job import ReportJob
+from app.models.transaction import SEARCH_FTS_TABLE, Transaction
+from app.models.user import User
+from app.services import (
+    alert_service,
+    budget_service,
+    category_service,
+    report_jobs,
+    search_service,
+    transaction_service,
+)
+from app.services.data_version import get_data_version
+from app.services.export_service import export_stmt
+from app.services.report_service import generate_report, generate_timeseries
+from app.services.rollup_service import record_changes
+
+# Tables large enough that a sequential scan is always a regression.
+LARGE_TABLES = {Transaction.__tablename__, MonthlyRollup.__tablename__}
+
+ANALYZED_TABLES = {
+    User.__tablename__,
+    Category.__tablename__,
+    Transaction.__tablename__,
+    MonthlyRollup.__tablename__,
+    Budget.__tablename__,
+    BudgetPeriod.__tablename__,
+    BudgetAlert.__tablename__,
+    ReportJob.__tablename__,
+}
+
+DESCRIPTIONS = (None, "Coffee", "Groceries at market", "Rent", "Taxi to airport")
+
+# An expected index, or alternatives of which one must be used (e.g. the
+# PostgreSQL and SQLite search indexes). Primary keys are "<table>_pkey".
+Expected = Union[str, Tuple[str, ...]]
+
+
+def seed(db: Session, users: int, per_user: int) -> List[User]:
+    rng = random.Random(42)
+    start = datetime(2022, 1, 1)
+    seeded = []
+    for n in range(users):
+        user = User(email=f"explain-{n}@example.com", hashed_password="x")
+        db.add(user)
+        db.flush()
+        cats = [
+            Category(name=f"cat-{i}", type="expense", user_id=user.id)
+            for i in range(5)
+        ]
+        db.add_all(cats)
+        db.flush()
+        rows = [
+            {
+                "amount": round(rng.uniform(1, 500), 2),
+                "type": rng.choice(("income", "expense")),
+                "description": rng.choice(DESCRIPTIONS),
+                "date": start + timedelta(minutes=rng.randint(0, 60 * 24 * 900)),
+                "category_id": rng.choice(cats).id,
+                "user_id": user.id,
+            }
+            for _ in range(per_user)
+        ]
+        # Set before the rows are recorded, so periods and alerts exist.
+        db.add(Budget(user_id=user.id, limit_amount=300, start_month=202201))
+        db.flush()
+        db.execute(insert(Transaction), rows)
+        record_changes(db, user.id, added=rows)
+        db.add_all(
+            ReportJob(
+                id=f"{user.id:08d}{i:024d}",
+                user_id=user.id,
+                report_type="summary",
+                params="{}",
+                status="done",
+                created_at=start,
+                expires_at=start,
+            )
+            for i in range(3)
+        )
+        seeded.append(user)
+    db.flush()
+    return seeded
+
+
+def checks(
+    db: Session, user: User
+) -> List[Tuple[str, List[Expected], Callable[[], object]]]:
+    """
+    The DB work behind each endpoint's read path, i.e. the service calls
+    the routers make through run_db, with the indexes it must use.
+    """
+    token = create_access_token(subject=user.email, user_id=user.id)
+    claims = decode_access_token_claims(token)
+    (category_id,) = (
+        db.query(Category.id).filter(Category.user_id == user.id).first()
+    )
+    rows, _ = transaction_service.list_transactions(db, user.id)
+    last = rows[-1]
+    d_from, d_to = datetime(2022, 3, 15), datetime(2023, 8, 20)
+    keyset = "ix_transactions_user_date_id"
+    rollups = "monthly_rollups_pkey"
+    search = (
+        "ix_transactions_search_tsv",
+        "ix_transactions_search_trgm",
+        SEARCH_FTS_TABLE,
+    )
+    ym = budget_service.current_year_month()
+
+    return [
+        (
+            "principal by uid",
+            ["users_pkey"],
+            lambda: load_principal_row(db, claims, user.email),
+        ),
+        (
+            "principal by email",
+            ["ix_users_email"],
+            lambda: load_principal_row(db, {}, user.email),
+        ),
+        ("data_version", ["users_pkey"], lambda: get_data_version(db, user.id)),
+        (
+            "list transactions",
+            [keyset],
+            lambda: transaction_service.list_transactions(db, user.id),
+        ),
+        (
+            "list transactions, next page",
+            [keyset],
+            lambda: transaction_service.list_transactions(
+                db, user.id, after=(last.date, last.id)
+            ),
+        ),
+        (
+            "list transactions by type",
+            [("ix_transactions_user_type_date", keyset)],
+            lambda: transaction_service.list_transactions(db, user.id, type="income"),
+        ),
+        (
+            "list transactions by category",
+            [("ix_transactions_user_category_date", keyset)],
+            lambda: transaction_service.list_transactions(
+                db, user.id, category_id=category_id
+            ),
+        ),
+        (
+            "list transactions by date",
+            [keyset],
+            lambda: transaction_service.list_transactions(
+                db, user.id, date_from=d_from, date_to=d_to
+            ),
+        ),
+        (
+            "get transaction",
+            ["transactions_pkey"],
+            lambda: transaction_service.get_transaction(db, user.id, last.id),
+        ),
+        (
+            "search",
+            [search],
+            lambda: search_service.search_transactions(db, user.id, "coffee"),
+        ),
+        (
+            "search, prefix",
+            [search],
+            lambda: search_service.search_transactions(
+                db, user.id, "market gr", offset=20
+            ),
+        ),
+        (
+            "export",
+            [("ix_transactions_user_type_date", keyset)],
+            lambda: db.execute(
+                transaction_service.apply_filters(
+                    export_stmt(user.id), "expense", None, d_from, d_to
+                )
+            ).first(),
+        ),
+        (
+            "list categories",
+            ["ix_categories_user_id"],
+            lambda: category_service.list_categories(db, user.id),
+        ),
+        (
+            "list budgets",
+            ["ix_budgets_user_id"],
+            lambda: budget_service.list_budgets(db, user.id),
+        ),
+        (
+            "active alerts",
+            ["ix_budget_alerts_user_active_period"],
+            lambda: alert_service.list_active_alerts(db, user.id, ym),
+        ),
+        (
+            "summary, all time",
+            [rollups],
+            lambda: generate_report(db, user.id, engine="sql"),
+        ),
+        (
+            "summary, partial months",
+            [rollups, keyset],
+            lambda: generate_report(db, user.id, d_from, d_to, engine="sql"),
+        ),
+        (
+            "summary, within a month",
+            [keyset],
+            lambda: generate_report(
+                db, user.id, d_from, d_from + timedelta(days=3), engine="sql"
+            ),
+        ),
+        (
+            "timeseries by month and category",
+            [keyset],
+            lambda: generate_timeseries(
+                db, user.id, "month", d_from, d_to, by_category=True
+            ),
+        ),
+        (
+            "timeseries by day",
+            [keyset],
+            lambda: generate_timeseries(db, user.id, "day", d_from, d_to),
+        ),
+        # Report job queue (database backend); the rest are primary-key lookups.
+        (
+            "report jobs pending",
+            ["ix_report_jobs_user_status"],
+            lambda: db.scalar(report_jobs.pending_stmt(user.id)),
+        ),
+        (
+            "report job claim",
+            ["ix_report_jobs_status_created"],
+            lambda: db.scalar(
+                report_jobs.claim_stmt(settings.REPORT_JOB_MAX_RUNNING_PER_USER)
+            ),
+        ),
+    ]
+
+
+_SQLITE_INDEX = re.compile(r"USING (?:COVERING )?INDEX (\w+)")
+_SQLITE_AUTOINDEX = re.compile(r"sqlite_autoindex_(\w+)_\d+")
+
+
+def explain(db: Session, statement: str, parameters) -> Tuple[Set[str], List[str]]:
+    """
+    (indexes used, sequential scans of LARGE_TABLES) of one statement.
+    """
+    conn = db.connection()
+    indexes: Set[str] = set()
+    scans: List[str] = []
+    if conn.dialect.name == "postgresql":
+        (plan,) = conn.exec_driver_sql(
+            "EXPLAIN (FORMAT JSON) " + statement, parameters
+        ).one()
+        plan = plan if isinstance(plan, list) else json.loads(plan)
+        stack = [plan[0]["Plan"]]
+        while stack:
+            node = stack.pop()
+            if "Index Name" in node:
+                indexes.add(node["Index Name"])
+            relation = node.get("Relation Name")
+            if node["Node Type"] == "Seq Scan" and relation in LARGE_TABLES:
+                scans.append(f"Seq Scan on {relation}")
+            stack.extend(node.get("Plans", []))
+        return indexes, scans
+
+    # SQLite: "SEARCH <table> USING INDEX <name>" is a seek; "SCAN <table>"
+    # without an index is a full pass over the table.
+    for row in conn.exec_driver_sql("EXPLAIN QUERY PLAN " + statement, parameters):
+        detail = row[-1]
+        words = detail.split()
+        if len(words) < 2 or words[0] not in ("SCAN", "SEARCH"):
+            continue
+        table = words[1]
+        match = _SQLITE_INDEX.search(detail)
+        if match:
+            auto = _SQLITE_AUTOINDEX.fullmatch(match.group(1))
+            indexes.add(f"{auto.group(1)}_pkey" if auto else match.group(1))
+        elif "PRIMARY KEY" in detail:
+            indexes.add(f"{table}_pkey")
+        elif "VIRTUAL TABLE" in detail:
+            indexes.add(table)
+        elif words[0] == "SCAN" and table in LARGE_TABLES:
+            scans.append(detail)
+    return indexes, scans
+
+
+def run(
+    url: str, users: int, per_user: int, verbose: bool = False
+) -> Tuple[List[str], int]:
+    engine = create_engine(url, future=True)
+    if engine.dialect.name == "sqlite":
+        Base.metadata.create_all(engine)
+
+    captured: List[Tuple[str, object]] = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if not executemany and statement.lstrip().upper().startswith("SELECT"):
+            captured.append((statement, parameters))
+
+    failures = []
+    checked = 0
+    with Session(engine) as db:
+        try:
+            seeded = seed(db, users, per_user)
+            if engine.dialect.name == "postgresql":
+                conn = db.connection()
+                for table in ANALYZED_TABLES:
+                    conn.exec_driver_sql(f"ANALYZE {table}")
+            else:
+                db.connection().exec_driver_sql("ANALYZE")
+
+            for name, expected, call in checks(db, seeded[len(seeded) // 2]):
+                checked += 1
+                captured.clear()
+                event.listen(engine, "before_cursor_execute", capture)
+                try:
+                    call()
+                finally:
+                    event.remove(engine, "before_cursor_execute", capture)
+
+                used: Set[str] = set()
+                scans: List[str] = []
+                for statement, parameters in captured:
+                    statement_indexes, statement_scans = explain(
+                        db, statement, parameters
+                    )
+                    used |= statement_indexes
+                    scans += statement_scans
+                if verbose:
+                    print(f"{name}: {', '.join(sorted(used)) or '-'}")
+
+                missing = [
+                    " or ".join(want) if isinstance(want, tuple) else want
+                    for want in expected
+                    if not used.intersection(
+                        want if isinstance(want, tuple) else (want,)
+                    )
+                ]
+                if missing:
+                    failures.append(
+                        f"{name}: does not use {', '.join(missing)} "
+                        f"(uses {', '.join(sorted(used)) or 'no index'})"
+                    )
+                if scans:
+                    failures.append(f"{name}: {', '.join(scans)}")
+        finally:
+            # Never keep the seeded data.
+            db.rollback()
+    return failures, checked
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument(
+        "--url",
+        default="sqlite://",
+        help="scratch database (default: in-memory SQLite)",
+    )
+    # Enough users that the small per-user tables (users, categories,
+    # budgets) are past the size where a seq scan beats an index.
+    parser.add_argument("--users", type=int, default=2000)
+    parser.add_argument(
+        "--transactions", type=int, default=100, help="per user"
+    )
+    parser.add_argument("--verbose", action="store_true", help="list indexes used")
+    args = parser.parse_args()
+
+    failures, checked = run(args.url, args.users, args.transactions, args.verbose)
+    for failure in failures:
+        print("FAIL:", failure)
+    print(f"{checked} read paths checked, {len(failures)} failures")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,184 @@
+"""
+Connection pool instrumentation.
+
+Engines are built with the timed pool classes below and registered with
+`instrument_engine`, which hooks the pool events. `pool_stats()` reports
+the live state of every registered pool next to the counters collected
+since startup.
+"""
+import threading
+import time
+from typing import Dict
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import AsyncAdaptedQueuePool, Pool, QueuePool
+
+from app.core.config import settings
+
+
+class PoolMetrics:
+    """
+    Counters for one pool. Times are in milliseconds.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.connects = 0
+        self.connect_ms_total = 0.0
+        self.connect_ms_max = 0.0
+        self.checkouts = 0
+        self.checkins = 0
+        self.waits = 0
+        self.wait_ms_total = 0.0
+        self.wait_ms_max = 0.0
+        self.timeouts = 0
+        self.invalidations = 0
+
+    def record_connect(self, elapsed_ms: float) -> None:
+        with self._lock:
+            self.connects += 1
+            self.connect_ms_total += elapsed_ms
+            self.connect_ms_max = max(self.connect_ms_max, elapsed_ms)
+
+    def record_wait(self, elapsed_ms: float, timed_out: bool = False) -> None:
+        with self._lock:
+            if timed_out:
+                self.timeouts += 1
+            self.waits += 1
+            self.wait_ms_total += elapsed_ms
+            self.wait_ms_max = max(self.wait_ms_max, elapsed_ms)
+
+    def record_checkout(self) -> None:
+        with self._lock:
+            self.checkouts += 1
+
+    def record_checkin(self) -> None:
+        with self._lock:
+            self.checkins += 1
+
+    def record_invalidation(self) -> None:
+        with self._lock:
+            self.invalidations += 1
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "connects": self.connects,
+                "connect_ms_avg": round(self.connect_ms_total / self.connects, 3)
+                if self.connects
+                else 0.0,
+                "connect_ms_max": round(self.connect_ms_max, 3),
+                "checkouts": self.checkouts,
+                "checkins": self.checkins,
+                "wait_ms_avg": round(self.wait_ms_total / self.waits, 3)
+                if self.waits
+                else 0.0,
+                "wait_ms_max": round(self.wait_ms_max, 3),
+                "timeouts": self.timeouts,
+                "invalidations": self.invalidations,
+            }
+
+
+class _TimedPoolMixin:
+    """
+    Measures how long a checkout waits for a usable connection, including
+    opening a new one and the pre-ping. Pool events have no "before
+    checkout" hook, so this wraps the public Pool.connect(), which every
+    engine checkout goes through.
+    """
+
+    metrics: PoolMetrics
+
+    def connect(self):
+        start = time.perf_counter()
+        try:
+            connection = super().connect()
+        except PoolTimeoutError:
+            self._metrics().record_wait(
+                (time.perf_counter() - start) * 1000, timed_out=True
+            )
+            raise
+        self._metrics().record_wait((time.perf_counter() - start) * 1000)
+        return connection
+
+    def _metrics(self) -> PoolMetrics:
+        # Set by instrument_engine; a stray pool gets throwaway counters.
+        metrics = getattr(self, "metrics", None)
+        if metrics is None:
+            metrics = self.metrics = PoolMetrics()
+        return metrics
+
+
+class TimedQueuePool(_TimedPoolMixin, QueuePool):
+    pass
+
+
+class TimedAsyncAdaptedQueuePool(_TimedPoolMixin, AsyncAdaptedQueuePool):
+    pass
+
+
+_registry: Dict[str, Engine] = {}
+_metrics: Dict[str, PoolMetrics] = {}
+
+
+def instrument_engine(name: str, engine: Engine) -> PoolMetrics:
+    """
+    Attach pool event listeners to `engine` (the sync engine of an
+    AsyncEngine) and register it under `name` for `pool_stats()`.
+    """
+    metrics = _metrics.setdefault(name, PoolMetrics())
+    _registry[name] = engine
+    if isinstance(engine.pool, _TimedPoolMixin):
+        engine.pool.metrics = metrics
+
+    @event.listens_for(engine, "do_connect")
+    def _timed_connect(dialect, conn_rec, cargs, cparams):
+        start = time.perf_counter()
+        connection = dialect.connect(*cargs, **cparams)
+        metrics.record_connect((time.perf_counter() - start) * 1000)
+        return connection
+
+    @event.listens_for(engine, "checkout")
+    def _on_checkout(dbapi_connection, connection_record, connection_proxy):
+        metrics.record_checkout()
+
+    @event.listens_for(engine, "checkin")
+    def _on_checkin(dbapi_connection, connection_record):
+        metrics.record_checkin()
+
+    @event.listens_for(engine, "invalidate")
+    def _on_invalidate(dbapi_connection, connection_record, exception):
+        metrics.record_invalidation()
+
+    # dispose() builds a new pool object; hand it the same counters.
+    @event.listens_for(engine, "engine_disposed")
+    def _on_dispose(disposed_engine):
+        if isinstance(disposed_engine.pool, _TimedPoolMixin):
+            disposed_engine.pool.metrics = metrics
+
+    return metrics
+
+
+def _pool_state(pool: Pool) -> dict:
+    if not isinstance(pool, QueuePool):
+        return {"class": type(pool).__name__}
+    return {
+        "class": type(pool).__name__,
+        "size": pool.size(),
+        "checked_in": pool.checkedin(),
+        "checked_out": pool.checkedout(),
+        # Negative while the pool has not yet opened `size` connections.
+        "overflow": pool.overflow(),
+        # Pools have no public accessor; every engine uses pool_options().
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "timeout": pool.timeout(),
+    }
+
+
+def pool_stats() -> Dict[str, dict]:
+    return {
+        name: {**_pool_state(engine.pool), **_metrics[name].snapshot()}
+        for name, engine in _registry.items()
+    }
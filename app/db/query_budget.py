@@ -0,0 +1,478 @@
+"""
+Per-endpoint query budget check.
+
+Drives every route of the v1 API in-process against a throwaway SQLite
+database, reads the X-DB-Queries header each response carries in debug
+mode, and fails when an endpoint runs more statements than its budget
+in QUERY_BUDGETS or has no budget at all. Caches are cleared before
+every call, so the counts are the cold-cache worst case.
+
+The bulk writes are also run at two sizes (SCALING); their statement
+count must not grow with the number of rows beyond PER_ROW_STATEMENTS.
+statement_budget() is the same assertion for a block of code, for tests.
+
+Run it in CI so an N+1 regression fails the build:
+    python -m app.db.query_budget [--verbose]
+"""
+import argparse
+import io
+from contextlib import contextmanager
+from datetime import datetime
+import logging
+import sys
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.api import deps
+from app.core.config import settings
+from app.core.metrics import RequestDBStats, count_statements, instrument_statements
+from app.db.base import Base
+from app.models.category import Category
+from app.models.user import User
+from app.schemas.budget import BudgetCreate
+from app.schemas.transaction import TransactionBatchRequest
+from app.services.batch_service import apply_batch
+from app.services.budget_service import create_budget
+from app.services.import_service import import_transactions
+from app.services.principal_cache import principal_cache
+from app.services.report_cache import report_cache
+from app.services.report_jobs import report_jobs
+
+# (method, route path) -> maximum statements per request. Authenticated
+# routes include the principal lookup in get_current_user; routes with an
+# ETag include the data_version lookup. Transaction writes are measured
+# with budgets in place, so they include the budget bookkeeping (budget
+# lookup, period rows, alert changes).
+QUERY_BUDGETS: Dict[Tuple[str, str], int] = {
+    ("POST", "/api/v1/auth/register"): 3,
+    ("POST", "/api/v1/auth/login"): 1,
+    ("GET", "/api/v1/users/me"): 2,
+    ("POST", "/api/v1/categories/"): 4,
+    ("GET", "/api/v1/categories/"): 3,
+    ("PUT", "/api/v1/categories/{category_id}"): 5,
+    ("DELETE", "/api/v1/categories/{category_id}"): 10,
+    ("POST", "/api/v1/transactions/"): 9,
+    ("GET", "/api/v1/transactions/"): 3,
+    ("GET", "/api/v1/transactions/search"): 3,
+    ("GET", "/api/v1/transactions/{transaction_id}"): 2,
+    ("PUT", "/api/v1/transactions/{transaction_id}"): 10,
+    ("DELETE", "/api/v1/transactions/{transaction_id}"): 11,
+    # Two creates: SQLite has no ordered multi-row INSERT .. RETURNING, so
+    # it inserts row by row; PostgreSQL uses one statement per batch.
+    ("POST", "/api/v1/transactions/batch"): 12,
+    ("POST", "/api/v1/transactions/import"): 7,
+    ("GET", "/api/v1/reports/summary"): 4,
+    ("GET", "/api/v1/reports/timeseries"): 3,
+    # The report itself runs on a worker thread, outside the request.
+    ("POST", "/api/v1/reports/jobs"): 1,
+    ("GET", "/api/v1/reports/jobs/{job_id}"): 1,
+    ("POST", "/api/v1/budgets/"): 9,
+    ("GET", "/api/v1/budgets/"): 3,
+    ("GET", "/api/v1/budgets/alerts"): 2,
+    ("PUT", "/api/v1/budgets/{budget_id}"): 10,
+    ("DELETE", "/api/v1/budgets/{budget_id}"): 5,
+    ("GET", "/api/v1/internal/pool"): 0,
+    ("GET", "/api/v1/internal/replicas"): 0,
+}
+
+# Routes whose queries run after the response has started, so the
+# header cannot count them.
+UNCHECKED = {
+    ("GET", "/api/v1/transactions/export"): "streams on its own session",
+}
+
+# Rows per run of each SCALING scenario.
+SCALING_SIZES = (5, 50)
+
+# Statements each extra row may add. SQLite cannot return the ids of a
+# multi-row INSERT in order, so batch creates insert row by row there.
+PER_ROW_STATEMENTS: Dict[str, int] = {
+    "batch create": 1,
+    "batch update": 0,
+    "batch delete": 0,
+    "import": 0,
+}
+
+
+@contextmanager
+def statement_budget(max_statements: int) -> Iterator[RequestDBStats]:
+    """
+    Fail with AssertionError if the block runs more than max_statements
+    statements on an instrumented engine, e.g. in a test:
+
+        with statement_budget(4):
+            apply_batch(db, user_id, batch)
+    """
+    with count_statements() as stats:
+        yield stats
+    if stats.statements > max_statements:
+        repeated = "".join(
+            f"\n    {n}x {' '.join(sql.split())}"
+            for sql, n in stats.duplicates().items()
+        )
+        raise AssertionError(
+            f"{stats.statements} statements, budget {max_statements}{repeated}"
+        )
+
+
+def measure(client: TestClient, method: str, url: str, **kwargs):
+    """
+    Send one request with cold caches; return (response, statements).
+    """
+    principal_cache.clear()
+    report_cache.backend.clear()
+    response = client.request(method, url, **kwargs)
+    if response.status_code >= 400:
+        raise AssertionError(
+            f"{method} {url} returned {response.status_code}: {response.text}"
+        )
+    return response, int(response.headers["X-DB-Queries"])
+
+
+def scenario(client: TestClient) -> List[Tuple[str, str, int]]:
+    """
+    Exercise each route once, with enough rows that per-row queries
+    would show up. Returns (method, route path, statements) triples.
+    """
+    results = []
+
+    def call(method: str, path: str, url: Optional[str] = None, **kwargs):
+        response, count = measure(client, method, url or path, **kwargs)
+        results.append((method, path, count))
+        return response
+
+    credentials = {"email": "budget@example.com", "password": "budget-pw"}
+    call("POST", "/api/v1/auth/register", json=credentials)
+    token = call(
+        "POST",
+        "/api/v1/auth/login",
+        data={"username": credentials["email"], "password": credentials["password"]},
+    ).json()["access_token"]
+    auth = {"Authorization": f"Bearer {token}"}
+
+    base = "/api/v1"
+    call("GET", f"{base}/users/me", headers=auth)
+
+    category_id = call(
+        "POST",
+        f"{base}/categories/",
+        json={"name": "Food", "type": "expense"},
+        headers=auth,
+    ).json()["id"]
+    for name in ("Rent", "Travel"):
+        client.post(
+            f"{base}/categories/", json={"name": name, "type": "expense"}, headers=auth
+        )
+    call("GET", f"{base}/categories/", headers=auth)
+    call(
+        "PUT",
+        f"{base}/categories/{{category_id}}",
+        f"{base}/categories/{category_id}",
+        json={"name": "Groceries", "type": "expense"},
+        headers=auth,
+    )
+
+    # Budgets first, so every transaction write below also updates them.
+    call(
+        "POST",
+        f"{base}/budgets/",
+        json={"category_id": category_id, "limit_amount": 100},
+        headers=auth,
+    )
+    overall_budget_id = client.post(
+        f"{base}/budgets/", json={"limit_amount": 500}, headers=auth
+    ).json()["id"]
+
+    tx = {"amount": 12.5, "type": "expense", "category_id": category_id,
+          "description": "Team lunch", "date": "2024-03-05T10:00:00"}
+    # Dated this month, so the budgets track it through update and delete.
+    tx_id = call(
+        "POST",
+        f"{base}/transactions/",
+        json={**tx, "date": datetime.utcnow().isoformat()},
+        headers=auth,
+    ).json()["id"]
+    for day in range(1, 20):
+        client.post(
+            f"{base}/transactions/",
+            json={**tx, "date": f"2024-0{1 + day % 3}-{day:02d}T10:00:00"},
+            headers=auth,
+        )
+    call("GET", f"{base}/transactions/", headers=auth)
+    call(
+        "GET", f"{base}/transactions/search", params={"q": "lunch"}, headers=auth
+    )
+    call(
+        "GET",
+        f"{base}/transactions/{{transaction_id}}",
+        f"{base}/transactions/{tx_id}",
+        headers=auth,
+    )
+    call(
+        "PUT",
+        f"{base}/transactions/{{transaction_id}}",
+        f"{base}/transactions/{tx_id}",
+        json={"amount": 20},
+        headers=auth,
+    )
+    call(
+        "POST",
+        f"{base}/transactions/batch",
+        json={
+            "operations": [
+                {"op": "create", "data": tx},
+                {"op": "create", "data": tx},
+                {"op": "update", "id": tx_id, "data": {"amount": 30}},
+            ]
+        },
+        headers=auth,
+    )
+    csv_rows = "amount,type,category_id,date\n" + "".join(
+        f"{n},expense,{category_id},2024-02-{n:02d}T00:00:00\n" for n in range(1, 21)
+    )
+    call(
+        "POST",
+        f"{base}/transactions/import",
+        files={"file": ("rows.csv", csv_rows, "text/csv")},
+        headers=auth,
+    )
+
+    call("GET", f"{base}/reports/summary", headers=auth)
+    call(
+        "GET",
+        f"{base}/reports/summary",
+        params={"date_from": "2024-01-15T00:00:00", "date_to": "2024-03-10T00:00:00"},
+        headers=auth,
+    )
+    call(
+        "GET",
+        f"{base}/reports/timeseries",
+        params={"by_category": "true"},
+        headers=auth,
+    )
+    job_id = call(
+        "POST",
+        f"{base}/reports/jobs",
+        json={"report_type": "timeseries", "by_category": True},
+        headers=auth,
+    ).json()["id"]
+    call(
+        "GET",
+        f"{base}/reports/jobs/{{job_id}}",
+        f"{base}/reports/jobs/{job_id}",
+        params={"wait": 10},
+        headers=auth,
+    )
+    call("GET", f"{base}/budgets/", headers=auth)
+    call("GET", f"{base}/budgets/alerts", headers=auth)
+    call(
+        "PUT",
+        f"{base}/budgets/{{budget_id}}",
+        f"{base}/budgets/{overall_budget_id}",
+        json={"limit_amount": 50},
+        headers=auth,
+    )
+    operator = {"Authorization": f"Bearer {settings.METRICS_TOKEN}"}
+    call("GET", f"{base}/internal/pool", headers=operator)
+    call("GET", f"{base}/internal/replicas", headers=operator)
+
+    call(
+        "DELETE",
+        f"{base}/transactions/{{transaction_id}}",
+        f"{base}/transactions/{tx_id}",
+        headers=auth,
+    )
+    call(
+        "DELETE",
+        f"{base}/budgets/{{budget_id}}",
+        f"{base}/budgets/{overall_budget_id}",
+        headers=auth,
+    )
+    call(
+        "DELETE",
+        f"{base}/categories/{{category_id}}",
+        f"{base}/categories/{category_id}",
+        headers=auth,
+    )
+    return results
+
+
+def _tx(category_id: int, n: int) -> dict:
+    # Three months in every run, so only the row count differs by size.
+    return {"amount": 10 + n, "type": "expense", "category_id": category_id,
+            "date": f"2024-0{1 + n % 3}-{1 + n % 28:02d}T10:00:00"}
+
+
+def _seed(db: Session, user_id: int, category_id: int, rows: int) -> List[int]:
+    ops = [{"op": "create", "data": _tx(category_id, n)} for n in range(rows)]
+    result = apply_batch(db, user_id, TransactionBatchRequest(operations=ops))
+    return [r.id for r in result.results]
+
+
+def _batch(kind: str) -> Callable[[Session, int, int, int], Callable[[], object]]:
+    def prepare(db: Session, user_id: int, category_id: int, rows: int):
+        if kind == "create":
+            ops = [{"op": "create", "data": _tx(category_id, n)} for n in range(rows)]
+        else:
+            ids = _seed(db, user_id, category_id, rows)
+            ops = [
+                {"op": kind, "id": id_, "data": {"amount": 1}}
+                if kind == "update"
+                else {"op": kind, "id": id_}
+                for id_ in ids
+            ]
+        batch = TransactionBatchRequest(operations=ops)
+        return lambda: apply_batch(db, user_id, batch)
+
+    return prepare
+
+
+def _import(db: Session, user_id: int, category_id: int, rows: int):
+    csv_rows = "amount,type,category_id,date\n" + "".join(
+        "{amount},{type},{category_id},{date}\n".format(**_tx(category_id, n))
+        for n in range(rows)
+    )
+    return lambda: import_transactions(db, user_id, io.BytesIO(csv_rows.encode()))
+
+
+# name -> prepare(db, user_id, category_id, rows), which sets up a run
+# and returns the call to count.
+SCALING: Dict[str, Callable[[Session, int, int, int], Callable[[], object]]] = {
+    "batch create": _batch("create"),
+    "batch update": _batch("update"),
+    "batch delete": _batch("delete"),
+    "import": _import,
+}
+
+
+def scaling(session_factory: Callable[[], Session]) -> Tuple[List[str], List[str]]:
+    """
+    Run each SCALING scenario at both SCALING_SIZES for a user with a
+    category and an overall budget. Returns (failures, report lines).
+    """
+    small, large = SCALING_SIZES
+    failures, lines = [], []
+    with session_factory() as db:
+        user = User(email="scaling@example.com", hashed_password="x")
+        db.add(user)
+        db.flush()
+        category = Category(name="Food", type="expense", user_id=user.id)
+        db.add(category)
+        db.flush()
+        create_budget(
+            db, user.id, BudgetCreate(category_id=category.id, limit_amount=100)
+        )
+        create_budget(db, user.id, BudgetCreate(limit_amount=500))
+        db.commit()
+
+        for name, prepare in SCALING.items():
+            call = prepare(db, user.id, category.id, small)
+            with count_statements() as stats:
+                call()
+            allowed = stats.statements + PER_ROW_STATEMENTS[name] * (large - small)
+            call = prepare(db, user.id, category.id, large)
+            try:
+                with statement_budget(allowed) as big:
+                    call()
+            except AssertionError as exc:
+                failures.append(
+                    f"{name}: grows with rows ({stats.statements} statements "
+                    f"for {small} rows; for {large}: {exc})"
+                )
+            else:
+                lines.append(
+                    f"{name}: {stats.statements} statements for {small} rows, "
+                    f"{big.statements} for {large}"
+                )
+    return failures, lines
+
+
+def api_routes(app) -> List[Tuple[str, str]]:
+    return sorted(
+        (method, route.path)
+        for route in app.routes
+        if route.path.startswith("/api/v1/")
+        for method in getattr(route, "methods", ())
+    )
+
+
+def run() -> Tuple[List[str], List[Tuple[str, str, int]], List[str]]:
+    # Imported here so the settings below are in place first.
+    from app.main import app
+
+    settings.DEBUG = True
+    settings.DB_ASYNC = False
+    settings.PASSWORD_HASH_WORKERS = 0
+    settings.METRICS_TOKEN = settings.METRICS_TOKEN or "query-budget-operator"
+
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+        future=True,
+    )
+    Base.metadata.create_all(engine)
+    instrument_statements(engine)
+    TestSession = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+    async def get_test_session():
+        db = TestSession()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app.dependency_overrides[deps.get_session] = get_test_session
+    report_jobs.session_factory = lambda user_id: TestSession()
+    try:
+        with TestClient(app) as client:
+            results = scenario(client)
+    finally:
+        app.dependency_overrides.pop(deps.get_session, None)
+
+    failures, scaled = scaling(TestSession)
+    worst: Dict[Tuple[str, str], int] = {}
+    for method, path, count in results:
+        worst[(method, path)] = max(count, worst.get((method, path), 0))
+    for key in api_routes(app):
+        if key in UNCHECKED:
+            continue
+        budget = QUERY_BUDGETS.get(key)
+        if key not in worst:
+            failures.append(f"{key[0]} {key[1]}: not exercised")
+        elif budget is None:
+            failures.append(f"{key[0]} {key[1]}: no budget ({worst[key]} queries)")
+        elif worst[key] > budget:
+            failures.append(
+                f"{key[0]} {key[1]}: {worst[key]} queries, budget {budget}"
+            )
+    return failures, results, scaled
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--verbose", action="store_true", help="print every count")
+    args = parser.parse_args()
+
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+    failures, results, scaled = run()
+    if args.verbose:
+        for method, path, count in results:
+            print(f"{count:4d}  {method} {path}")
+        for line in scaled:
+            print(f"      {line}")
+    for failure in failures:
+        print("FAIL:", failure)
+    print(
+        f"{len(results)} requests and {len(SCALING)} bulk writes checked, "
+        f"{len(failures)} over budget"
+    )
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,29 @@
+"""
+Backfill or rebuild the monthly_rollups table from transactions.
+
+Usage:
+    python -m app.db.rebuild_rollups              # all users
+    python -m app.db.rebuild_rollups --user-id 42
+"""
+import argparse
+
+from app.core.logging_config import logger
+from app.db.session import SessionLocal
+from app.services.rollup_service import rebuild_rollups
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--user-id", type=int, default=None)
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        written = rebuild_rollups(db, user_id=args.user_id)
+    finally:
+        db.close()
+    logger.info("Rebuilt monthly rollups: %s rows written", written)
+
+
+if __name__ == "__main__":
+    main()
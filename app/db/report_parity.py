@@ -0,0 +1,151 @@
+"""
+Parity check between the "sql" and "pandas" report engines.
+
+Seeds two users, one whose transactions all have a category and one with
+a share of uncategorized rows, then compares the summary both engines
+build over several date ranges: unbounded, open on either
+side, partial months at both ends, a few days inside one month and a
+range with no rows. Fails if any pair differs beyond float rounding.
+
+Usage:
+    python -m app.db.report_parity                    # in-memory SQLite
+    python -m app.db.report_parity --url postgresql://... # rolled back
+"""
+import argparse
+import math
+import random
+import sys
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import Session
+
+from app.db.base import Base
+from app.models.category import Category
+from app.models.monthly_rollup import MonthlyRollup  # noqa: F401 (create_all)
+from app.models.transaction import Transaction
+from app.models.user import User
+from app.schemas.report import ReportSummary
+from app.services.report_service import generate_report
+from app.services.rollup_service import record_changes
+
+START = datetime(2022, 1, 1)
+
+RANGES: Dict[str, Tuple[Optional[datetime], Optional[datetime]]] = {
+    "all": (None, None),
+    "from_only": (datetime(2022, 7, 10), None),
+    "to_only": (None, datetime(2023, 2, 20, 12, 30)),
+    "partial_months": (datetime(2022, 3, 15), datetime(2023, 8, 20)),
+    "whole_months": (datetime(2022, 4, 1), datetime(2022, 9, 30, 23, 59, 59, 999999)),
+    "within_month": (datetime(2022, 5, 3), datetime(2022, 5, 9)),
+    "empty": (datetime(2030, 1, 1), datetime(2030, 2, 1)),
+}
+
+
+def same_report(a: ReportSummary, b: ReportSummary) -> bool:
+    """
+    Equal category groups in the same order, and amounts equal up to
+    summation order (pandas sums pairwise).
+    """
+
+    def close(x: float, y: float) -> bool:
+        return math.isclose(x, y, rel_tol=1e-9, abs_tol=1e-6)
+
+    if not (
+        close(a.total_income, b.total_income)
+        and close(a.total_expense, b.total_expense)
+        and close(a.net, b.net)
+        and len(a.by_category) == len(b.by_category)
+    ):
+        return False
+    return all(
+        (x.category_id, x.category_name, x.type)
+        == (y.category_id, y.category_name, y.type)
+        and close(x.total_amount, y.total_amount)
+        for x, y in zip(a.by_category, b.by_category)
+    )
+
+
+def seed_user(
+    db: Session, name: str, rows: int, uncategorized: float, rng: random.Random
+) -> int:
+    """
+    One user with `rows` transactions; `uncategorized` is the share with
+    no category.
+    """
+    user = User(email=f"parity-{name}@example.com", hashed_password="x")
+    db.add(user)
+    db.flush()
+    cats = [
+        Category(name=f"cat-{i}", type=("income", "expense")[i % 2], user_id=user.id)
+        for i in range(6)
+    ]
+    db.add_all(cats)
+    db.flush()
+
+    data = []
+    for _ in range(rows):
+        data.append(
+            {
+                "amount": round(rng.uniform(1, 500), 2),
+                "type": rng.choice(("income", "expense")),
+                "date": START + timedelta(minutes=rng.randint(0, 60 * 24 * 700)),
+                "category_id": None
+                if rng.random() < uncategorized
+                else rng.choice(cats).id,
+                "user_id": user.id,
+            }
+        )
+    db.execute(insert(Transaction), data)
+    record_changes(db, user.id, added=data)
+    db.flush()
+    return user.id
+
+
+def run(url: str, rows: int) -> Tuple[List[str], int]:
+    engine = create_engine(url, future=True)
+    if engine.dialect.name == "sqlite":
+        Base.metadata.create_all(engine)
+
+    rng = random.Random(42)
+    failures = []
+    checked = 0
+    with Session(engine) as db:
+        try:
+            users = {
+                "categorized": seed_user(db, "categorized", rows, 0.0, rng),
+                "mixed": seed_user(db, "mixed", rows, 0.3, rng),
+            }
+            for mode, user_id in users.items():
+                for range_name, (date_from, date_to) in RANGES.items():
+                    sql = generate_report(db, user_id, date_from, date_to, engine="sql")
+                    pandas = generate_report(
+                        db, user_id, date_from, date_to, engine="pandas"
+                    )
+                    checked += 1
+                    if not same_report(sql, pandas):
+                        failures.append(
+                            f"{mode}/{range_name}:\n    sql    {sql}\n    pandas {pandas}"
+                        )
+        finally:
+            # Never keep the seeded data.
+            db.rollback()
+    return failures, checked
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--url", default="sqlite://")
+    parser.add_argument("--rows", type=int, default=5000, help="per user")
+    args = parser.parse_args()
+
+    failures, checked = run(args.url, args.rows)
+    for failure in failures:
+        print("FAIL:", failure)
+    print(f"{checked} reports compared, {len(failures)} mismatched")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""
+Picks the database that serves a read: one of the replicas, round-robin
+over those currently healthy, or the primary when there are none or all
+are down. Whether a replica has caught up with the user's own writes is
+checked by the caller (see get_read_session).
+"""
+import itertools
+import threading
+import time
+from typing import Dict, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+
+
+class ReplicaRouter:
+    def __init__(self, replicas: int, retry_seconds: float):
+        self.replicas = replicas
+        self.retry_seconds = retry_seconds
+        self._next = itertools.count()
+        self._down_until: Dict[int, float] = {}
+        self._lock = threading.Lock()
+
+    def mark_down(self, index: int) -> None:
+        with self._lock:
+            self._down_until[index] = time.monotonic() + self.retry_seconds
+
+    def is_healthy(self, index: int) -> bool:
+        with self._lock:
+            return self._down_until.get(index, 0.0) <= time.monotonic()
+
+    def choose(self) -> Optional[int]:
+        """
+        Index of the replica to read from, or None for the primary.
+        """
+        if not self.replicas:
+            return None
+        start = next(self._next)
+        for offset in range(self.replicas):
+            index = (start + offset) % self.replicas
+            if self.is_healthy(index):
+                return index
+        return None
+
+    def watch(self, index: int, engine: Engine) -> None:
+        """
+        Take replica `index` out of rotation when its engine fails to
+        connect or loses a connection.
+        """
+
+        @event.listens_for(engine, "handle_error")
+        def _on_error(context):
+            if context.is_disconnect or context.connection is None:
+                self.mark_down(index)
+
+    def stats(self) -> dict:
+        return {
+            "replicas": self.replicas,
+            "healthy": [i for i in range(self.replicas) if self.is_healthy(i)],
+        }
@@ -0,0 +1,412 @@
+"""
+Generate a large synthetic dataset for capacity testing and staging.
+
+Each user gets a monthly salary and recurring bills (rent, utilities,
+subscriptions) plus discretionary spending. Category preferences are
+skewed per user, activity is skewed across users, and spending follows
+the calendar (December peak, January dip, summer travel). Transactions
+are generated and bulk-loaded in parallel worker processes, through COPY
+on PostgreSQL (psycopg2) and executemany elsewhere.
+
+Usage:
+    python -m app.db.seed --users 1000 --transactions 10000     # ~10M rows
+    python -m app.db.seed --url sqlite:///seed.db --users 50 --workers 2
+"""
+import argparse
+import bisect
+import calendar
+import math
+import multiprocessing
+import os
+import random
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta
+from itertools import accumulate
+from operator import itemgetter
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import create_engine, insert, select
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.logging_config import logger
+from app.core.security import get_password_hash
+from app.db.base import Base
+from app.db.bulk import can_copy, copy_rows
+from app.models.category import Category
+from app.models.monthly_rollup import MonthlyRollup  # noqa: F401 (create_all)
+from app.models.transaction import Transaction
+from app.models.user import User
+from app.services.rollup_service import rebuild_rollups
+
+SEED_PASSWORD = "seed-password"
+
+TRANSACTION_COLUMNS = ("user_id", "category_id", "type", "amount", "date", "description")
+
+# Rows buffered by a worker before each COPY / executemany.
+WRITE_BATCH = 50_000
+
+# name, type, base weight, median amount relative to a 3500/month income.
+# Weight 0 marks categories used only by the recurring entries below.
+CATEGORIES: Tuple[Tuple[str, str, float, float], ...] = (
+    ("Salary", "income", 0, 0),
+    ("Freelance", "income", 1, 400.0),
+    ("Rent", "expense", 0, 0),
+    ("Utilities", "expense", 0, 0),
+    ("Subscriptions", "expense", 0, 0),
+    ("Groceries", "expense", 30, 40.0),
+    ("Dining", "expense", 15, 25.0),
+    ("Transport", "expense", 15, 10.0),
+    ("Shopping", "expense", 10, 55.0),
+    ("Leisure", "expense", 8, 35.0),
+    ("Health", "expense", 4, 60.0),
+    ("Travel", "expense", 3, 250.0),
+    ("Gifts", "expense", 2, 45.0),
+)
+
+# Month (1-12) -> spending multiplier; categories can override it.
+SEASONALITY = {
+    None: (0.85, 0.9, 1.0, 1.0, 1.0, 1.05, 1.1, 1.1, 1.0, 1.0, 1.15, 1.4),
+    "Travel": (0.6, 0.6, 0.8, 0.9, 1.0, 1.5, 2.2, 2.2, 1.0, 0.8, 0.7, 1.4),
+    "Gifts": (0.5, 0.8, 0.6, 0.6, 0.8, 0.7, 0.7, 0.7, 0.7, 0.8, 1.5, 4.0),
+}
+
+
+@dataclass
+class UserPlan:
+    user_id: int
+    transactions: int
+    category_ids: Dict[str, int] = field(default_factory=dict)
+
+
+def _window(months: int, today: Optional[date] = None) -> List[Tuple[datetime, int]]:
+    """
+    (first day, days to fill) for the last `months` months, oldest first.
+    The current month only runs up to today.
+    """
+    today = today or date.today()
+    year, month = today.year, today.month
+    window = [(datetime(year, month, 1), today.day)]
+    for _ in range(months - 1):
+        year, month = (year, month - 1) if month > 1 else (year - 1, 12)
+        window.append((datetime(year, month, 1), calendar.monthrange(year, month)[1]))
+    return window[::-1]
+
+
+def _recurring(
+    rng: random.Random, plan: UserPlan, income: float, window
+) -> List[tuple]:
+    rent = round(income * rng.uniform(0.25, 0.4), 2)
+    subscriptions = round(rng.choice((9.99, 15.99, 24.98, 39.97)), 2)
+    utilities = income * rng.uniform(0.03, 0.06)
+    ids = plan.category_ids
+    rows = []
+    for start, days in window:
+        winter = 1.3 if start.month in (12, 1, 2) else 1.0
+        entries = (
+            (25, 9, "Salary", "income", round(income, 2), "Salary"),
+            (1, 8, "Rent", "expense", rent, "Monthly rent"),
+            (rng.randint(5, 10), 12, "Utilities", "expense",
+             round(utilities * winter * rng.uniform(0.85, 1.15), 2), "Utilities bill"),
+            (15, 6, "Subscriptions", "expense", subscriptions, "Subscriptions"),
+        )
+        for day, hour, name, type_, amount, description in entries:
+            # The current month is only filled up to today.
+            if day <= days:
+                rows.append((plan.user_id, ids[name], type_, amount,
+                             start.replace(day=day, hour=hour), description))
+    return rows
+
+
+def generate_user(plan: UserPlan, months: int, seed_value: int) -> List[tuple]:
+    """
+    All transactions of one user as tuples in TRANSACTION_COLUMNS order.
+    Deterministic for a given seed and user id.
+    """
+    rng = random.Random(seed_value * 1_000_003 + plan.user_id)
+    window = _window(months)
+    income = 3500 * rng.lognormvariate(0, 0.4)
+    scale = math.sqrt(income / 3500)
+
+    rows = _recurring(rng, plan, income, window)[: plan.transactions]
+    remaining = plan.transactions - len(rows)
+    if remaining <= 0:
+        rows.sort(key=itemgetter(4))
+        return rows
+
+    discretionary = [c for c in CATEGORIES if c[2] > 0]
+    # Per-user taste: the same base weights, skewed differently per user.
+    cum_weights = list(
+        accumulate(base * rng.lognormvariate(0, 0.7) for _, _, base, _ in discretionary)
+    )
+    month_weights = {}
+    for name, _, _, _ in discretionary:
+        season = SEASONALITY.get(name, SEASONALITY[None])
+        month_weights[name] = list(
+            accumulate(season[start.month - 1] * days for start, days in window)
+        )
+
+    picks = rng.choices(range(len(discretionary)), cum_weights=cum_weights, k=remaining)
+    for pick in picks:
+        name, type_, _, median = discretionary[pick]
+        weights = month_weights[name]
+        start, days = window[bisect.bisect(weights, rng.random() * weights[-1])]
+        when = start + timedelta(seconds=int(rng.random() * days * 86400))
+        amount = round(median * scale * rng.lognormvariate(0, 0.7), 2)
+        category_id = plan.category_ids[name] if rng.random() >= 0.03 else None
+        rows.append((plan.user_id, category_id, type_, amount, when, None))
+    # Chronological ids, as in real use; also keeps index inserts local.
+    rows.sort(key=itemgetter(4))
+    return rows
+
+
+def activity_counts(users: int, per_user: int, skew: bool, rng: random.Random) -> List[int]:
+    """
+    Transactions per user, summing to users * per_user. With skew, a few
+    heavy users hold most rows (log-normal activity).
+    """
+    if not skew:
+        return [per_user] * users
+    weights = [rng.lognormvariate(0, 0.9) for _ in range(users)]
+    total = users * per_user
+    scale = total / sum(weights)
+    counts = [int(w * scale) for w in weights]
+    for i in range(total - sum(counts)):
+        counts[i % users] += 1
+    return counts
+
+
+def _make_engine(url: str) -> Engine:
+    if url.startswith("sqlite"):
+        # Workers write to the same file; wait for the lock instead of failing.
+        return create_engine(url, future=True, connect_args={"timeout": 300})
+    return create_engine(url, future=True)
+
+
+def _write(db: Session, rows: List[tuple]) -> None:
+    if can_copy(db):
+        copy_rows(db, Transaction.__tablename__, TRANSACTION_COLUMNS, rows)
+    else:
+        db.execute(
+            insert(Transaction), [dict(zip(TRANSACTION_COLUMNS, row)) for row in rows]
+        )
+
+
+_worker_engine: Optional[Engine] = None
+
+
+def load_chunk(url: str, plans: Sequence[UserPlan], months: int, seed_value: int) -> int:
+    """
+    Generate and write the transactions of `plans`; runs in a worker
+    process. Commits once per chunk. Returns rows written.
+    """
+    global _worker_engine
+    if _worker_engine is None:
+        _worker_engine = _make_engine(url)
+
+    written = 0
+    buffer: List[tuple] = []
+    with Session(_worker_engine) as db:
+        for plan in plans:
+            buffer.extend(generate_user(plan, months, seed_value))
+            if len(buffer) >= WRITE_BATCH:
+                _write(db, buffer)
+                written += len(buffer)
+                buffer = []
+        if buffer:
+            _write(db, buffer)
+            written += len(buffer)
+        db.commit()
+    return written
+
+
+def _create_users(
+    db: Session, users: int, password: str
+) -> List[Tuple[int, str]]:
+    tag = uuid.uuid4().hex[:8]
+    hashed = get_password_hash(password)
+    now = datetime.utcnow()
+    rows = [
+        {
+            "email": f"seed-{tag}-{n}@example.com",
+            "hashed_password": hashed,
+            "is_active": True,
+            "created_at": now,
+            "data_version": 0,
+        }
+        for n in range(users)
+    ]
+    for i in range(0, len(rows), 10_000):
+        db.execute(insert(User), rows[i : i + 10_000])
+    return [
+        (user_id, email)
+        for user_id, email in db.execute(
+            select(User.id, User.email)
+            .where(User.email.like(f"seed-{tag}-%"))
+            .order_by(User.id)
+        )
+    ]
+
+
+def _create_categories(db: Session, user_ids: List[int]) -> Dict[int, Dict[str, int]]:
+    rows = [
+        {"user_id": user_id, "name": name, "type": type_}
+        for user_id in user_ids
+        for name, type_, _, _ in CATEGORIES
+    ]
+    for i in range(0, len(rows), 10_000):
+        db.execute(insert(Category), rows[i : i + 10_000])
+
+    by_user: Dict[int, Dict[str, int]] = {user_id: {} for user_id in user_ids}
+    for i in range(0, len(user_ids), 1000):
+        chunk = user_ids[i : i + 1000]
+        for user_id, name, category_id in db.execute(
+            select(Category.user_id, Category.name, Category.id).where(
+                Category.user_id.in_(chunk)
+            )
+        ):
+            by_user[user_id][name] = category_id
+    return by_user
+
+
+def _chunks(plans: List[UserPlan], workers: int) -> List[List[UserPlan]]:
+    """
+    Group users into jobs of similar row counts, several per worker so
+    heavy users do not leave the other workers idle.
+    """
+    total = sum(plan.transactions for plan in plans)
+    target = max(WRITE_BATCH, total // (workers * 8) or 1)
+    chunks, current, size = [], [], 0
+    for plan in plans:
+        current.append(plan)
+        size += plan.transactions
+        if size >= target:
+            chunks.append(current)
+            current, size = [], 0
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def seed(
+    url: str,
+    users: int,
+    per_user: int,
+    workers: int = 1,
+    months: int = 24,
+    seed_value: int = 42,
+    skew: bool = True,
+    password: str = SEED_PASSWORD,
+    rollups: bool = True,
+) -> dict:
+    """
+    Seed the database at `url`. SQLite databases get the schema created;
+    PostgreSQL is expected to be migrated. Returns counts, timings and the
+    created [(user_id, email)].
+    """
+    engine = _make_engine(url)
+    if engine.dialect.name == "sqlite":
+        Base.metadata.create_all(engine)
+
+    started = time.perf_counter()
+    with Session(engine) as db:
+        created = _create_users(db, users, password)
+        categories = _create_categories(db, [user_id for user_id, _ in created])
+        db.commit()
+
+    counts = activity_counts(users, per_user, skew, random.Random(seed_value))
+    plans = [
+        UserPlan(user_id=user_id, transactions=count, category_ids=categories[user_id])
+        for (user_id, _), count in zip(created, counts)
+    ]
+
+    load_started = time.perf_counter()
+    if workers <= 1:
+        written = load_chunk(url, plans, months, seed_value)
+    else:
+        context = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+            futures = [
+                pool.submit(load_chunk, url, chunk, months, seed_value)
+                for chunk in _chunks(plans, workers)
+            ]
+            written = sum(future.result() for future in futures)
+    load_s = time.perf_counter() - load_started
+
+    rollup_s = 0.0
+    if rollups:
+        rollup_started = time.perf_counter()
+        # Only the seeded users: rows of other users are left alone.
+        user_ids = [user_id for user_id, _ in created]
+        with Session(engine) as db:
+            for i in range(0, len(user_ids), 1000):
+                rebuild_rollups(db, user_ids=user_ids[i : i + 1000])
+        rollup_s = time.perf_counter() - rollup_started
+
+    engine.dispose()
+    return {
+        "users": created,
+        "categories": len(created) * len(CATEGORIES),
+        "transactions": written,
+        "load_s": load_s,
+        "rollup_s": rollup_s,
+        "total_s": time.perf_counter() - started,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--url", default=settings.SQLALCHEMY_DATABASE_URI)
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument(
+        "--transactions", type=int, default=1000, help="average per user"
+    )
+    parser.add_argument("--months", type=int, default=24, help="history length")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument(
+        "--uniform", action="store_true", help="same transaction count for every user"
+    )
+    parser.add_argument("--password", default=SEED_PASSWORD)
+    parser.add_argument(
+        "--skip-rollups",
+        action="store_true",
+        help="leave monthly_rollups stale (run app.db.rebuild_rollups later)",
+    )
+    args = parser.parse_args()
+
+    result = seed(
+        args.url,
+        args.users,
+        args.transactions,
+        workers=args.workers,
+        months=args.months,
+        seed_value=args.seed,
+        skew=not args.uniform,
+        password=args.password,
+        rollups=not args.skip_rollups,
+    )
+    rows = result["transactions"]
+    logger.info(
+        "Seeded %d users, %d categories, %d transactions",
+        len(result["users"]),
+        result["categories"],
+        rows,
+    )
+    logger.info(
+        "Transactions loaded in %.1fs (%.0f rows/sec), rollups %.1fs, total %.1fs "
+        "(%.0f rows/sec overall)",
+        result["load_s"],
+        rows / result["load_s"] if result["load_s"] else 0,
+        result["rollup_s"],
+        result["total_s"],
+        rows / result["total_s"] if result["total_s"] else 0,
+    )
+
+
+if __name__ == "__main__":
+    main()
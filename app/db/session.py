@@ -1,8 +1,83 @@
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker
 
 from app.core.config import settings
+from app.core.metrics import instrument_statements
+from app.db.pool_metrics import (
+    TimedAsyncAdaptedQueuePool,
+    TimedQueuePool,
+    instrument_engine,
+)
+from app.db.routing import ReplicaRouter
 
-engine = create_engine(settings.SQLALCHEMY_DATABASE_URI, future=True)
+
+def pool_options() -> dict:
+    return {
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+    }
+
+
+engine = create_engine(
+    settings.SQLALCHEMY_DATABASE_URI,
+    future=True,
+    poolclass=TimedQueuePool,
+    **pool_options(),
+)
+instrument_engine("primary", engine)
+instrument_statements(engine)
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+# Only built in async mode, so asyncpg is not needed otherwise.
+async_engine = None
+AsyncSessionLocal = None
+if settings.DB_ASYNC:
+    async_engine = create_async_engine(
+        settings.SQLALCHEMY_ASYNC_DATABASE_URI,
+        poolclass=TimedAsyncAdaptedQueuePool,
+        **pool_options(),
+    )
+    instrument_engine("primary_async", async_engine.sync_engine)
+    instrument_statements(async_engine.sync_engine)
+    # Objects are returned to the event loop after commit; keep them loaded.
+    AsyncSessionLocal = async_sessionmaker(
+        async_engine, autoflush=False, expire_on_commit=False
+    )
+
+# Read replicas, used by read-only endpoints through replica_router.
+replica_router = ReplicaRouter(
+    replicas=len(settings.REPLICA_DATABASE_URIS),
+    retry_seconds=settings.DB_REPLICA_RETRY_SECONDS,
+)
+ReplicaSessionLocals = []
+AsyncReplicaSessionLocals = []
+for index, url in enumerate(settings.REPLICA_DATABASE_URIS):
+    if settings.DB_ASYNC:
+        replica_async_engine = create_async_engine(
+            settings.REPLICA_ASYNC_DATABASE_URIS[index],
+            poolclass=TimedAsyncAdaptedQueuePool,
+            **pool_options(),
+        )
+        instrument_engine(f"replica{index}_async", replica_async_engine.sync_engine)
+        instrument_statements(replica_async_engine.sync_engine)
+        replica_router.watch(index, replica_async_engine.sync_engine)
+        AsyncReplicaSessionLocals.append(
+            async_sessionmaker(
+                replica_async_engine, autoflush=False, expire_on_commit=False
+            )
+        )
+    else:
+        replica_engine = create_engine(
+            url, future=True, poolclass=TimedQueuePool, **pool_options()
+        )
+        instrument_engine(f"replica{index}", replica_engine)
+        instrument_statements(replica_engine)
+        replica_router.watch(index, replica_engine)
+        ReplicaSessionLocals.append(
+            sessionmaker(autocommit=False, autoflush=False, bind=replica_engine)
+        )
@@ -1,8 +1,13 @@
-from fastapi import FastAPI
+from fastapi import Depends, FastAPI, Request, status
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, PlainTextResponse
 
 from app.core.config import settings
+from app.api.deps import require_operator
+from app.core.metrics import MetricsMiddleware, registry
+from app.core.security import PasswordHashingBusy, shutdown_hash_executor
 from app.api.v1.router import api_router
+from app.services.report_jobs import report_jobs
 
 
 app = FastAPI(title=settings.PROJECT_NAME)
@@ -16,10 +21,45 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Added last so it wraps everything, including CORS preflights.
+app.add_middleware(MetricsMiddleware)
+
 # Include versioned API
 app.include_router(api_router, prefix="/api/v1")
 
 
+@app.exception_handler(PasswordHashingBusy)
+def password_hashing_busy_handler(request: Request, exc: PasswordHashingBusy):
+    return JSONResponse(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        content={"detail": "Server busy, please retry"},
+        headers={"Retry-After": str(exc.retry_after)},
+    )
+
+
+@app.on_event("startup")
+def start_background_workers() -> None:
+    # Started here so that, with the database backend, this process also
+    # runs jobs submitted through others; submit() starts it otherwise.
+    report_jobs.start()
+
+
+@app.on_event("shutdown")
+def shutdown_executors() -> None:
+    shutdown_hash_executor()
+    report_jobs.stop()
+
+
 @app.get("/", tags=["Health"])
 def read_root():
     return {"message": "Expense Tracker API is running"}
+
+
+@app.get("/metrics", include_in_schema=False, dependencies=[Depends(require_operator)])
+def metrics():
+    """
+    Prometheus scrape endpoint.
+    """
+    return PlainTextResponse(
+        registry.render(), media_type="text/plain; version=0.0.4"
+    )
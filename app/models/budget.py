@@ -0,0 +1,93 @@
+from datetime import datetime
+
+from sqlalchemy import (
+    Boolean,
+    Column,
+    DateTime,
+    Float,
+    ForeignKey,
+    Index,
+    Integer,
+    String,
+)
+
+from app.db.base import Base
+
+
+class Budget(Base):
+    """
+    Monthly spending limit of a user, for one expense category or, with
+    category_id NULL, for all expenses.
+    """
+
+    __tablename__ = "budgets"
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(
+        Integer,
+        ForeignKey("users.id", ondelete="CASCADE"),
+        nullable=False,
+        index=True,
+    )
+    category_id = Column(
+        Integer, ForeignKey("categories.id", ondelete="CASCADE"), nullable=True
+    )
+    limit_amount = Column(Float, nullable=False)
+    # First tracked month (e.g. 202403): the one the budget was set in
+    start_month = Column(Integer, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+
+class BudgetPeriod(Base):
+    """
+    Running expense total of a budget for one calendar month, and the
+    alert level it has reached. Maintained in the same DB transaction as
+    every transaction write.
+    """
+
+    __tablename__ = "budget_periods"
+
+    budget_id = Column(
+        Integer, ForeignKey("budgets.id", ondelete="CASCADE"), primary_key=True
+    )
+    year_month = Column(Integer, primary_key=True)  # e.g. 202403
+    spent = Column(Float, nullable=False, default=0.0)
+    # 0 = below every threshold, else the rank of the level reached
+    level = Column(Integer, nullable=False, default=0)
+
+
+class BudgetAlert(Base):
+    """
+    A threshold crossing of a budget period, recorded at write time.
+    Only the alert for the period's current level is active.
+    """
+
+    __tablename__ = "budget_alerts"
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(
+        Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False
+    )
+    budget_id = Column(
+        Integer, ForeignKey("budgets.id", ondelete="CASCADE"), nullable=False
+    )
+    year_month = Column(Integer, nullable=False)
+    level = Column(String, nullable=False)  # info/warning/danger
+    spent = Column(Float, nullable=False)
+    limit_amount = Column(Float, nullable=False)
+    message = Column(String, nullable=False)
+    active = Column(Boolean, nullable=False, default=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+
+Index(
+    "ix_budget_alerts_user_active_period",
+    BudgetAlert.user_id,
+    BudgetAlert.active,
+    BudgetAlert.year_month,
+)
+Index(
+    "ix_budget_alerts_budget_period",
+    BudgetAlert.budget_id,
+    BudgetAlert.year_month,
+)
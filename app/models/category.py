@@ -11,7 +11,7 @@ class Category(Base):
     name = Column(String, index=True, nullable=False)
     type = Column(String, nullable=False)  # "income" or "expense"
 
-    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
     owner = relationship("User", back_populates="categories")
 
     transactions = relationship("Transaction", back_populates="category")
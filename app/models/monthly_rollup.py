@@ -0,0 +1,23 @@
+from sqlalchemy import Column, Float, ForeignKey, Integer, String
+
+from app.db.base import Base
+
+
+class MonthlyRollup(Base):
+    """
+    Per-user running totals of transactions by calendar month.
+    Maintained in the same DB transaction as every transaction write.
+    """
+
+    __tablename__ = "monthly_rollups"
+
+    user_id = Column(
+        Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True
+    )
+    year_month = Column(Integer, primary_key=True)  # e.g. 202403
+    # 0 stands for "no category" so the column can be part of the key
+    category_id = Column(Integer, primary_key=True, default=0)
+    type = Column(String, primary_key=True)  # "income" or "expense"
+
+    total_amount = Column(Float, nullable=False, default=0.0)
+    tx_count = Column(Integer, nullable=False, default=0)
@@ -0,0 +1,34 @@
+from datetime import datetime
+
+from sqlalchemy import Column, DateTime, ForeignKey, Index, Integer, String, Text
+
+from app.db.base import Base
+
+
+class ReportJob(Base):
+    """
+    A background report job, used as the queue and result store when
+    REPORT_JOB_BACKEND is "database".
+    """
+
+    __tablename__ = "report_jobs"
+
+    id = Column(String(32), primary_key=True)  # uuid4 hex
+    user_id = Column(
+        Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False
+    )
+    report_type = Column(String, nullable=False)  # summary/timeseries
+    params = Column(Text, nullable=False)  # JSON
+    status = Column(String, nullable=False)  # queued/running/done/failed
+    result = Column(Text, nullable=True)  # JSON report once done
+    error = Column(String, nullable=True)
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    started_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
+    expires_at = Column(DateTime, nullable=True)
+
+
+# Claiming the oldest queued job, and purging finished ones.
+Index("ix_report_jobs_status_created", ReportJob.status, ReportJob.created_at)
+# Per-user pending and running counts.
+Index("ix_report_jobs_user_status", ReportJob.user_id, ReportJob.status)
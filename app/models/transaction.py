@@ -1,6 +1,16 @@
 from datetime import datetime
 
-from sqlalchemy import Column, DateTime, Float, ForeignKey, Integer, String
+from sqlalchemy import (
+    DDL,
+    Column,
+    DateTime,
+    Float,
+    ForeignKey,
+    Index,
+    Integer,
+    String,
+    event,
+)
 from sqlalchemy.orm import relationship
 
 from app.db.base import Base
@@ -20,3 +30,82 @@ class Transaction(Base):
 
     owner = relationship("User", back_populates="transactions")
     category = relationship("Category", back_populates="transactions")
+
+
+# Composite indexes for the real access paths: every query is scoped by
+# user_id first, then ordered or filtered by date (keyset pagination
+# walks date DESC, id DESC).
+Index(
+    "ix_transactions_user_date_id",
+    Transaction.user_id,
+    Transaction.date.desc(),
+    Transaction.id.desc(),
+)
+Index(
+    "ix_transactions_user_category_date",
+    Transaction.user_id,
+    Transaction.category_id,
+    Transaction.date,
+)
+Index(
+    "ix_transactions_user_type_date",
+    Transaction.user_id,
+    Transaction.type,
+    Transaction.date,
+)
+
+
+# Full-text search over description (see search_service). Created with
+# the table for create_all users and by migration 0004 otherwise.
+#
+# PostgreSQL: GIN indexes led by user_id (btree_gin), one over the
+# tsvector of the description for word search, one over its trigrams
+# (pg_trgm) for substring and fuzzy matching. search_service repeats the
+# tsvector expression verbatim so the planner can match the index.
+#
+# SQLite: an external-content FTS5 table with the trigram tokenizer
+# (substring matching), kept in sync with transactions by triggers.
+SEARCH_FTS_TABLE = "transactions_fts"
+
+SEARCH_DDL = {
+    "postgresql": [
+        "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+        "CREATE EXTENSION IF NOT EXISTS btree_gin",
+        "CREATE INDEX IF NOT EXISTS ix_transactions_search_tsv ON transactions "
+        "USING gin (user_id, to_tsvector('simple', coalesce(description, '')))",
+        "CREATE INDEX IF NOT EXISTS ix_transactions_search_trgm ON transactions "
+        "USING gin (user_id, description gin_trgm_ops)",
+    ],
+    "sqlite": [
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {SEARCH_FTS_TABLE} USING fts5("
+        "description, content='transactions', content_rowid='id', "
+        "tokenize='trigram')",
+        f"CREATE TRIGGER IF NOT EXISTS {SEARCH_FTS_TABLE}_ai "
+        "AFTER INSERT ON transactions BEGIN "
+        f"INSERT INTO {SEARCH_FTS_TABLE}(rowid, description) "
+        "VALUES (new.id, new.description); END",
+        f"CREATE TRIGGER IF NOT EXISTS {SEARCH_FTS_TABLE}_ad "
+        "AFTER DELETE ON transactions BEGIN "
+        f"INSERT INTO {SEARCH_FTS_TABLE}({SEARCH_FTS_TABLE}, rowid, description) "
+        "VALUES ('delete', old.id, old.description); END",
+        f"CREATE TRIGGER IF NOT EXISTS {SEARCH_FTS_TABLE}_au "
+        "AFTER UPDATE OF description ON transactions BEGIN "
+        f"INSERT INTO {SEARCH_FTS_TABLE}({SEARCH_FTS_TABLE}, rowid, description) "
+        "VALUES ('delete', old.id, old.description); "
+        f"INSERT INTO {SEARCH_FTS_TABLE}(rowid, description) "
+        "VALUES (new.id, new.description); END",
+    ],
+}
+
+for _dialect, _statements in SEARCH_DDL.items():
+    for _statement in _statements:
+        event.listen(
+            Transaction.__table__,
+            "after_create",
+            DDL(_statement).execute_if(dialect=_dialect),
+        )
+event.listen(
+    Transaction.__table__,
+    "after_drop",
+    DDL(f"DROP TABLE IF EXISTS {SEARCH_FTS_TABLE}").execute_if(dialect="sqlite"),
+)
@@ -14,6 +14,8 @@ class User(Base):
     hashed_password = Column(String, nullable=False)
     is_active = Column(Boolean, default=True)
     created_at = Column(DateTime, default=datetime.utcnow)
+    # Bumped by every transaction/category write; used to validate caches
+    data_version = Column(Integer, nullable=False, default=0, server_default="0")
 
     categories = relationship("Category", back_populates="owner")
     transactions = relationship("Transaction", back_populates="owner")
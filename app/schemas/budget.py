@@ -0,0 +1,42 @@
+from datetime import datetime
+
+from pydantic import BaseModel, Field
+
+
+class BudgetCreate(BaseModel):
+    # None: a budget for all expenses
+    category_id: int | None = None
+    limit_amount: float = Field(..., gt=0)
+
+
+class BudgetUpdate(BaseModel):
+    limit_amount: float = Field(..., gt=0)
+
+
+class BudgetRead(BaseModel):
+    id: int
+    category_id: int | None
+    limit_amount: float
+
+    class Config:
+        orm_mode = True
+
+
+class BudgetStatus(BudgetRead):
+    year_month: int  # e.g. 202403
+    spent: float
+    level: str | None  # highest level reached: info/warning/danger
+
+
+class BudgetAlertRead(BaseModel):
+    id: int
+    budget_id: int
+    year_month: int
+    level: str  # info/warning/danger
+    spent: float
+    limit_amount: float
+    message: str
+    created_at: datetime
+
+    class Config:
+        orm_mode = True
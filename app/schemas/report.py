@@ -1,4 +1,5 @@
-from pydantic import BaseModel
+from datetime import datetime
+from pydantic import BaseModel, Field
 from typing import List
 
 
@@ -14,3 +15,36 @@ class ReportSummary(BaseModel):
     total_expense: float
     net: float
     by_category: List[CategorySummary]
+
+
+class TimeSeriesPoint(ReportSummary):
+    period_start: datetime
+
+
+class TimeSeriesReport(BaseModel):
+    granularity: str  # "day", "week" or "month"
+    points: List[TimeSeriesPoint]
+
+
+class ReportJobCreate(BaseModel):
+    # One of the report types in report_jobs.REPORT_TYPES
+    report_type: str = Field("summary", regex="^(summary|timeseries)$")
+    date_from: datetime | None = None
+    date_to: datetime | None = None
+    # timeseries only
+    granularity: str = Field("month", regex="^(day|week|month)$")
+    by_category: bool = False
+
+
+class ReportJobRead(BaseModel):
+    id: str
+    report_type: str
+    status: str  # "queued", "running", "done" or "failed"
+    created_at: datetime
+    started_at: datetime | None
+    finished_at: datetime | None
+    # Until then the job and its result can be fetched
+    expires_at: datetime | None
+    error: str | None
+    # ReportSummary or TimeSeriesReport, once done
+    result: dict | None
@@ -1,6 +1,7 @@
 from datetime import datetime
+from typing import Annotated, List, Literal, Union
 
-from pydantic import BaseModel
+from pydantic import BaseModel, Field, validator
 
 
 class TransactionBase(BaseModel):
@@ -16,12 +17,20 @@ class TransactionCreate(TransactionBase):
 
 
 class TransactionUpdate(BaseModel):
+    # Omit a field to keep its value; amount, type and date cannot be
+    # cleared (a NULL date would also break keyset pagination).
     amount: float | None = None
     type: str | None = None
     description: str | None = None
     date: datetime | None = None
     category_id: int | None = None
 
+    @validator("amount", "type", "date", pre=True)
+    def not_null(cls, value):
+        if value is None:
+            raise ValueError("may be omitted but not null")
+        return value
+
 
 class TransactionRead(TransactionBase):
     id: int
@@ -29,3 +38,69 @@ class TransactionRead(TransactionBase):
 
     class Config:
         orm_mode = True
+
+
+class TransactionPage(BaseModel):
+    items: List[TransactionRead]
+    next_cursor: str | None = None
+
+
+class TransactionSearchHit(TransactionRead):
+    rank: float  # higher is better; only comparable within one search
+
+
+class TransactionSearchPage(BaseModel):
+    items: List[TransactionSearchHit]
+    next_offset: int | None = None
+
+
+class ImportRowError(BaseModel):
+    row: int
+    errors: List[str]
+
+
+class TransactionImportResult(BaseModel):
+    imported: int
+    failed: int
+    errors: List[ImportRowError]
+
+
+class BatchCreateOp(BaseModel):
+    op: Literal["create"]
+    data: TransactionCreate
+
+
+class BatchUpdateOp(BaseModel):
+    op: Literal["update"]
+    id: int
+    data: TransactionUpdate
+
+
+class BatchDeleteOp(BaseModel):
+    op: Literal["delete"]
+    id: int
+
+
+BatchOp = Annotated[
+    Union[BatchCreateOp, BatchUpdateOp, BatchDeleteOp],
+    Field(discriminator="op"),
+]
+
+
+class TransactionBatchRequest(BaseModel):
+    operations: List[BatchOp] = Field(..., min_items=1, max_items=1000)
+    # If true, any failed operation rolls back the whole batch.
+    atomic: bool = False
+
+
+class BatchOpResult(BaseModel):
+    index: int
+    op: str
+    ok: bool
+    id: int | None = None
+    error: str | None = None
+
+
+class TransactionBatchResult(BaseModel):
+    committed: bool
+    results: List[BatchOpResult]
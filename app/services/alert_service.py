@@ -1,27 +1,110 @@
-from dataclasses import dataclass
-from typing import List
-
-from app.schemas.report import ReportSummary
-
-
-@dataclass
-class Alert:
-    message: str
-    level: str  # info/warning/danger
-
-
-def check_spending_limits(
-    report: ReportSummary, monthly_limit: float
-) -> List[Alert]:
-    alerts: List[Alert] = []
-    if report.total_expense > monthly_limit:
-        alerts.append(
-            Alert(
-                message=(
-                    f"You exceeded your monthly limit "
-                    f"({report.total_expense:.2f} > {monthly_limit:.2f})"
-                ),
-                level="danger",
+from typing import List, Optional
+
+from sqlalchemy import update
+from sqlalchemy.orm import Session
+
+from app.models.budget import BudgetAlert
+
+# Alert levels by rank (1-based); a budget period at rank 0 has no alert.
+LEVELS = ("info", "warning", "danger")
+
+# Share of the limit at which each level starts, in rank order.
+THRESHOLDS = (0.5, 0.8, 1.0)
+
+
+def level_for(spent: float, limit_amount: float) -> int:
+    """
+    Rank of the highest level reached by spent against limit_amount.
+    """
+    rank = 0
+    for threshold in THRESHOLDS:
+        if spent >= threshold * limit_amount:
+            rank += 1
+    return rank
+
+
+def _message(rank: int, spent: float, limit_amount: float, label: str) -> str:
+    if rank == len(LEVELS):
+        return (
+            f"You exceeded your {label} budget "
+            f"({spent:.2f} > {limit_amount:.2f})"
+        )
+    share = spent / limit_amount * 100
+    return (
+        f"You have used {share:.0f}% of your {label} budget "
+        f"({spent:.2f} of {limit_amount:.2f})"
+    )
+
+
+def change_level(
+    db: Session,
+    user_id: int,
+    budget_id: int,
+    year_month: int,
+    old_rank: int,
+    new_rank: int,
+    spent: float,
+    limit_amount: float,
+    label: str,
+) -> None:
+    """
+    Keep one active alert per budget period, for the highest level it
+    is at. Rising records a new alert; dropping back (e.g. after a
+    deletion) reactivates the period's latest alert of the lower level.
+    Does not commit.
+    """
+    db.execute(
+        update(BudgetAlert)
+        .where(
+            BudgetAlert.budget_id == budget_id,
+            BudgetAlert.year_month == year_month,
+            BudgetAlert.active.is_(True),
+        )
+        .values(active=False)
+        .execution_options(synchronize_session=False)
+    )
+    if not new_rank:
+        return
+
+    level = LEVELS[new_rank - 1]
+    if new_rank < old_rank:
+        previous = (
+            db.query(BudgetAlert)
+            .filter(
+                BudgetAlert.budget_id == budget_id,
+                BudgetAlert.year_month == year_month,
+                BudgetAlert.level == level,
             )
+            .order_by(BudgetAlert.id.desc())
+            .first()
         )
-    return alerts
+        if previous is not None:
+            previous.active = True
+            return
+
+    db.add(
+        BudgetAlert(
+            user_id=user_id,
+            budget_id=budget_id,
+            year_month=year_month,
+            level=level,
+            spent=spent,
+            limit_amount=limit_amount,
+            message=_message(new_rank, spent, limit_amount, label),
+        )
+    )
+
+
+def list_active_alerts(
+    db: Session, user_id: int, year_month: Optional[int] = None
+) -> List[BudgetAlert]:
+    """
+    Active alerts of a user, newest first; only those of year_month
+    when given.
+    """
+    q = db.query(BudgetAlert).filter(
+        BudgetAlert.user_id == user_id, BudgetAlert.active.is_(True)
+    )
+    if year_month is not None:
+        q = q.filter(BudgetAlert.year_month == year_month)
+    return q.order_by(BudgetAlert.created_at.desc(), BudgetAlert.id.desc()).all()
@@ -0,0 +1,144 @@
+from datetime import datetime
+from typing import Dict, List, Set
+
+from sqlalchemy import delete, insert, update
+from sqlalchemy.orm import Session
+
+from app.models.category import Category
+from app.models.transaction import Transaction
+from app.schemas.transaction import (
+    BatchCreateOp,
+    BatchOpResult,
+    BatchUpdateOp,
+    TransactionBatchRequest,
+    TransactionBatchResult,
+)
+from app.services.data_version import bump_data_version
+from app.services.rollup_service import ROLLUP_FIELDS, record_changes
+
+
+def _owned_category_ids(db: Session, user_id: int, ids: Set[int]) -> Set[int]:
+    if not ids:
+        return set()
+    return {
+        id_
+        for (id_,) in db.query(Category.id).filter(
+            Category.user_id == user_id, Category.id.in_(ids)
+        )
+    }
+
+
+def _owned_transactions(
+    db: Session, user_id: int, ids: Set[int]
+) -> Dict[int, dict]:
+    """
+    Rollup-relevant column values of the user's transactions among ids,
+    read as plain rows in one query.
+    """
+    if not ids:
+        return {}
+    columns = [getattr(Transaction, field) for field in ROLLUP_FIELDS]
+    rows = db.query(Transaction.id, *columns).filter(
+        Transaction.user_id == user_id, Transaction.id.in_(ids)
+    )
+    return {row[0]: dict(zip(ROLLUP_FIELDS, row[1:])) for row in rows}
+
+
+def apply_batch(
+    db: Session, user_id: int, batch: TransactionBatchRequest
+) -> TransactionBatchResult:
+    """
+    Apply a list of create/update/delete operations with one ownership
+    query per table, one bulk statement per kind of operation and a single
+    commit. Operations are resolved in order, so an update that follows a
+    delete of the same id fails as not found.
+    """
+    ops = batch.operations
+
+    referenced_tx = {op.id for op in ops if not isinstance(op, BatchCreateOp)}
+    referenced_cat = {
+        op.data.category_id
+        for op in ops
+        if isinstance(op, (BatchCreateOp, BatchUpdateOp))
+        and op.data.category_id is not None
+    }
+    original = _owned_transactions(db, user_id, referenced_tx)
+    current = {id_: dict(values) for id_, values in original.items()}
+    category_ids = _owned_category_ids(db, user_id, referenced_cat)
+
+    results: List[BatchOpResult] = []
+    creates: List[dict] = []
+    create_results: List[BatchOpResult] = []
+    updates: Dict[int, dict] = {}
+    deletes: Set[int] = set()
+    now = datetime.utcnow()
+
+    for index, op in enumerate(ops):
+        result = BatchOpResult(index=index, op=op.op, ok=True)
+        results.append(result)
+
+        if isinstance(op, BatchCreateOp):
+            values = op.data.dict()
+        else:
+            result.id = op.id
+            if op.id not in current:
+                result.ok, result.error = False, "Transaction not found"
+                continue
+            values = op.data.dict(exclude_unset=True) if op.op == "update" else {}
+
+        category_id = values.get("category_id")
+        if category_id is not None and category_id not in category_ids:
+            result.ok, result.error = False, "Category not found"
+            continue
+
+        if isinstance(op, BatchCreateOp):
+            values["date"] = values["date"] or now
+            values["user_id"] = user_id
+            creates.append(values)
+            create_results.append(result)
+        elif op.op == "update":
+            updates.setdefault(op.id, {}).update(values)
+            current[op.id].update(
+                (k, v) for k, v in values.items() if k in ROLLUP_FIELDS
+            )
+        else:
+            del current[op.id]
+            updates.pop(op.id, None)
+            deletes.add(op.id)
+
+    if batch.atomic and not all(r.ok for r in results):
+        db.rollback()
+        return TransactionBatchResult(committed=False, results=results)
+
+    # Bulk UPDATE by primary key; ownership was verified above.
+    for id_, values in updates.items():
+        values["id"] = id_
+    rows = [values for values in updates.values() if len(values) > 1]
+    if rows:
+        db.execute(update(Transaction), rows)
+    if deletes:
+        db.execute(
+            delete(Transaction).where(
+                Transaction.user_id == user_id, Transaction.id.in_(deletes)
+            )
+        )
+    if creates:
+        new_ids = db.scalars(
+            insert(Transaction).returning(
+                Transaction.id, sort_by_parameter_order=True
+            ),
+            creates,
+        ).all()
+        for result, new_id in zip(create_results, new_ids):
+            result.id = new_id
+
+    touched = deletes.union(updates)
+    record_changes(
+        db,
+        user_id,
+        removed=[original[id_] for id_ in touched],
+        added=[current[id_] for id_ in updates] + creates,
+    )
+    bump_data_version(db, user_id)
+    db.commit()
+    return TransactionBatchResult(committed=True, results=results)
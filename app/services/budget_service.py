@@ -0,0 +1,309 @@
+from collections import defaultdict
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import delete, select
+from sqlalchemy.engine import Row
+from sqlalchemy.orm import Session
+
+from app.models.budget import Budget, BudgetAlert, BudgetPeriod
+from app.models.category import Category
+from app.models.monthly_rollup import MonthlyRollup
+from app.schemas.budget import BudgetCreate, BudgetUpdate
+from app.services import alert_service
+
+# (year_month, category_id) -> change of the expense total, with 0 for
+# "no category" as in monthly_rollups.
+SpendingDeltas = Dict[Tuple[int, int], float]
+
+
+def current_year_month() -> int:
+    now = datetime.utcnow()
+    return now.year * 100 + now.month
+
+
+def _label(budget: Row) -> str:
+    return f'"{budget.category_name}"' if budget.category_name else "overall"
+
+
+def _budget_rows(
+    db: Session, user_id: int, budget_id: Optional[int] = None, lock: bool = False
+) -> List[Row]:
+    q = (
+        select(
+            Budget.id,
+            Budget.category_id,
+            Budget.limit_amount,
+            Budget.start_month,
+            Category.name.label("category_name"),
+        )
+        .outerjoin(Category, Category.id == Budget.category_id)
+        .where(Budget.user_id == user_id)
+    )
+    if budget_id is not None:
+        q = q.where(Budget.id == budget_id)
+    if lock:
+        # Serializes concurrent writes of the same user that touch budgets.
+        q = q.with_for_update(of=Budget)
+    return db.execute(q).all()
+
+
+def _rollup_spent(
+    db: Session, user_id: int, year_months: Iterable[int]
+) -> SpendingDeltas:
+    """
+    Expense totals per (year_month, category_id) from monthly_rollups.
+    """
+    rows = db.execute(
+        select(
+            MonthlyRollup.year_month,
+            MonthlyRollup.category_id,
+            MonthlyRollup.total_amount,
+        ).where(
+            MonthlyRollup.user_id == user_id,
+            MonthlyRollup.year_month.in_(set(year_months)),
+            MonthlyRollup.type == "expense",
+        )
+    ).all()
+    return {(ym, category_id): total for ym, category_id, total in rows}
+
+
+def _spent(totals: SpendingDeltas, category_id: Optional[int], ym: int) -> float:
+    if category_id is None:
+        return sum(total for (month, _), total in totals.items() if month == ym)
+    return totals.get((ym, category_id), 0.0)
+
+
+def _evaluate(db: Session, user_id: int, budget: Row, period: BudgetPeriod) -> None:
+    """
+    Update the period's level and its alerts if spending crossed a
+    threshold in either direction.
+    """
+    rank = alert_service.level_for(period.spent, budget.limit_amount)
+    if rank != period.level:
+        alert_service.change_level(
+            db,
+            user_id,
+            budget.id,
+            period.year_month,
+            period.level,
+            rank,
+            period.spent,
+            budget.limit_amount,
+            _label(budget),
+        )
+    period.level = rank
+
+
+def record_spending(db: Session, user_id: int, deltas: SpendingDeltas) -> None:
+    """
+    Apply the expense changes of a transaction write to the running
+    totals of the user's budgets and record threshold crossings. Called
+    by record_changes after the monthly rollups are updated; does not
+    commit.
+
+    Costs one indexed budgets lookup per write, plus one period row per
+    affected budget and month; history is never rescanned. A period seen
+    for the first time is seeded from the rollups, which already include
+    this write.
+    """
+    deltas = {key: amount for key, amount in deltas.items() if amount}
+    if not deltas:
+        return
+    budgets = {b.id: b for b in _budget_rows(db, user_id, lock=True)}
+    if not budgets:
+        return
+
+    changes: Dict[Tuple[int, int], float] = defaultdict(float)
+    for (ym, category_id), amount in deltas.items():
+        for budget in budgets.values():
+            # Months before the budget was set are not tracked.
+            if ym < budget.start_month:
+                continue
+            if budget.category_id in (None, category_id):
+                changes[(budget.id, ym)] += amount
+    if not changes:
+        return
+
+    periods = {
+        (p.budget_id, p.year_month): p
+        for p in db.query(BudgetPeriod).filter(
+            BudgetPeriod.budget_id.in_({b for b, _ in changes}),
+            BudgetPeriod.year_month.in_({ym for _, ym in changes}),
+        )
+    }
+    missing = [key for key in changes if key not in periods]
+    if missing:
+        totals = _rollup_spent(db, user_id, (ym for _, ym in missing))
+        for budget_id, ym in missing:
+            periods[(budget_id, ym)] = period = BudgetPeriod(
+                budget_id=budget_id,
+                year_month=ym,
+                spent=_spent(totals, budgets[budget_id].category_id, ym),
+                level=0,
+            )
+            db.add(period)
+
+    seeded = set(missing)
+    for key, amount in changes.items():
+        period = periods[key]
+        if key not in seeded:
+            period.spent += amount
+        _evaluate(db, user_id, budgets[key[0]], period)
+
+
+def _refresh_period(db: Session, user_id: int, budget_id: int, ym: int) -> None:
+    """
+    Recompute one budget period from the rollups and re-evaluate its
+    level, e.g. after the budget was created or its limit changed.
+    """
+    (budget,) = _budget_rows(db, user_id, budget_id, lock=True)
+    period = db.get(BudgetPeriod, (budget_id, ym))
+    if period is None:
+        period = BudgetPeriod(budget_id=budget_id, year_month=ym, level=0)
+        db.add(period)
+    period.spent = _spent(
+        _rollup_spent(db, user_id, [ym]), budget.category_id, ym
+    )
+    _evaluate(db, user_id, budget, period)
+
+
+def create_budget(db: Session, user_id: int, budget_in: BudgetCreate) -> Budget:
+    if budget_in.category_id is not None:
+        category = (
+            db.query(Category)
+            .filter(
+                Category.id == budget_in.category_id,
+                Category.user_id == user_id,
+            )
+            .first()
+        )
+        if not category:
+            raise ValueError("Category not found")
+        if category.type != "expense":
+            raise ValueError("Budgets apply to expense categories only")
+
+    exists = (
+        db.query(Budget.id)
+        .filter(
+            Budget.user_id == user_id,
+            Budget.category_id.is_(None)
+            if budget_in.category_id is None
+            else Budget.category_id == budget_in.category_id,
+        )
+        .first()
+    )
+    if exists:
+        raise ValueError("A budget for this category already exists")
+
+    ym = current_year_month()
+    budget = Budget(
+        user_id=user_id,
+        category_id=budget_in.category_id,
+        limit_amount=budget_in.limit_amount,
+        start_month=ym,
+    )
+    db.add(budget)
+    db.flush()
+    _refresh_period(db, user_id, budget.id, ym)
+    db.commit()
+    db.refresh(budget)
+    return budget
+
+
+def list_budgets(
+    db: Session, user_id: int, year_month: Optional[int] = None
+) -> List[dict]:
+    """
+    Budgets of a user with their spending and level in year_month
+    (default: the current month).
+    """
+    ym = year_month or current_year_month()
+    budgets = _budget_rows(db, user_id)
+    if not budgets:
+        return []
+    periods = {
+        p.budget_id: p
+        for p in db.query(BudgetPeriod).filter(
+            BudgetPeriod.budget_id.in_([b.id for b in budgets]),
+            BudgetPeriod.year_month == ym,
+        )
+    }
+    # Months without a write since the budget exists have no period row.
+    totals = None
+    if len(periods) < len(budgets):
+        totals = _rollup_spent(db, user_id, [ym])
+
+    result = []
+    for budget in budgets:
+        period = periods.get(budget.id)
+        if period is not None:
+            spent, rank = period.spent, period.level
+        else:
+            spent = _spent(totals, budget.category_id, ym)
+            rank = alert_service.level_for(spent, budget.limit_amount)
+        result.append(
+            {
+                "id": budget.id,
+                "category_id": budget.category_id,
+                "limit_amount": budget.limit_amount,
+                "year_month": ym,
+                "spent": spent,
+                "level": alert_service.LEVELS[rank - 1] if rank else None,
+            }
+        )
+    return result
+
+
+def get_budget(db: Session, user_id: int, budget_id: int) -> Optional[Budget]:
+    return (
+        db.query(Budget)
+        .filter(Budget.id == budget_id, Budget.user_id == user_id)
+        .first()
+    )
+
+
+def update_budget(
+    db: Session, user_id: int, budget_id: int, budget_in: BudgetUpdate
+) -> Optional[Budget]:
+    budget = get_budget(db, user_id, budget_id)
+    if not budget:
+        return None
+
+    budget.limit_amount = budget_in.limit_amount
+    db.flush()
+    _refresh_period(db, user_id, budget.id, current_year_month())
+    db.commit()
+    db.refresh(budget)
+    return budget
+
+
+def _delete_budgets(db: Session, budget_ids: List[int]) -> None:
+    # Explicit, as SQLite does not enforce the ON DELETE CASCADE.
+    db.execute(delete(BudgetAlert).where(BudgetAlert.budget_id.in_(budget_ids)))
+    db.execute(delete(BudgetPeriod).where(BudgetPeriod.budget_id.in_(budget_ids)))
+    db.execute(delete(Budget).where(Budget.id.in_(budget_ids)))
+
+
+def delete_budget(db: Session, user_id: int, budget_id: int) -> bool:
+    budget = get_budget(db, user_id, budget_id)
+    if not budget:
+        return False
+
+    _delete_budgets(db, [budget.id])
+    db.commit()
+    return True
+
+
+def delete_category_budgets(db: Session, user_id: int, category_id: int) -> None:
+    """
+    Drop the budgets of a category that is being deleted. Does not commit.
+    """
+    budget_ids = [
+        budget_id
+        for (budget_id,) in db.query(Budget.id).filter(
+            Budget.user_id == user_id, Budget.category_id == category_id
+        )
+    ]
+    if budget_ids:
+        _delete_budgets(db, budget_ids)
@@ -0,0 +1,81 @@
+from typing import List, Optional, Sequence
+
+from sqlalchemy.engine import Row
+from sqlalchemy.orm import Session
+
+from app.models.category import Category
+from app.schemas.category import CategoryCreate, CategoryRead, CategoryUpdate
+from app.services.budget_service import delete_category_budgets
+from app.services.data_version import bump_data_version
+
+# Columns of CategoryRead, selected as plain row tuples for listings.
+READ_COLUMNS = tuple(
+    getattr(Category, name) for name in CategoryRead.__fields__
+)
+
+
+def create_category(
+    db: Session, user_id: int, category_in: CategoryCreate
+) -> Category:
+    category = Category(
+        name=category_in.name,
+        type=category_in.type,
+        user_id=user_id,
+    )
+    db.add(category)
+    bump_data_version(db, user_id)
+    db.commit()
+    db.refresh(category)
+    return category
+
+
+def list_categories(
+    db: Session, user_id: int, fields: Optional[Sequence[str]] = None
+) -> List[Row]:
+    columns = READ_COLUMNS
+    if fields is not None:
+        columns = tuple(c for c in READ_COLUMNS if c.key in fields)
+    return db.query(*columns).filter(Category.user_id == user_id).all()
+
+
+def get_category(
+    db: Session, user_id: int, category_id: int
+) -> Optional[Category]:
+    return (
+        db.query(Category)
+        .filter(
+            Category.id == category_id,
+            Category.user_id == user_id,
+        )
+        .first()
+    )
+
+
+def update_category(
+    db: Session, user_id: int, category_id: int, category_in: CategoryUpdate
+) -> Optional[Category]:
+    category = get_category(db, user_id, category_id)
+    if not category:
+        return None
+
+    if category_in.name is not None:
+        category.name = category_in.name
+    if category_in.type is not None:
+        category.type = category_in.type
+
+    bump_data_version(db, user_id)
+    db.commit()
+    db.refresh(category)
+    return category
+
+
+def delete_category(db: Session, user_id: int, category_id: int) -> bool:
+    category = get_category(db, user_id, category_id)
+    if not category:
+        return False
+
+    delete_category_budgets(db, user_id, category_id)
+    db.delete(category)
+    bump_data_version(db, user_id)
+    db.commit()
+    return True
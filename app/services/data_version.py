@@ -0,0 +1,28 @@
+from sqlalchemy import update
+from sqlalchemy.orm import Session
+
+from app.models.user import User
+
+
+def get_data_version(db: Session, user_id: int) -> int:
+    """
+    Current data version of a user: a single primary-key lookup.
+    """
+    return (
+        db.query(User.data_version).filter(User.id == user_id).scalar() or 0
+    )
+
+
+def bump_data_version(db: Session, user_id: int) -> None:
+    """
+    Mark the user's financial data as changed. Call it inside the same
+    DB transaction as the write, before commit, so readers never see new
+    data with an old version. Replicas that have not replayed the bump
+    yet are skipped for the user's reads.
+    """
+    db.execute(
+        update(User)
+        .where(User.id == user_id)
+        .values(data_version=User.data_version + 1)
+        .execution_options(synchronize_session=False)
+    )
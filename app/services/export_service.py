@@ -0,0 +1,113 @@
+import csv
+import io
+import json
+from typing import AsyncIterator, Iterator
+
+from sqlalchemy import Select, select
+from sqlalchemy.orm import Session
+
+from app.db.session import AsyncSessionLocal, SessionLocal
+from app.models.transaction import Transaction
+
+EXPORT_COLUMNS = ["id", "date", "type", "amount", "category_id", "description"]
+
+# Rows fetched per round trip from the server-side cursor.
+EXPORT_CHUNK_SIZE = 2000
+
+
+def export_stmt(user_id: int) -> Select:
+    """
+    Column-only SELECT of a user's transactions in export order.
+    Callers narrow it further with the same filters as list_transactions.
+    """
+    return (
+        select(*(getattr(Transaction, c) for c in EXPORT_COLUMNS))
+        .where(Transaction.user_id == user_id)
+        .order_by(Transaction.date.desc(), Transaction.id.desc())
+    )
+
+
+def _iter_chunks(stmt: Select) -> Iterator[list]:
+    """
+    Yield lists of plain row tuples straight off a server-side cursor.
+
+    The session is owned by the generator rather than the request
+    dependency, so it stays open for as long as the response streams
+    and is closed once the client has consumed (or dropped) it.
+    """
+    db: Session = SessionLocal()
+    try:
+        result = db.execute(
+            stmt.execution_options(yield_per=EXPORT_CHUNK_SIZE)
+        )
+        for partition in result.partitions():
+            yield partition
+    finally:
+        db.close()
+
+
+async def _aiter_chunks(stmt: Select) -> AsyncIterator[list]:
+    """
+    Async counterpart of _iter_chunks for the async engine.
+    """
+    async with AsyncSessionLocal() as db:
+        result = await db.stream(
+            stmt.execution_options(yield_per=EXPORT_CHUNK_SIZE)
+        )
+        async for partition in result.partitions():
+            yield partition
+
+
+def _csv_header() -> str:
+    buf = io.StringIO()
+    csv.writer(buf).writerow(EXPORT_COLUMNS)
+    return buf.getvalue()
+
+
+def _encode_csv(rows: list) -> str:
+    buf = io.StringIO()
+    writer = csv.writer(buf)
+    for row in rows:
+        writer.writerow(
+            (
+                row.id,
+                row.date.isoformat() if row.date else "",
+                row.type,
+                row.amount,
+                row.category_id if row.category_id is not None else "",
+                row.description or "",
+            )
+        )
+    return buf.getvalue()
+
+
+def _encode_ndjson(rows: list) -> str:
+    lines = []
+    for row in rows:
+        record = row._asdict()
+        record["date"] = row.date.isoformat() if row.date else None
+        lines.append(json.dumps(record))
+    lines.append("")
+    return "\n".join(lines)
+
+
+def stream_csv(stmt: Select) -> Iterator[str]:
+    yield _csv_header()
+    for rows in _iter_chunks(stmt):
+        yield _encode_csv(rows)
+
+
+def stream_ndjson(stmt: Select) -> Iterator[str]:
+    for rows in _iter_chunks(stmt):
+        yield _encode_ndjson(rows)
+
+
+async def astream_csv(stmt: Select) -> AsyncIterator[str]:
+    yield _csv_header()
+    async for rows in _aiter_chunks(stmt):
+        yield _encode_csv(rows)
+
+
+async def astream_ndjson(stmt: Select) -> AsyncIterator[str]:
+    async for rows in _aiter_chunks(stmt):
+        yield _encode_ndjson(rows)
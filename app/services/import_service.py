@@ -0,0 +1,152 @@
+import csv
+import io
+import json
+from datetime import datetime
+from typing import IO, Iterator, List, Set, Tuple
+
+from pydantic import ValidationError
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+
+from app.db.bulk import can_copy, copy_rows
+from app.models.category import Category
+from app.models.transaction import Transaction
+from app.schemas.transaction import (
+    ImportRowError,
+    TransactionCreate,
+    TransactionImportResult,
+)
+from app.services.data_version import bump_data_version
+from app.services.rollup_service import record_changes
+
+# Rows validated and written per batch. Only one batch is held in memory.
+IMPORT_BATCH_SIZE = 5000
+
+# Cap on error entries returned, so a wholly malformed file
+# does not produce a response as large as the upload.
+MAX_REPORTED_ERRORS = 1000
+
+IMPORT_COLUMNS = ["amount", "type", "description", "date", "category_id", "user_id"]
+
+
+def _iter_records(fileobj: IO[bytes], format: str) -> Iterator[dict]:
+    text = io.TextIOWrapper(fileobj, encoding="utf-8-sig", newline="")
+    if format == "ndjson":
+        for line in text:
+            line = line.strip()
+            if line:
+                try:
+                    yield json.loads(line)
+                except ValueError:
+                    yield None
+    else:
+        for record in csv.DictReader(text):
+            # Empty CSV cells mean "not set", same as a missing JSON key.
+            yield {k: v for k, v in record.items() if k and v not in ("", None)}
+
+
+def _batches(records: Iterator[dict]) -> Iterator[List[Tuple[int, dict]]]:
+    batch: List[Tuple[int, dict]] = []
+    for row_number, record in enumerate(records, start=1):
+        batch.append((row_number, record))
+        if len(batch) >= IMPORT_BATCH_SIZE:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def _validate_batch(
+    batch: List[Tuple[int, dict]],
+    user_id: int,
+    category_ids: Set[int],
+    result: TransactionImportResult,
+) -> List[dict]:
+    valid: List[dict] = []
+    now = datetime.utcnow()
+    for row_number, record in batch:
+        if not isinstance(record, dict):
+            _record_error(result, row_number, ["Expected a JSON object"])
+            continue
+        try:
+            tx_in = TransactionCreate.parse_obj(record)
+        except ValidationError as exc:
+            _record_error(
+                result,
+                row_number,
+                [f"{'.'.join(map(str, e['loc']))}: {e['msg']}" for e in exc.errors()],
+            )
+            continue
+        if tx_in.category_id is not None and tx_in.category_id not in category_ids:
+            _record_error(result, row_number, ["category_id: category not found"])
+            continue
+        valid.append(
+            {
+                "amount": tx_in.amount,
+                "type": tx_in.type,
+                "description": tx_in.description,
+                "date": tx_in.date or now,
+                "category_id": tx_in.category_id,
+                "user_id": user_id,
+            }
+        )
+    return valid
+
+
+def _record_error(
+    result: TransactionImportResult, row_number: int, messages: List[str]
+) -> None:
+    result.failed += 1
+    if len(result.errors) < MAX_REPORTED_ERRORS:
+        result.errors.append(ImportRowError(row=row_number, errors=messages))
+
+
+def _copy_rows(db: Session, rows: List[dict]) -> None:
+    copy_rows(
+        db,
+        Transaction.__tablename__,
+        IMPORT_COLUMNS,
+        ([row[c] for c in IMPORT_COLUMNS] for row in rows),
+    )
+
+
+def _insert_rows(db: Session, rows: List[dict]) -> None:
+    db.execute(insert(Transaction), rows)
+
+
+def import_transactions(
+    db: Session, user_id: int, fileobj: IO[bytes], format: str = "csv"
+) -> TransactionImportResult:
+    """
+    Stream-parse an uploaded CSV/NDJSON file and bulk-load every valid row
+    in a single transaction. Invalid rows are skipped and reported by their
+    1-based record number (the CSV header row is not counted).
+    """
+    write_batch = _copy_rows if can_copy(db) else _insert_rows
+
+    category_ids = {
+        cid
+        for (cid,) in db.query(Category.id).filter(Category.user_id == user_id)
+    }
+
+    result = TransactionImportResult(imported=0, failed=0, errors=[])
+    try:
+        for batch in _batches(_iter_records(fileobj, format)):
+            rows = _validate_batch(batch, user_id, category_ids, result)
+            if rows:
+                write_batch(db, rows)
+                record_changes(db, user_id, added=rows)
+                result.imported += len(rows)
+        if result.imported:
+            bump_data_version(db, user_id)
+        db.commit()
+    except UnicodeDecodeError:
+        db.rollback()
+        raise ValueError("File must be UTF-8 encoded")
+    except csv.Error as exc:
+        db.rollback()
+        raise ValueError(f"Malformed CSV: {exc}")
+    except Exception:
+        db.rollback()
+        raise
+    return result
@@ -0,0 +1,40 @@
+from dataclasses import dataclass
+
+from sqlalchemy import event, inspect
+
+from app.core.cache import LRUCache
+from app.core.config import settings
+from app.models.user import User
+
+
+@dataclass(frozen=True)
+class Principal:
+    """
+    The authenticated caller, as resolved from a token subject.
+    Endpoints that need more than this load the User row themselves.
+    """
+
+    id: int
+    email: str
+    is_active: bool
+
+
+# Keyed by token subject (email).
+principal_cache = LRUCache(
+    max_entries=settings.PRINCIPAL_CACHE_MAX_ENTRIES,
+    ttl_seconds=settings.PRINCIPAL_CACHE_TTL_SECONDS,
+)
+
+
+def invalidate_principal(email: str) -> None:
+    principal_cache.pop(email)
+
+
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def _invalidate_on_user_change(mapper, connection, target: User) -> None:
+    # Covers ORM writes in this process (deactivation, email change,
+    # deletion); other processes pick the change up within the TTL.
+    invalidate_principal(target.email)
+    for old_email in inspect(target).attrs.email.history.deleted:
+        invalidate_principal(old_email)
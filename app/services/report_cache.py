@@ -0,0 +1,112 @@
+from abc import ABC, abstractmethod
+from typing import Any, Awaitable, Callable, Hashable, Optional, Tuple
+
+from app.core.cache import LRUCache
+from app.core.config import settings
+from app.core.metrics import report_cache_entries, report_cache_lookups_total
+
+
+class CacheBackend(ABC):
+    """
+    Storage for report cache entries. Implement this to share the cache
+    across processes (e.g. Redis); values are (data_version, report) pairs.
+    """
+
+    @abstractmethod
+    def get(self, key: Hashable) -> Optional[Tuple[int, Any]]:
+        ...
+
+    @abstractmethod
+    def set(self, key: Hashable, value: Tuple[int, Any]) -> None:
+        ...
+
+    @abstractmethod
+    def clear(self) -> None:
+        ...
+
+    def __len__(self) -> int:
+        return 0
+
+
+class InProcessLRUBackend(CacheBackend):
+    """
+    Per-process LRU bounded by entry count, with a per-entry TTL.
+    """
+
+    def __init__(self, max_entries: int, ttl_seconds: float):
+        self._cache = LRUCache(max_entries, ttl_seconds)
+
+    def get(self, key: Hashable) -> Optional[Tuple[int, Any]]:
+        return self._cache.get(key)
+
+    def set(self, key: Hashable, value: Tuple[int, Any]) -> None:
+        self._cache.set(key, value)
+
+    def clear(self) -> None:
+        self._cache.clear()
+
+    def __len__(self) -> int:
+        return len(self._cache)
+
+
+class ReportCache:
+    """
+    Report results keyed by (user_id, date_from, date_to) and tagged with
+    the user's data_version at compute time. An entry is only served while
+    the user's current version still matches, so any write invalidates it.
+    """
+
+    def __init__(self, backend: CacheBackend, enabled: bool = True):
+        self.backend = backend
+        self.enabled = enabled
+
+    def lookup(self, key: Hashable, data_version: int) -> Optional[Any]:
+        """
+        Cached value for key if it was computed at data_version, else None.
+        """
+        if not self.enabled:
+            return None
+        cached = self.backend.get(key)
+        if cached is not None and cached[0] == data_version:
+            report_cache_lookups_total.inc("hit")
+            return cached[1]
+        report_cache_lookups_total.inc("miss")
+        return None
+
+    def store(self, key: Hashable, data_version: int, value: Any) -> None:
+        if self.enabled:
+            self.backend.set(key, (data_version, value))
+            report_cache_entries.set(value=len(self.backend))
+
+    def get_or_compute(
+        self,
+        key: Hashable,
+        data_version: int,
+        compute: Callable[[], Any],
+    ) -> Any:
+        value = self.lookup(key, data_version)
+        if value is None:
+            value = compute()
+            self.store(key, data_version, value)
+        return value
+
+    async def get_or_compute_async(
+        self,
+        key: Hashable,
+        data_version: int,
+        compute: Callable[[], Awaitable[Any]],
+    ) -> Any:
+        value = self.lookup(key, data_version)
+        if value is None:
+            value = await compute()
+            self.store(key, data_version, value)
+        return value
+
+
+report_cache = ReportCache(
+    InProcessLRUBackend(
+        max_entries=settings.REPORT_CACHE_MAX_ENTRIES,
+        ttl_seconds=settings.REPORT_CACHE_TTL_SECONDS,
+    ),
+    enabled=settings.REPORT_CACHE_ENABLED,
+)
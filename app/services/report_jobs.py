@@ -0,0 +1,542 @@
+import asyncio
+import threading
+import time
+import uuid
+from abc import ABC, abstractmethod
+from collections import Counter, deque
+from dataclasses import dataclass, field, replace
+from datetime import datetime, timedelta
+from typing import Callable, Deque, Dict, List, Optional
+
+import orjson
+from fastapi.concurrency import run_in_threadpool
+from pydantic import BaseModel
+from sqlalchemy import Select, delete, func, select, update
+from sqlalchemy.orm import Session, aliased
+
+from app.core.config import settings
+from app.core.logging_config import logger
+from app.core.metrics import observe
+from app.db.session import ReplicaSessionLocals, SessionLocal, replica_router
+from app.models.report_job import ReportJob
+from app.models.user import User
+from app.schemas.report import ReportJobCreate
+from app.services.data_version import get_data_version
+from app.services.report_service import generate_report, generate_timeseries
+
+QUEUED, RUNNING, DONE, FAILED = "queued", "running", "done", "failed"
+ACTIVE = (QUEUED, RUNNING)
+FINISHED = (DONE, FAILED)
+
+
+def _summary(db: Session, user_id: int, spec: ReportJobCreate) -> BaseModel:
+    return generate_report(db, user_id, spec.date_from, spec.date_to)
+
+
+def _timeseries(db: Session, user_id: int, spec: ReportJobCreate) -> BaseModel:
+    return generate_timeseries(
+        db,
+        user_id,
+        spec.granularity,
+        spec.date_from,
+        spec.date_to,
+        by_category=spec.by_category,
+    )
+
+
+# report_type -> report function; add an entry (and extend the regex of
+# ReportJobCreate.report_type) to run a new report type as a job.
+REPORT_TYPES: Dict[str, Callable[[Session, int, ReportJobCreate], BaseModel]] = {
+    "summary": _summary,
+    "timeseries": _timeseries,
+}
+
+
+@dataclass
+class Job:
+    id: str
+    user_id: int
+    report_type: str
+    params: str  # ReportJobCreate as JSON
+    status: str = QUEUED
+    created_at: datetime = field(default_factory=datetime.utcnow)
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    expires_at: Optional[datetime] = None
+    result: Optional[str] = None  # report as JSON
+    error: Optional[str] = None
+
+
+class JobBackend(ABC):
+    """
+    Queue and result store of report jobs. claim() must hand each queued
+    job to exactly one worker, also across processes for shared backends.
+    """
+
+    @abstractmethod
+    def submit(self, job: Job, max_pending: int) -> bool:
+        """
+        Queue job unless its user already has max_pending jobs queued or
+        running; returns whether it was queued.
+        """
+
+    @abstractmethod
+    def get(self, job_id: str) -> Optional[Job]:
+        ...
+
+    @abstractmethod
+    def claim(self, max_running_per_user: int) -> Optional[Job]:
+        """
+        Mark the oldest queued job whose user is below max_running_per_user
+        running jobs as running and return it, or None.
+        """
+
+    @abstractmethod
+    def finish(
+        self,
+        job_id: str,
+        status: str,
+        result: Optional[str],
+        error: Optional[str],
+        expires_at: datetime,
+    ) -> None:
+        ...
+
+    @abstractmethod
+    def purge(self, now: datetime, stale_before: datetime, result_ttl: timedelta) -> int:
+        """
+        Drop finished jobs that expired by now and fail running jobs
+        started before stale_before, keeping them for result_ttl. Returns
+        the number of jobs dropped.
+        """
+
+
+class InProcessJobBackend(JobBackend):
+    """
+    Jobs in a dict of this process, queued in submit order. Jobs and their
+    results are lost on restart and invisible to other processes.
+    """
+
+    def __init__(self) -> None:
+        self._jobs: Dict[str, Job] = {}
+        self._queue: Deque[str] = deque()
+        self._active: Counter = Counter()  # user_id -> queued + running
+        self._running: Counter = Counter()  # user_id -> running
+        self._lock = threading.Lock()
+
+    def submit(self, job: Job, max_pending: int) -> bool:
+        with self._lock:
+            if self._active[job.user_id] >= max_pending:
+                return False
+            self._jobs[job.id] = replace(job)
+            self._queue.append(job.id)
+            self._active[job.user_id] += 1
+        return True
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return replace(job) if job is not None else None
+
+    def claim(self, max_running_per_user: int) -> Optional[Job]:
+        with self._lock:
+            for job_id in self._queue:
+                job = self._jobs[job_id]
+                if self._running[job.user_id] < max_running_per_user:
+                    self._queue.remove(job_id)
+                    self._running[job.user_id] += 1
+                    job.status = RUNNING
+                    job.started_at = datetime.utcnow()
+                    return replace(job)
+        return None
+
+    def finish(
+        self,
+        job_id: str,
+        status: str,
+        result: Optional[str],
+        error: Optional[str],
+        expires_at: datetime,
+    ) -> None:
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None or job.status != RUNNING:
+                return
+            self._running[job.user_id] -= 1
+            self._active[job.user_id] -= 1
+            job.status = status
+            job.result = result
+            job.error = error
+            job.finished_at = datetime.utcnow()
+            job.expires_at = expires_at
+
+    def purge(self, now: datetime, stale_before: datetime, result_ttl: timedelta) -> int:
+        with self._lock:
+            # Fail overdue jobs so their users' slots free up. A hung worker
+            # thread cannot be stopped; finish() ignores its late result.
+            for job in self._jobs.values():
+                if job.status == RUNNING and job.started_at < stale_before:
+                    self._running[job.user_id] -= 1
+                    self._active[job.user_id] -= 1
+                    job.status = FAILED
+                    job.error = "Timed out"
+                    job.finished_at = now
+                    job.expires_at = now + result_ttl
+            expired = [
+                job_id
+                for job_id, job in self._jobs.items()
+                if job.status in FINISHED and job.expires_at <= now
+            ]
+            for job_id in expired:
+                del self._jobs[job_id]
+        return len(expired)
+
+
+def pending_stmt(user_id: int) -> Select:
+    """
+    Number of queued and running report_jobs rows of a user.
+    """
+    return (
+        select(func.count())
+        .select_from(ReportJob)
+        .where(ReportJob.user_id == user_id, ReportJob.status.in_(ACTIVE))
+    )
+
+
+def claim_stmt(max_running_per_user: int) -> Select:
+    """
+    Id of the oldest queued job whose user has fewer than
+    max_running_per_user running jobs, locked for the claim.
+    """
+    running = aliased(ReportJob)
+    running_count = (
+        select(func.count())
+        .select_from(running)
+        .where(running.user_id == ReportJob.user_id, running.status == RUNNING)
+        .scalar_subquery()
+    )
+    return (
+        select(ReportJob.id)
+        .where(ReportJob.status == QUEUED, running_count < max_running_per_user)
+        .order_by(ReportJob.created_at)
+        .limit(1)
+        .with_for_update(skip_locked=True, of=ReportJob)
+    )
+
+
+class DatabaseJobBackend(JobBackend):
+    """
+    Jobs in the report_jobs table, shared by every process on the same
+    database. Claims are a conditional UPDATE, so concurrent workers never
+    run a job twice; PostgreSQL also skips rows locked by other claimers.
+    Concurrent claims may briefly exceed the per-user running limit.
+    Submits of one user are serialized by locking the user's row, which
+    keeps the pending limit exact on PostgreSQL.
+    """
+
+    def __init__(self, session_factory: Callable[[], Session]):
+        self._session_factory = session_factory
+
+    @staticmethod
+    def _to_job(row: ReportJob) -> Job:
+        return Job(
+            id=row.id,
+            user_id=row.user_id,
+            report_type=row.report_type,
+            params=row.params,
+            status=row.status,
+            created_at=row.created_at,
+            started_at=row.started_at,
+            finished_at=row.finished_at,
+            expires_at=row.expires_at,
+            result=row.result,
+            error=row.error,
+        )
+
+    def submit(self, job: Job, max_pending: int) -> bool:
+        with self._session_factory() as db:
+            # Held until the commit, so concurrent submits of this user
+            # count only after this one is in.
+            db.execute(
+                select(User.id).where(User.id == job.user_id).with_for_update()
+            )
+            pending = db.scalar(pending_stmt(job.user_id))
+            if pending >= max_pending:
+                return False
+            db.add(
+                ReportJob(
+                    id=job.id,
+                    user_id=job.user_id,
+                    report_type=job.report_type,
+                    params=job.params,
+                    status=job.status,
+                    created_at=job.created_at,
+                )
+            )
+            db.commit()
+        return True
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._session_factory() as db:
+            row = db.get(ReportJob, job_id)
+            return self._to_job(row) if row is not None else None
+
+    def claim(self, max_running_per_user: int) -> Optional[Job]:
+        with self._session_factory() as db:
+            job_id = db.scalar(claim_stmt(max_running_per_user))
+            if job_id is None:
+                return None
+            claimed = db.execute(
+                update(ReportJob)
+                .where(ReportJob.id == job_id, ReportJob.status == QUEUED)
+                .values(status=RUNNING, started_at=datetime.utcnow())
+                .execution_options(synchronize_session=False)
+            ).rowcount
+            db.commit()
+            if not claimed:
+                # Taken by another worker in between; try again next round.
+                return None
+            return self._to_job(db.get(ReportJob, job_id))
+
+    def finish(
+        self,
+        job_id: str,
+        status: str,
+        result: Optional[str],
+        error: Optional[str],
+        expires_at: datetime,
+    ) -> None:
+        with self._session_factory() as db:
+            db.execute(
+                update(ReportJob)
+                .where(ReportJob.id == job_id, ReportJob.status == RUNNING)
+                .values(
+                    status=status,
+                    result=result,
+                    error=error,
+                    finished_at=datetime.utcnow(),
+                    expires_at=expires_at,
+                )
+                .execution_options(synchronize_session=False)
+            )
+            db.commit()
+
+    def purge(self, now: datetime, stale_before: datetime, result_ttl: timedelta) -> int:
+        with self._session_factory() as db:
+            db.execute(
+                update(ReportJob)
+                .where(ReportJob.status == RUNNING, ReportJob.started_at < stale_before)
+                .values(
+                    status=FAILED,
+                    error="Timed out",
+                    finished_at=now,
+                    expires_at=now + result_ttl,
+                )
+                .execution_options(synchronize_session=False)
+            )
+            dropped = db.execute(
+                delete(ReportJob)
+                .where(ReportJob.status.in_(FINISHED), ReportJob.expires_at <= now)
+                .execution_options(synchronize_session=False)
+            ).rowcount
+            db.commit()
+        return dropped
+
+
+def read_session_for(user_id: int) -> Session:
+    """
+    Session a job of user_id reads through: a healthy read replica that
+    has caught up with the user's writes when one is configured, else
+    the primary.
+    """
+    index = replica_router.choose()
+    if index is None:
+        return SessionLocal()
+    with SessionLocal() as primary:
+        version = get_data_version(primary, user_id)
+    db = ReplicaSessionLocals[index]()
+    if get_data_version(db, user_id) >= version:
+        return db
+    db.close()
+    return SessionLocal()
+
+
+class ReportJobRunner:
+    """
+    Runs queued report jobs on a fixed pool of daemon threads, at most
+    max_running_per_user at a time per user, and keeps each result for
+    result_ttl_seconds after it finished.
+    """
+
+    # Idle workers re-check the backend this often, for jobs submitted
+    # through other processes.
+    poll_seconds = 1.0
+    purge_every_seconds = 60.0
+
+    def __init__(
+        self,
+        backend: JobBackend,
+        workers: int,
+        max_running_per_user: int,
+        max_pending_per_user: int,
+        result_ttl_seconds: float,
+        timeout_seconds: float,
+        session_factory: Callable[[int], Session] = read_session_for,
+    ):
+        self.backend = backend
+        self.workers = workers
+        self.max_running_per_user = max_running_per_user
+        self.max_pending_per_user = max_pending_per_user
+        self.result_ttl_seconds = result_ttl_seconds
+        self.timeout_seconds = timeout_seconds
+        # user_id -> session the job's report reads through
+        self.session_factory = session_factory
+        self._threads: List[threading.Thread] = []
+        self._wake = threading.Event()
+        self._stopping = threading.Event()
+        self._lock = threading.Lock()
+        self._next_purge = 0.0
+
+    def start(self) -> None:
+        with self._lock:
+            if self._threads or self.workers <= 0:
+                return
+            self._stopping.clear()
+            for index in range(self.workers):
+                thread = threading.Thread(
+                    target=self._work, name=f"report-job-{index}", daemon=True
+                )
+                thread.start()
+                self._threads.append(thread)
+
+    def stop(self, timeout: float = 5.0) -> None:
+        with self._lock:
+            threads, self._threads = self._threads, []
+        self._stopping.set()
+        self._wake.set()
+        for thread in threads:
+            thread.join(timeout)
+
+    def submit(self, user_id: int, job_in: ReportJobCreate) -> Optional[Job]:
+        """
+        Queue a report job; None if the user has too many pending.
+        """
+        self.start()
+        job = Job(
+            id=uuid.uuid4().hex,
+            user_id=user_id,
+            report_type=job_in.report_type,
+            params=job_in.json(),
+        )
+        if not self.backend.submit(job, self.max_pending_per_user):
+            return None
+        self._wake.set()
+        return job
+
+    def get(self, user_id: int, job_id: str) -> Optional[Job]:
+        """
+        The job if it belongs to user_id and has not expired.
+        """
+        job = self.backend.get(job_id)
+        if job is None or job.user_id != user_id:
+            return None
+        if job.expires_at is not None and job.expires_at <= datetime.utcnow():
+            return None
+        return job
+
+    async def wait(self, user_id: int, job_id: str, timeout: float) -> Optional[Job]:
+        """
+        Like get(), but waits up to timeout seconds for the job to finish,
+        re-checking with a growing interval.
+        """
+        deadline = time.monotonic() + timeout
+        delay = 0.05
+        while True:
+            job = await run_in_threadpool(self.get, user_id, job_id)
+            remaining = deadline - time.monotonic()
+            if job is None or job.status in FINISHED or remaining <= 0:
+                return job
+            await asyncio.sleep(min(delay, remaining))
+            delay = min(delay * 2, self.poll_seconds)
+
+    def _maybe_purge(self) -> None:
+        now = time.monotonic()
+        with self._lock:
+            if now < self._next_purge:
+                return
+            self._next_purge = now + self.purge_every_seconds
+        utcnow = datetime.utcnow()
+        self.backend.purge(
+            utcnow,
+            utcnow - timedelta(seconds=self.timeout_seconds),
+            timedelta(seconds=self.result_ttl_seconds),
+        )
+
+    def _work(self) -> None:
+        while not self._stopping.is_set():
+            try:
+                self._maybe_purge()
+                job = self.backend.claim(self.max_running_per_user)
+            except Exception:
+                logger.exception("Report job queue unavailable")
+                job = None
+            if job is None:
+                self._wake.wait(self.poll_seconds)
+                self._wake.clear()
+                continue
+            self._run(job)
+            # A finished job may unblock queued jobs of the same user.
+            self._wake.set()
+
+    def _run(self, job: Job) -> None:
+        result = error = None
+        try:
+            spec = ReportJobCreate.parse_raw(job.params)
+            report_fn = REPORT_TYPES[job.report_type]
+            with observe(f"report_job_{job.report_type}"):
+                with self.session_factory(job.user_id) as db:
+                    result = report_fn(db, job.user_id, spec).json()
+            status = DONE
+        except Exception:
+            logger.exception("Report job %s failed", job.id)
+            status = FAILED
+            # Details stay in the log; exception text can name hosts or SQL.
+            error = "Report failed"
+        expires_at = datetime.utcnow() + timedelta(seconds=self.result_ttl_seconds)
+        try:
+            self.backend.finish(job.id, status, result, error, expires_at)
+        except Exception:
+            logger.exception("Could not store the result of report job %s", job.id)
+
+
+def job_read(job: Job) -> dict:
+    """
+    The job as a ReportJobRead body.
+    """
+    return {
+        "id": job.id,
+        "report_type": job.report_type,
+        "status": job.status,
+        "created_at": job.created_at,
+        "started_at": job.started_at,
+        "finished_at": job.finished_at,
+        "expires_at": job.expires_at,
+        "error": job.error,
+        "result": orjson.loads(job.result) if job.result is not None else None,
+    }
+
+
+def _backend() -> JobBackend:
+    if settings.REPORT_JOB_BACKEND == "database":
+        return DatabaseJobBackend(SessionLocal)
+    return InProcessJobBackend()
+
+
+report_jobs = ReportJobRunner(
+    _backend(),
+    workers=settings.REPORT_JOB_WORKERS,
+    max_running_per_user=settings.REPORT_JOB_MAX_RUNNING_PER_USER,
+    max_pending_per_user=settings.REPORT_JOB_MAX_PENDING_PER_USER,
+    result_ttl_seconds=settings.REPORT_JOB_RESULT_TTL_SECONDS,
+    timeout_seconds=settings.REPORT_JOB_TIMEOUT_SECONDS,
+)
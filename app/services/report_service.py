@@ -1,12 +1,26 @@
-from datetime import datetime
-from typing import Optional, List
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Dict, Optional, List, Tuple
 
 import pandas as pd
+from sqlalchemy import Integer, String, and_, case, cast, func, or_, true
 from sqlalchemy.orm import Session
 
+from app.core.config import settings
+from app.core.metrics import observe
 from app.models.transaction import Transaction
 from app.models.category import Category
-from app.schemas.report import CategorySummary, ReportSummary
+from app.models.monthly_rollup import MonthlyRollup
+from app.schemas.report import (
+    CategorySummary,
+    ReportSummary,
+    TimeSeriesPoint,
+    TimeSeriesReport,
+)
+from app.services.rollup_service import year_month
+
+REPORT_ENGINES = ("sql", "pandas")
+TIMESERIES_GRANULARITIES = ("day", "week", "month")
 
 
 def generate_report(
@@ -14,6 +28,166 @@ def generate_report(
     user_id: int,
     date_from: Optional[datetime] = None,
     date_to: Optional[datetime] = None,
+    engine: Optional[str] = None,
+) -> ReportSummary:
+    """
+    Build the income/expense summary for a user and date range.
+    engine selects "sql" or "pandas"; defaults to settings.REPORT_ENGINE.
+    Both engines return identical results.
+    """
+    engine = engine or settings.REPORT_ENGINE
+    if engine == "sql":
+        with observe("report_sql"):
+            return _generate_report_sql(db, user_id, date_from, date_to)
+    if engine == "pandas":
+        with observe("report_pandas"):
+            return _generate_report_pandas(db, user_id, date_from, date_to)
+    raise ValueError(f"Unknown report engine: {engine}")
+
+
+def _month_floor(value: datetime) -> datetime:
+    return value.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+
+def _next_month(value: datetime) -> datetime:
+    if value.month == 12:
+        return value.replace(year=value.year + 1, month=1)
+    return value.replace(month=value.month + 1)
+
+
+def _full_month_bounds(
+    date_from: Optional[datetime], date_to: Optional[datetime]
+) -> Tuple[Optional[datetime], Optional[datetime]]:
+    """
+    [lo, hi) span of whole calendar months inside [date_from, date_to].
+    None means unbounded on that side.
+    """
+    lo = None
+    if date_from is not None:
+        lo = _month_floor(date_from)
+        if lo != date_from:
+            lo = _next_month(lo)
+    hi = None
+    if date_to is not None:
+        # date_to is inclusive; a month is whole if date_to reaches its last instant
+        hi = _month_floor(date_to + timedelta(microseconds=1))
+    return lo, hi
+
+
+def _generate_report_sql(
+    db: Session,
+    user_id: int,
+    date_from: Optional[datetime] = None,
+    date_to: Optional[datetime] = None,
+) -> ReportSummary:
+    """
+    Whole months are read from the monthly_rollups table and only the
+    partial months at the edges of the range are aggregated from raw rows,
+    both with a GROUP BY over (category, type). No ORM entities are loaded,
+    so cost scales with months x categories, not transactions.
+    """
+    lo, hi = _full_month_bounds(date_from, date_to)
+    if lo is not None and hi is not None and lo >= hi:
+        # Less than a whole month: everything comes from raw rows.
+        edges = [_date_range(date_from, date_to)]
+        groups = _raw_groups(db, user_id, edges)
+    else:
+        edges = []
+        if date_from is not None and date_from < lo:
+            edges.append(_date_range(date_from, lo, exclusive=True))
+        if date_to is not None and hi <= date_to:
+            edges.append(_date_range(hi, date_to))
+        if date_from is None and date_to is None:
+            # Undated rows have no month; an unbounded report still counts them.
+            edges.append(Transaction.date.is_(None))
+        groups = _rollup_groups(db, user_id, lo, hi)
+        if edges:
+            groups += _raw_groups(db, user_id, edges)
+
+    return _summarize(groups)
+
+
+def _date_range(
+    start: Optional[datetime], end: Optional[datetime], exclusive: bool = False
+):
+    conditions = []
+    if start is not None:
+        conditions.append(Transaction.date >= start)
+    if end is not None:
+        conditions.append(
+            Transaction.date < end if exclusive else Transaction.date <= end
+        )
+    return and_(true(), *conditions)
+
+
+def _raw_groups(db: Session, user_id: int, ranges: list) -> list:
+    q = db.query(
+        Category.id,
+        Category.name,
+        Transaction.type,
+        func.sum(Transaction.amount),
+    ).join(Category, Transaction.category_id == Category.id, isouter=True)
+    q = q.filter(Transaction.user_id == user_id, or_(*ranges))
+    return q.group_by(Category.id, Category.name, Transaction.type).all()
+
+
+def _rollup_groups(
+    db: Session, user_id: int, lo: Optional[datetime], hi: Optional[datetime]
+) -> list:
+    q = db.query(
+        Category.id,
+        Category.name,
+        MonthlyRollup.type,
+        func.sum(MonthlyRollup.total_amount),
+    ).join(Category, MonthlyRollup.category_id == Category.id, isouter=True)
+    q = q.filter(MonthlyRollup.user_id == user_id)
+    if lo is not None:
+        q = q.filter(MonthlyRollup.year_month >= year_month(lo))
+    if hi is not None:
+        q = q.filter(MonthlyRollup.year_month < year_month(hi))
+    return q.group_by(Category.id, Category.name, MonthlyRollup.type).all()
+
+
+def _summarize(groups: list) -> ReportSummary:
+    merged: Dict[tuple, float] = defaultdict(float)
+    for category_id, category_name, tx_type, amount in groups:
+        merged[(category_id, category_name, tx_type)] += float(amount or 0.0)
+
+    total_income = 0.0
+    total_expense = 0.0
+    for (_, _, tx_type), amount in merged.items():
+        if tx_type == "income":
+            total_income += amount
+        elif tx_type == "expense":
+            total_expense += amount
+
+    # Match the pandas engine: groupby drops rows with no category
+    # and orders groups by (category_id, category_name, type).
+    by_category = [
+        CategorySummary(
+            category_id=category_id,
+            category_name=category_name,
+            total_amount=amount,
+            type=tx_type,
+        )
+        for (category_id, category_name, tx_type), amount in sorted(
+            (k, v) for k, v in merged.items() if k[0] is not None
+        )
+    ]
+
+    return ReportSummary(
+        total_income=total_income,
+        total_expense=total_expense,
+        net=total_income - total_expense,
+        by_category=by_category,
+    )
+
+
+def _generate_report_pandas(
+    db: Session,
+    user_id: int,
+    date_from: Optional[datetime] = None,
+    date_to: Optional[datetime] = None,
 ) -> ReportSummary:
     q = db.query(Transaction, Category).join(
         Category, Transaction.category_id == Category.id, isouter=True
@@ -81,3 +255,117 @@ def generate_report(
         net=float(net),
         by_category=by_category,
     )
+
+
+def _bucket_expr(db: Session, granularity: str):
+    """
+    SQL expression truncating Transaction.date to the start of its
+    day/week (Monday)/month bucket.
+    """
+    col = Transaction.date
+    if db.get_bind().dialect.name == "sqlite":
+        if granularity == "day":
+            return func.date(col)
+        if granularity == "week":
+            # strftime('%w') is 0 for Sunday; step back to Monday
+            offset = (cast(func.strftime("%w", col), Integer) + 6) % 7
+            return func.date(col, "-" + cast(offset, String) + " days")
+        return func.strftime("%Y-%m-01", col)
+    return func.date_trunc(granularity, col)
+
+
+def _as_datetime(value) -> datetime:
+    if isinstance(value, datetime):
+        return value.replace(tzinfo=None)
+    if isinstance(value, str):
+        return datetime.fromisoformat(value)
+    # plain date
+    return datetime(value.year, value.month, value.day)
+
+
+def generate_timeseries(
+    db: Session,
+    user_id: int,
+    granularity: str = "month",
+    date_from: Optional[datetime] = None,
+    date_to: Optional[datetime] = None,
+    by_category: bool = False,
+) -> TimeSeriesReport:
+    """
+    Income, expense and net per day/week/month bucket, computed with one
+    GROUP BY on the truncated date. With by_category, each point also
+    carries the per-category breakdown used by generate_report.
+    """
+    if granularity not in TIMESERIES_GRANULARITIES:
+        raise ValueError(f"Unknown granularity: {granularity}")
+
+    bucket = _bucket_expr(db, granularity).label("bucket")
+    conditions = [Transaction.user_id == user_id, Transaction.date.isnot(None)]
+    if date_from:
+        conditions.append(Transaction.date >= date_from)
+    if date_to:
+        conditions.append(Transaction.date <= date_to)
+
+    points: Dict[datetime, TimeSeriesPoint] = {}
+
+    def point(value) -> TimeSeriesPoint:
+        start = _as_datetime(value)
+        if start not in points:
+            points[start] = TimeSeriesPoint(
+                period_start=start,
+                total_income=0.0,
+                total_expense=0.0,
+                net=0.0,
+                by_category=[],
+            )
+        return points[start]
+
+    if not by_category:
+        income = case((Transaction.type == "income", Transaction.amount), else_=0.0)
+        expense = case(
+            (Transaction.type == "expense", Transaction.amount), else_=0.0
+        )
+        rows = (
+            db.query(bucket, func.sum(income), func.sum(expense))
+            .filter(*conditions)
+            .group_by(bucket)
+        )
+        for value, income_sum, expense_sum in rows:
+            p = point(value)
+            p.total_income = float(income_sum or 0.0)
+            p.total_expense = float(expense_sum or 0.0)
+    else:
+        rows = (
+            db.query(
+                bucket,
+                Category.id,
+                Category.name,
+                Transaction.type,
+                func.sum(Transaction.amount),
+            )
+            .join(Category, Transaction.category_id == Category.id, isouter=True)
+            .filter(*conditions)
+            .group_by(bucket, Category.id, Category.name, Transaction.type)
+            .order_by(bucket, Category.id, Category.name, Transaction.type)
+        )
+        for value, category_id, category_name, tx_type, amount in rows:
+            p = point(value)
+            amount = float(amount or 0.0)
+            if tx_type == "income":
+                p.total_income += amount
+            elif tx_type == "expense":
+                p.total_expense += amount
+            if category_id is not None:
+                p.by_category.append(
+                    CategorySummary(
+                        category_id=category_id,
+                        category_name=category_name,
+                        total_amount=amount,
+                        type=tx_type,
+                    )
+                )
+
+    ordered = [points[k] for k in sorted(points)]
+    for p in ordered:
+        p.net = p.total_income - p.total_expense
+    return TimeSeriesReport(granularity=granularity, points=ordered)
@@ -0,0 +1,181 @@
+from collections import defaultdict
+from datetime import datetime
+from typing import Dict, Iterable, Optional, Sequence, Tuple
+
+from sqlalchemy import Integer, cast, delete, extract, func, insert, select, update
+from sqlalchemy.orm import Session
+
+from app.models.monthly_rollup import MonthlyRollup
+from app.models.transaction import Transaction
+from app.services.budget_service import record_spending
+
+# Fields of a transaction that determine its rollup bucket and contribution.
+ROLLUP_FIELDS = ("amount", "type", "date", "category_id")
+
+RollupKey = Tuple[int, int, str]  # (year_month, category_id, type)
+
+
+def year_month(value: datetime) -> int:
+    return value.year * 100 + value.month
+
+
+def snapshot(tx: Transaction) -> dict:
+    """
+    Capture the rollup-relevant fields of a transaction, e.g. before an
+    update mutates it.
+    """
+    return {field: getattr(tx, field) for field in ROLLUP_FIELDS}
+
+
+def _accumulate(
+    deltas: Dict[RollupKey, list], rows: Iterable[dict], sign: int
+) -> None:
+    for row in rows:
+        if row["date"] is None:
+            continue
+        key = (year_month(row["date"]), row["category_id"] or 0, row["type"])
+        bucket = deltas[key]
+        bucket[0] += sign * row["amount"]
+        bucket[1] += sign
+
+
+def record_changes(
+    db: Session,
+    user_id: int,
+    removed: Iterable[dict] = (),
+    added: Iterable[dict] = (),
+) -> None:
+    """
+    Apply the effect of removed/added transaction rows to the user's
+    monthly rollups and budget totals. An update is a removal of the old
+    values plus an addition of the new ones. Does not commit; call it
+    before the commit of the write it describes.
+    """
+    deltas: Dict[RollupKey, list] = defaultdict(lambda: [0.0, 0])
+    _accumulate(deltas, removed, -1)
+    _accumulate(deltas, added, 1)
+
+    changes = [
+        {
+            "user_id": user_id,
+            "year_month": ym,
+            "category_id": category_id,
+            "type": tx_type,
+            "total_amount": amount,
+            "tx_count": count,
+        }
+        for (ym, category_id, tx_type), (amount, count) in deltas.items()
+        if count or amount
+    ]
+    if not changes:
+        return
+
+    _upsert(db, changes)
+    db.execute(
+        delete(MonthlyRollup).where(
+            MonthlyRollup.user_id == user_id, MonthlyRollup.tx_count <= 0
+        )
+    )
+    record_spending(
+        db,
+        user_id,
+        {
+            (ym, category_id): amount
+            for (ym, category_id, tx_type), (amount, _) in deltas.items()
+            if tx_type == "expense"
+        },
+    )
+
+
+def _upsert(db: Session, changes: list) -> None:
+    dialect = db.get_bind().dialect.name
+    if dialect in ("postgresql", "sqlite"):
+        if dialect == "postgresql":
+            from sqlalchemy.dialects.postgresql import insert as dialect_insert
+        else:
+            from sqlalchemy.dialects.sqlite import insert as dialect_insert
+
+        stmt = dialect_insert(MonthlyRollup)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["user_id", "year_month", "category_id", "type"],
+            set_={
+                "total_amount": MonthlyRollup.total_amount
+                + stmt.excluded.total_amount,
+                "tx_count": MonthlyRollup.tx_count + stmt.excluded.tx_count,
+            },
+        )
+        db.execute(stmt, changes)
+        return
+
+    # Portable fallback: update in place, insert the buckets that were missing.
+    for change in changes:
+        result = db.execute(
+            update(MonthlyRollup)
+            .where(
+                MonthlyRollup.user_id == change["user_id"],
+                MonthlyRollup.year_month == change["year_month"],
+                MonthlyRollup.category_id == change["category_id"],
+                MonthlyRollup.type == change["type"],
+            )
+            .values(
+                total_amount=MonthlyRollup.total_amount + change["total_amount"],
+                tx_count=MonthlyRollup.tx_count + change["tx_count"],
+            )
+        )
+        if result.rowcount == 0:
+            db.execute(insert(MonthlyRollup), [change])
+
+
+def rebuild_rollups(
+    db: Session,
+    user_id: Optional[int] = None,
+    user_ids: Optional[Sequence[int]] = None,
+) -> int:
+    """
+    Recompute rollups from the transactions table, for one user, the
+    given users, or all. Returns the number of rollup rows written. Commits.
+    """
+    if user_id is not None:
+        user_ids = [user_id]
+    ym_expr = cast(
+        extract("year", Transaction.date) * 100
+        + extract("month", Transaction.date),
+        Integer,
+    )
+    source = select(
+        Transaction.user_id,
+        ym_expr,
+        func.coalesce(Transaction.category_id, 0),
+        Transaction.type,
+        func.sum(Transaction.amount),
+        func.count(Transaction.id),
+    ).where(Transaction.date.isnot(None))
+
+    purge = delete(MonthlyRollup)
+    if user_ids is not None:
+        source = source.where(Transaction.user_id.in_(user_ids))
+        purge = purge.where(MonthlyRollup.user_id.in_(user_ids))
+
+    source = source.group_by(
+        Transaction.user_id,
+        ym_expr,
+        func.coalesce(Transaction.category_id, 0),
+        Transaction.type,
+    )
+
+    db.execute(purge)
+    result = db.execute(
+        insert(MonthlyRollup).from_select(
+            [
+                "user_id",
+                "year_month",
+                "category_id",
+                "type",
+                "total_amount",
+                "tx_count",
+            ],
+            source,
+        )
+    )
+    db.commit()
+    return result.rowcount
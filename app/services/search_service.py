@@ -0,0 +1,116 @@
+from typing import List, Tuple
+
+from sqlalchemy import column, func, literal, literal_column, or_, select, table
+from sqlalchemy.engine import Row
+from sqlalchemy.orm import Session
+
+from app.models.transaction import SEARCH_FTS_TABLE, Transaction
+from app.services.transaction_service import READ_COLUMNS
+
+# The trigram tokenizer cannot match terms shorter than a trigram.
+_MIN_FTS_TERM = 3
+
+_fts = table(SEARCH_FTS_TABLE, column("rowid"))
+
+
+def _like_pattern(term: str) -> str:
+    escaped = term.replace("!", "!!").replace("%", "!%").replace("_", "!_")
+    return f"%{escaped}%"
+
+
+def _contains(term: str):
+    return Transaction.description.ilike(_like_pattern(term), escape="!")
+
+
+def _postgres_search(user_id: int, q: str):
+    """
+    Word match on the tsvector index, or substring / fuzzy word match on
+    the trigram index; both GIN indexes are led by user_id.
+    """
+    # Same expression as ix_transactions_search_tsv, with literals so the
+    # planner matches it whatever the driver's parameter style.
+    document = func.to_tsvector(
+        literal_column("'simple'"),
+        func.coalesce(Transaction.description, literal_column("''")),
+    )
+    query = func.websearch_to_tsquery(literal_column("'simple'"), q)
+    rank = (
+        func.ts_rank_cd(document, query)
+        + func.word_similarity(q, Transaction.description)
+    ).label("rank")
+    stmt = select(*READ_COLUMNS, rank).where(
+        Transaction.user_id == user_id,
+        or_(
+            document.op("@@")(query),
+            _contains(q),
+            Transaction.description.op("%>")(q),
+        ),
+    )
+    return stmt, rank
+
+
+def _sqlite_search(user_id: int, q: str):
+    """
+    Every term must occur as a substring: terms of three or more
+    characters go through the FTS5 trigram index (ranked by bm25),
+    shorter ones are checked with LIKE on the matched rows.
+    """
+    terms = q.split()
+    long_terms = [t for t in terms if len(t) >= _MIN_FTS_TERM]
+    short_terms = [t for t in terms if len(t) < _MIN_FTS_TERM]
+
+    if long_terms:
+        match = " ".join('"' + t.replace('"', '""') + '"' for t in long_terms)
+        # bm25 is lower-is-better; negate so higher ranks first everywhere.
+        rank = (-func.bm25(literal_column(SEARCH_FTS_TABLE))).label("rank")
+        stmt = (
+            select(*READ_COLUMNS, rank)
+            .join_from(Transaction, _fts, _fts.c.rowid == Transaction.id)
+            .where(literal_column(SEARCH_FTS_TABLE).op("MATCH")(match))
+        )
+    else:
+        rank = literal(0.0).label("rank")
+        stmt = select(*READ_COLUMNS, rank)
+    stmt = stmt.where(
+        Transaction.user_id == user_id, *(_contains(t) for t in short_terms)
+    )
+    return stmt, rank
+
+
+def _fallback_search(user_id: int, q: str):
+    rank = literal(0.0).label("rank")
+    stmt = select(*READ_COLUMNS, rank).where(
+        Transaction.user_id == user_id, _contains(q)
+    )
+    return stmt, rank
+
+
+_SEARCHES = {
+    "postgresql": _postgres_search,
+    "sqlite": _sqlite_search,
+}
+
+
+def search_transactions(
+    db: Session, user_id: int, q: str, limit: int = 20, offset: int = 0
+) -> Tuple[List[Row], bool]:
+    """
+    Transactions of one user whose description matches q, best match
+    first (then newest). Returns READ_COLUMNS tuples plus a `rank`
+    (higher is better; only comparable within one query) and whether
+    more results follow. Raises ValueError for a query without terms.
+    """
+    # Collapse whitespace; a blank query would add no filter at all.
+    q = " ".join(q.split())
+    if not q:
+        raise ValueError("Search query has no terms")
+    build = _SEARCHES.get(db.get_bind().dialect.name, _fallback_search)
+    stmt, rank = build(user_id, q)
+    rows = db.execute(
+        stmt.order_by(
+            rank.desc(), Transaction.date.desc(), Transaction.id.desc()
+        )
+        .limit(limit + 1)
+        .offset(offset)
+    ).all()
+    return rows[:limit], len(rows) > limit
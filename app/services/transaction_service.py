@@ -0,0 +1,140 @@
+from datetime import datetime
+from typing import List, Optional, Sequence, Tuple
+
+from sqlalchemy import tuple_
+from sqlalchemy.engine import Row
+from sqlalchemy.orm import Session
+
+from app.models.transaction import Transaction
+from app.schemas.transaction import (
+    TransactionCreate,
+    TransactionRead,
+    TransactionUpdate,
+)
+from app.services.data_version import bump_data_version
+from app.services.rollup_service import record_changes, snapshot
+
+# Columns of TransactionRead; listings select these as plain row tuples
+# instead of loading ORM objects.
+READ_COLUMNS = tuple(
+    getattr(Transaction, name) for name in TransactionRead.__fields__
+)
+
+# Always selected by listings: the keyset cursor is built from them.
+KEYSET_FIELDS = ("date", "id")
+
+
+def read_columns(fields: Optional[Sequence[str]] = None) -> tuple:
+    """
+    READ_COLUMNS restricted to `fields` plus the keyset columns.
+    """
+    if fields is None:
+        return READ_COLUMNS
+    wanted = set(fields).union(KEYSET_FIELDS)
+    return tuple(column for column in READ_COLUMNS if column.key in wanted)
+
+
+def apply_filters(q, type, category_id, date_from, date_to):
+    """
+    Shared filters for listing and export; works on both Query and Select.
+    """
+    if type:
+        q = q.filter(Transaction.type == type)
+    if category_id:
+        q = q.filter(Transaction.category_id == category_id)
+    if date_from:
+        q = q.filter(Transaction.date >= date_from)
+    if date_to:
+        q = q.filter(Transaction.date <= date_to)
+    return q
+
+
+def create_transaction(
+    db: Session, user_id: int, tx_in: TransactionCreate
+) -> Transaction:
+    tx = Transaction(
+        amount=tx_in.amount,
+        type=tx_in.type,
+        description=tx_in.description,
+        date=tx_in.date or datetime.utcnow(),
+        category_id=tx_in.category_id,
+        user_id=user_id,
+    )
+    db.add(tx)
+    record_changes(db, user_id, added=[snapshot(tx)])
+    bump_data_version(db, user_id)
+    db.commit()
+    db.refresh(tx)
+    return tx
+
+
+def list_transactions(
+    db: Session,
+    user_id: int,
+    type: Optional[str] = None,
+    category_id: Optional[int] = None,
+    date_from: Optional[datetime] = None,
+    date_to: Optional[datetime] = None,
+    limit: int = 50,
+    after: Optional[Tuple[datetime, int]] = None,
+    fields: Optional[Sequence[str]] = None,
+) -> Tuple[List[Row], bool]:
+    """
+    One keyset page ordered by (date, id) descending, starting after the
+    given (date, id) position. Returns the rows (tuples of read_columns
+    for `fields`) and whether more follow.
+    """
+    q = db.query(*read_columns(fields)).filter(Transaction.user_id == user_id)
+    q = apply_filters(q, type, category_id, date_from, date_to)
+    if after:
+        q = q.filter(tuple_(Transaction.date, Transaction.id) < after)
+
+    rows = (
+        q.order_by(Transaction.date.desc(), Transaction.id.desc())
+        .limit(limit + 1)
+        .all()
+    )
+    return rows[:limit], len(rows) > limit
+
+
+def get_transaction(
+    db: Session, user_id: int, transaction_id: int
+) -> Optional[Transaction]:
+    return (
+        db.query(Transaction)
+        .filter(
+            Transaction.id == transaction_id,
+            Transaction.user_id == user_id,
+        )
+        .first()
+    )
+
+
+def update_transaction(
+    db: Session, user_id: int, transaction_id: int, tx_in: TransactionUpdate
+) -> Optional[Transaction]:
+    tx = get_transaction(db, user_id, transaction_id)
+    if not tx:
+        return None
+
+    before = snapshot(tx)
+    for field, value in tx_in.dict(exclude_unset=True).items():
+        setattr(tx, field, value)
+    record_changes(db, user_id, removed=[before], added=[snapshot(tx)])
+    bump_data_version(db, user_id)
+
+    db.commit()
+    db.refresh(tx)
+    return tx
+
+
+def delete_transaction(db: Session, user_id: int, transaction_id: int) -> bool:
+    tx = get_transaction(db, user_id, transaction_id)
+    if not tx:
+        return False
+
+    db.delete(tx)
+    record_changes(db, user_id, removed=[snapshot(tx)])
+    bump_data_version(db, user_id)
+    db.commit()
+    return True
@@ -0,0 +1,175 @@
+"""
+End-to-end API benchmark.
+
+Seeds users x transactions, then drives the FastAPI app in-process
+(httpx over ASGI, no network) and reports latency percentiles and
+throughput for login, list transactions, create transaction and the
+summary report. Results are written as JSON for compare.py.
+
+Usage:
+    python -m benchmarks.api                                  # temp SQLite file
+    python -m benchmarks.api --url postgresql://u:p@localhost/bench \\
+        --users 1000 --transactions 10000 --requests 2000 --concurrency 16
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import time
+from collections import Counter
+from typing import Awaitable, Callable, Dict, List
+
+import httpx
+
+from app.api import deps
+from app.core.config import settings
+from benchmarks.common import (
+    BENCH_PASSWORD,
+    default_url,
+    latency_stats,
+    make_engine,
+    run_metadata,
+    seed,
+    session_factory,
+    write_results,
+)
+
+API = "/api/v1"
+
+
+async def run_scenario(
+    send: Callable[[int], Awaitable[httpx.Response]],
+    requests: int,
+    concurrency: int,
+    warmup: int,
+) -> Dict[str, float]:
+    for i in range(warmup):
+        await send(i)
+
+    latencies: List[float] = []
+    statuses: Counter = Counter()
+    counter = itertools.count()
+
+    async def worker():
+        while True:
+            i = next(counter)
+            if i >= requests:
+                return
+            start = time.perf_counter()
+            response = await send(i)
+            latencies.append(time.perf_counter() - start)
+            statuses[str(response.status_code)] += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    wall = time.perf_counter() - start
+    return {
+        **latency_stats(latencies),
+        # 503s on login are the Argon2 pool shedding load, not failures.
+        "status": dict(sorted(statuses.items())),
+        "wall_s": round(wall, 3),
+        "throughput_rps": round(requests / wall, 2),
+    }
+
+
+async def benchmark(app, users, args) -> Dict[str, dict]:
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+
+        async def login(i: int) -> httpx.Response:
+            _, email = users[i % len(users)]
+            return await client.post(
+                f"{API}/auth/login",
+                data={"username": email, "password": BENCH_PASSWORD},
+            )
+
+        tokens = []
+        for i in range(len(users)):
+            tokens.append((await login(i)).json()["access_token"])
+
+        def auth(i: int) -> dict:
+            return {"Authorization": f"Bearer {tokens[i % len(tokens)]}"}
+
+        async def list_transactions(i: int) -> httpx.Response:
+            return await client.get(
+                f"{API}/transactions/", params={"limit": 50}, headers=auth(i)
+            )
+
+        async def create_transaction(i: int) -> httpx.Response:
+            return await client.post(
+                f"{API}/transactions/",
+                json={"amount": 12.34, "type": "expense", "description": "bench"},
+                headers=auth(i),
+            )
+
+        async def summary(i: int) -> httpx.Response:
+            return await client.get(f"{API}/reports/summary", headers=auth(i))
+
+        scenarios = {
+            "login": login,
+            "list_transactions": list_transactions,
+            "create_transaction": create_transaction,
+            "reports_summary": summary,
+        }
+        results = {}
+        for name in args.scenarios.split(","):
+            results[name] = await run_scenario(
+                scenarios[name], args.requests, args.concurrency, args.warmup
+            )
+            print(f"{name:20s} {json.dumps(results[name])}")
+        return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--url", default=None, help="database URL (default: temp SQLite)")
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--transactions", type=int, default=2000, help="per user")
+    parser.add_argument("--requests", type=int, default=500, help="per scenario")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--warmup", type=int, default=20)
+    parser.add_argument(
+        "--scenarios",
+        default="login,list_transactions,create_transaction,reports_summary",
+    )
+    parser.add_argument(
+        "--report-cache",
+        action="store_true",
+        help="serve repeated summaries from the report cache",
+    )
+    parser.add_argument("--output", default=None, help="JSON results path")
+    args = parser.parse_args()
+
+    engine = make_engine(args.url or default_url())
+    started = time.perf_counter()
+    users = seed(engine, args.users, args.transactions)
+    seed_s = time.perf_counter() - started
+    print(f"seeded {args.users} users x {args.transactions} transactions in {seed_s:.1f}s")
+
+    # Imported late so the app picks up the settings of this process.
+    from app.main import app
+    from app.services.report_cache import report_cache
+
+    report_cache.enabled = args.report_cache
+    settings.DB_ASYNC = False
+    BenchSession = session_factory(engine)
+
+    async def get_bench_session():
+        db = BenchSession()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app.dependency_overrides[deps.get_session] = get_bench_session
+    results = asyncio.run(benchmark(app, users, args))
+
+    payload = {
+        "meta": {**run_metadata(engine, args), "seed_s": round(seed_s, 2)},
+        "results": results,
+    }
+    print("results written to", write_results(payload, args.output, "api"))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+"""
+Shared helpers for the benchmark scripts: database setup, dataset
+seeding, latency statistics and JSON result files.
+"""
+import json
+import math
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+from datetime import datetime
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import sqlalchemy
+from sqlalchemy import create_engine
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import sessionmaker
+
+from app.db.base import Base
+from app.db.seed import seed as seed_dataset
+from app.models.monthly_rollup import MonthlyRollup  # noqa: F401 (create_all)
+
+BENCH_PASSWORD = "benchmark-password"
+
+
+def default_url() -> str:
+    path = os.path.join(tempfile.mkdtemp(prefix="bench-"), "bench.db")
+    return f"sqlite:///{path}"
+
+
+def make_engine(url: str) -> Engine:
+    """
+    Engine for the benchmark database. SQLite files get the schema
+    created; PostgreSQL is expected to be migrated already.
+    """
+    if url.startswith("sqlite"):
+        engine = create_engine(
+            url,
+            future=True,
+            connect_args={"check_same_thread": False, "timeout": 60},
+        )
+        Base.metadata.create_all(engine)
+        return engine
+    return create_engine(url, future=True)
+
+
+def session_factory(engine: Engine) -> sessionmaker:
+    return sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+
+def seed(
+    engine: Engine, users: int, per_user: int, seed_value: int = 42, months: int = 24
+) -> List[Tuple[int, str]]:
+    """
+    Seed `users` users (all with BENCH_PASSWORD) with exactly `per_user`
+    transactions each, using the app.db.seed generator, and rebuild the
+    monthly rollups. Returns [(user_id, email)].
+    """
+    result = seed_dataset(
+        engine.url.render_as_string(hide_password=False),
+        users,
+        per_user,
+        months=months,
+        seed_value=seed_value,
+        skew=False,
+        password=BENCH_PASSWORD,
+    )
+    return result["users"]
+
+
+def latency_stats(samples_s: Sequence[float]) -> Dict[str, float]:
+    """
+    Summary of latency samples given in seconds, reported in ms.
+    """
+    ordered = sorted(samples_s)
+
+    def pct(p: float) -> float:
+        # Nearest-rank percentile.
+        index = max(0, math.ceil(p / 100 * len(ordered)) - 1)
+        return ordered[index] * 1000
+
+    return {
+        "count": len(ordered),
+        "mean_ms": round(statistics.fmean(ordered) * 1000, 3),
+        "min_ms": round(ordered[0] * 1000, 3),
+        "p50_ms": round(pct(50), 3),
+        "p95_ms": round(pct(95), 3),
+        "p99_ms": round(pct(99), 3),
+        "max_ms": round(ordered[-1] * 1000, 3),
+    }
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_metadata(engine: Engine, args) -> dict:
+    return {
+        "commit": _git_commit(),
+        "timestamp": datetime.utcnow().isoformat(timespec="seconds") + "Z",
+        "python": sys.version.split()[0],
+        "sqlalchemy": sqlalchemy.__version__,
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "database": engine.dialect.name,
+        "args": {k: v for k, v in vars(args).items() if k not in ("url", "output")},
+    }
+
+
+def write_results(payload: dict, output: Optional[str], name: str) -> str:
+    """
+    Write results as JSON; default path is
+    benchmarks/results/<name>-<commit>.json.
+    """
+    if output is None:
+        commit = payload["meta"]["commit"] or "nocommit"
+        output = os.path.join(os.path.dirname(__file__), "results", f"{name}-{commit}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w") as fh:
+        json.dump(payload, fh, indent=2)
+        fh.write("\n")
+    return output
@@ -0,0 +1,49 @@
+"""
+Compare two benchmark result files, e.g. from two commits.
+
+Prints every numeric result present in both files with the relative
+change. For latencies lower is better; for throughput_rps higher is.
+
+Usage:
+    python -m benchmarks.compare benchmarks/results/api-abc123.json \\
+        benchmarks/results/api-def456.json
+"""
+import argparse
+import json
+from typing import Dict
+
+
+def flatten(tree: dict, prefix: str = "") -> Dict[str, float]:
+    flat = {}
+    for key, value in tree.items():
+        path = f"{prefix}.{key}" if prefix else key
+        if isinstance(value, dict):
+            flat.update(flatten(value, path))
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            flat[path] = value
+    return flat
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("before")
+    parser.add_argument("after")
+    args = parser.parse_args()
+
+    with open(args.before) as fh:
+        before = json.load(fh)
+    with open(args.after) as fh:
+        after = json.load(fh)
+
+    print(f"before: {before['meta'].get('commit')}  after: {after['meta'].get('commit')}")
+    old, new = flatten(before["results"]), flatten(after["results"])
+    width = max((len(k) for k in old), default=10)
+    for key in old:
+        if key not in new:
+            continue
+        change = (new[key] - old[key]) / old[key] * 100 if old[key] else float("nan")
+        print(f"{key:<{width}}  {old[key]:>12.3f}  {new[key]:>12.3f}  {change:+8.1f}%")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""
+Micro-benchmark of generate_report.
+
+For each dataset size, seeds one user with that many transactions and
+times the "sql" (rollups + edge ranges) and "pandas" engines over the
+full history and over a range with partial months at both ends. Also
+checks that both engines agree.
+
+Usage:
+    python -m benchmarks.report_engine
+    python -m benchmarks.report_engine --sizes 1000,10000 --repeat 10
+"""
+import argparse
+import statistics
+import time
+from datetime import datetime, timedelta
+from typing import Dict, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from app.db.report_parity import same_report
+from app.schemas.report import ReportSummary
+from app.services.report_service import REPORT_ENGINES, generate_report
+from benchmarks.common import (
+    default_url,
+    make_engine,
+    run_metadata,
+    seed,
+    write_results,
+)
+
+
+def time_engine(
+    db: Session,
+    user_id: int,
+    engine: str,
+    bounds: Tuple[Optional[datetime], Optional[datetime]],
+    repeat: int,
+) -> Tuple[Dict[str, float], ReportSummary]:
+    timings = []
+    report = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        report = generate_report(db, user_id, *bounds, engine=engine)
+        timings.append(time.perf_counter() - start)
+        # Drop identity-map state so runs are independent.
+        db.expunge_all()
+    return (
+        {
+            "min_ms": round(min(timings) * 1000, 3),
+            "median_ms": round(statistics.median(timings) * 1000, 3),
+            "max_ms": round(max(timings) * 1000, 3),
+        },
+        report,
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--url", default=None, help="database URL (default: temp SQLite)")
+    parser.add_argument("--sizes", default="1000,10000,100000,1000000")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--engines", default=",".join(REPORT_ENGINES))
+    parser.add_argument("--output", default=None, help="JSON results path")
+    args = parser.parse_args()
+
+    engine = make_engine(args.url or default_url())
+    now = datetime.utcnow()
+    ranges = {
+        "all": (None, None),
+        # Mid-month to mid-month: whole months in between plus two edges.
+        "partial_months": (
+            (now - timedelta(days=380)).replace(day=15),
+            (now - timedelta(days=20)).replace(day=10),
+        ),
+    }
+
+    results = {}
+    parity = True
+    for size in (int(s) for s in args.sizes.split(",")):
+        started = time.perf_counter()
+        (user_id, _), = seed(engine, 1, size)
+        seed_s = time.perf_counter() - started
+        entry = {"seed_s": round(seed_s, 2)}
+        with Session(engine) as db:
+            for range_name, bounds in ranges.items():
+                reports = {}
+                for name in args.engines.split(","):
+                    stats, reports[name] = time_engine(
+                        db, user_id, name, bounds, args.repeat
+                    )
+                    entry[f"{name}_{range_name}"] = stats
+                    print(f"{size:>8} {name:6s} {range_name:15s} {stats}")
+                first, *others = reports.values()
+                agree = all(same_report(first, other) for other in others)
+                entry[f"parity_{range_name}"] = agree
+                parity = parity and agree
+        results[str(size)] = entry
+
+    payload = {
+        "meta": run_metadata(engine, args),
+        "parity": parity,
+        "results": results,
+    }
+    print("engines agree" if parity else "ENGINES DISAGREE")
+    print("results written to", write_results(payload, args.output, "report_engine"))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,148 @@
+"""
+Serialization benchmark for the transaction listing.
+
+Seeds one user, then times one page of list_transactions through two
+paths and reports rows/sec for each:
+
+  orm_pydantic  ORM objects -> TransactionPage -> FastAPI response_model
+                validation + jsonable_encoder -> JSONResponse (the old path)
+  rows_orjson   column tuples -> dicts -> FastJSONResponse (the current path)
+
+Query and encoding are timed separately so the effect of each step shows.
+
+Usage:
+    python -m benchmarks.serialization
+    python -m benchmarks.serialization --transactions 20000 --limits 50,500,5000
+"""
+import argparse
+import asyncio
+import statistics
+import time
+from typing import Callable, Dict, List
+
+from fastapi.responses import JSONResponse
+from fastapi.routing import APIRoute, serialize_response
+from sqlalchemy.orm import Session
+
+from app.api.responses import FastJSONResponse, rows_to_dicts
+from app.models.transaction import Transaction
+from app.schemas.transaction import TransactionPage
+from app.services import transaction_service
+from benchmarks.common import (
+    default_url,
+    make_engine,
+    run_metadata,
+    seed,
+    write_results,
+)
+
+
+def _list_response_field():
+    # Imported late so the app picks up the settings of this process.
+    from app.main import app
+
+    for route in app.routes:
+        if (
+            isinstance(route, APIRoute)
+            and route.path == "/api/v1/transactions/"
+            and "GET" in route.methods
+        ):
+            return route.response_field
+    raise RuntimeError("transaction listing route not found")
+
+
+def _orm_page(db: Session, user_id: int, limit: int) -> List[Transaction]:
+    return (
+        db.query(Transaction)
+        .filter(Transaction.user_id == user_id)
+        .order_by(Transaction.date.desc(), Transaction.id.desc())
+        .limit(limit)
+        .all()
+    )
+
+
+def time_path(
+    query: Callable[[], list], encode: Callable[[list], bytes], repeat: int
+) -> Dict[str, float]:
+    query_s, encode_s = [], []
+    rows = body = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        rows = query()
+        middle = time.perf_counter()
+        body = encode(rows)
+        query_s.append(middle - start)
+        encode_s.append(time.perf_counter() - middle)
+    query_med = statistics.median(query_s)
+    encode_med = statistics.median(encode_s)
+    return {
+        "rows": len(rows),
+        "bytes": len(body),
+        "query_ms": round(query_med * 1000, 3),
+        "encode_ms": round(encode_med * 1000, 3),
+        "encode_rows_per_s": round(len(rows) / encode_med),
+        "total_rows_per_s": round(len(rows) / (query_med + encode_med)),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--url", default=None, help="database URL (default: temp SQLite)")
+    parser.add_argument("--transactions", type=int, default=10000)
+    parser.add_argument("--limits", default="50,500,5000", help="page sizes")
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--output", default=None, help="JSON results path")
+    args = parser.parse_args()
+
+    engine = make_engine(args.url or default_url())
+    (user_id, _), = seed(engine, 1, args.transactions)
+    field = _list_response_field()
+    loop = asyncio.new_event_loop()
+
+    def encode_old(rows: list) -> bytes:
+        content = loop.run_until_complete(
+            serialize_response(
+                field=field,
+                response_content=TransactionPage(items=rows, next_cursor=None),
+            )
+        )
+        return JSONResponse(content).body
+
+    def encode_new(rows: list) -> bytes:
+        return FastJSONResponse(
+            {"items": rows_to_dicts(rows), "next_cursor": None}
+        ).body
+
+    results = {}
+    with Session(engine) as db:
+        for limit in (int(n) for n in args.limits.split(",")):
+
+            def query_old() -> list:
+                # Fresh identity map, as in a new request.
+                db.expunge_all()
+                return _orm_page(db, user_id, limit)
+
+            def query_new() -> list:
+                rows, _ = transaction_service.list_transactions(
+                    db, user_id, limit=limit
+                )
+                return rows
+
+            old = time_path(query_old, encode_old, args.repeat)
+            new = time_path(query_new, encode_new, args.repeat)
+            if encode_old(query_old()) != encode_new(query_new()):
+                # Field order and float formatting match, so the bodies
+                # should be byte-identical.
+                print(f"limit={limit}: response bodies differ")
+            results[str(limit)] = {"orm_pydantic": old, "rows_orjson": new}
+            speedup = new["total_rows_per_s"] / old["total_rows_per_s"]
+            print(f"limit={limit:>6}  old {old}")
+            print(f"{'':12}  new {new}  ({speedup:.1f}x rows/s)")
+    loop.close()
+
+    payload = {"meta": run_metadata(engine, args), "results": results}
+    print("results written to", write_results(payload, args.output, "serialization"))
+
+
+if __name__ == "__main__":
+    main()